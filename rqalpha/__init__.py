@@ -210,6 +210,33 @@ def run_func(**kwargs):
     return main.run(config, user_funcs=user_funcs)
 
 
+def run_sweep(strategy_file_path, param_grid, config=None, processes=None, output_file=None):
+    # type: (str, dict, Optional[dict], Optional[int], Optional[str]) -> "pandas.DataFrame"
+    """
+    对 param_grid 中的每组参数组合并行运行回测，返回以参数及回测概览（summary）为列的结果表。
+
+    不含 "." 的参数名会通过 :code:`extra.context_vars` 传入策略，在策略中以 :code:`context.<参数名>` 访问；
+    含 "." 的参数名视为配置项路径，如 :code:`mod.sys_simulation.slippage`。
+    同一工作进程中的多次回测共享同一个数据源及其缓存；支持 fork 的平台上数据源由父进程预先加载。
+    单次回测失败不会中断其他回测，失败原因记录在结果表的 error 列中。
+
+    :param strategy_file_path: 策略文件路径
+    :param param_grid: 参数名到取值列表的映射
+    :param config: 策略配置项字典，同 :func:`run_file`
+    :param processes: 工作进程数，默认为 CPU 核数
+    :param output_file: csv 文件路径，若指定则每完成一次回测即刷新写入结果表
+
+    :example:
+
+    .. code-block:: python
+
+        result = run_sweep("strategy.py", {"fast": [5, 10], "slow": [30, 60]}, config=config, processes=4)
+
+    """
+    from rqalpha.sweep import run_sweep as _run_sweep
+    return _run_sweep(strategy_file_path, param_grid, config, processes, output_file)
+
+
 from ._version import __version__
 
 version_info = tuple(int(v) if v.isdigit() else v for v in __version__.split('.'))
@@ -385,6 +385,35 @@ def get_yield_curve(date=None, tenor=None):
     return env.data_proxy.get_yield_curve(start_date=date, end_date=date, tenor=tenor)
 
 
+def _history_dt(env, frequency, include_now, adjust_type):
+    # 根据当前执行阶段及回测频率确定 history_bars 系列 API 的截止时间及 include_now
+    dt = env.calendar_dt
+
+    if frequency[-1] == "m" and env.config.base.frequency == "1d":
+        raise RQInvalidArgument("can not get minute history in day back test")
+
+    if frequency[-1] == "d" and frequency != "1d":
+        raise RQInvalidArgument("invalid frequency")
+
+    if adjust_type not in {"pre", "post", "none"}:
+        raise RuntimeError("invalid adjust_type")
+
+    if frequency == "1d":
+        sys_frequency = env.config.base.frequency
+        if (
+                sys_frequency in ["1m", "tick"]
+                and not include_now
+                and ExecutionContext.phase() != EXECUTION_PHASE.AFTER_TRADING
+        ) or (ExecutionContext.phase() in (EXECUTION_PHASE.BEFORE_TRADING, EXECUTION_PHASE.OPEN_AUCTION)):
+            dt = env.data_proxy.get_previous_trading_date(env.trading_dt.date())
+            # 当 EXECUTION_PHASE.BEFORE_TRADING 的时候，强制 include_now 为 False
+            include_now = False
+        if sys_frequency == "1d":
+            # 日回测不支持 include_now
+            include_now = False
+    return dt, include_now
+
+
 @export_as_api
 @ExecutionContext.enforce_phase(
     EXECUTION_PHASE.BEFORE_TRADING,
@@ -485,30 +514,7 @@ def history_bars(
     """
     order_book_id = assure_order_book_id(order_book_id)
     env = Environment.get_instance()
-    dt = env.calendar_dt
-
-    if frequency[-1] == "m" and env.config.base.frequency == "1d":
-        raise RQInvalidArgument("can not get minute history in day back test")
-
-    if frequency[-1] == "d" and frequency != "1d":
-        raise RQInvalidArgument("invalid frequency")
-
-    if adjust_type not in {"pre", "post", "none"}:
-        raise RuntimeError("invalid adjust_type")
-
-    if frequency == "1d":
-        sys_frequency = Environment.get_instance().config.base.frequency
-        if (
-                sys_frequency in ["1m", "tick"]
-                and not include_now
-                and ExecutionContext.phase() != EXECUTION_PHASE.AFTER_TRADING
-        ) or (ExecutionContext.phase() in (EXECUTION_PHASE.BEFORE_TRADING, EXECUTION_PHASE.OPEN_AUCTION)):
-            dt = env.data_proxy.get_previous_trading_date(env.trading_dt.date())
-            # 当 EXECUTION_PHASE.BEFORE_TRADING 的时候，强制 include_now 为 False
-            include_now = False
-        if sys_frequency == "1d":
-            # 日回测不支持 include_now
-            include_now = False
+    dt, include_now = _history_dt(env, frequency, include_now, adjust_type)
 
     if fields is None:
         fields = ["datetime", "open", "high", "low", "close", "volume"]
@@ -526,6 +532,83 @@ def history_bars(
     )
 
 
+@export_as_api
+@ExecutionContext.enforce_phase(
+    EXECUTION_PHASE.BEFORE_TRADING,
+    EXECUTION_PHASE.OPEN_AUCTION,
+    EXECUTION_PHASE.ON_BAR,
+    EXECUTION_PHASE.ON_TICK,
+    EXECUTION_PHASE.AFTER_TRADING,
+    EXECUTION_PHASE.SCHEDULED,
+)
+@apply_rules(
+    assure_that("order_book_ids").is_valid_oid_list(),
+    verify_that("bar_count").is_instance_of(int).is_greater_than(0),
+    verify_that("frequency", pre_check=True).is_valid_frequency(),
+    verify_that("fields").are_valid_fields(
+        [f for f in names.VALID_HISTORY_FIELDS if f != "datetime"], ignore_none=False
+    ),
+    verify_that("include_now").is_instance_of(bool),
+    verify_that("adjust_type").is_in({"pre", "none", "post"}),
+)
+def history_bars_panel(
+        order_book_ids,
+        bar_count,
+        frequency,
+        fields,
+        include_now=False,
+        adjust_type="pre",
+):
+    # type:(Union[str, Iterable[str]], int, str, Union[str, List[str]], Optional[bool], Optional[str]) -> pd.DataFrame
+    """
+    批量获取多个合约的历史 k 线行情，各合约的数据按交易日历对齐，适用于需要对大量合约做截面计算的场景。
+    返回数据的时间范围与 :func:`history_bars` 相同，但不跳过停牌日，缺失的数据（如尚未上市）以 nan 填充。
+
+    :param order_book_ids: 合约代码列表
+    :param bar_count: 获取的历史数据数量，必填项
+    :param frequency: 获取数据什么样的频率进行。'1d'、'1m' 和 '1w' 分别表示每日、每分钟和每周，必填项
+    :param fields: 返回数据字段，见 :func:`history_bars`，不支持 datetime 字段
+    :param include_now: 是否包含当前数据
+    :param adjust_type: 复权类型，默认为前复权 pre；可选 pre, none, post
+
+    :return: fields 为单个字段时返回以时间为 index、合约代码为 columns 的 DataFrame；
+        fields 为列表时 columns 为 (field, order_book_id) 的 MultiIndex
+
+    :example:
+
+    获取若干股票最近20个交易日的收盘价，并计算各股票的20日收益率:
+
+    ..  code-block:: python3
+        :linenos:
+
+        closes = history_bars_panel(['000001.XSHE', '000002.XSHE', '600000.XSHG'], 20, '1d', 'close')
+        returns = closes.iloc[-1] / closes.iloc[0] - 1
+    """
+    env = Environment.get_instance()
+    dt, include_now = _history_dt(env, frequency, include_now, adjust_type)
+
+    single_field = isinstance(fields, str)
+    field_list = [fields] if single_field else fields
+    dates, values = env.data_proxy.history_bars_panel(
+        order_book_ids,
+        bar_count,
+        frequency,
+        field_list,
+        dt,
+        include_now=include_now,
+        adjust_type=adjust_type,
+        adjust_orig=env.trading_dt,
+    )
+    index = pd.to_datetime(dates.astype(str), format="%Y%m%d%H%M%S")
+    if single_field:
+        return pd.DataFrame(values[:, :, 0], index=index, columns=order_book_ids)
+    columns = pd.MultiIndex.from_product([field_list, order_book_ids])
+    return pd.DataFrame(
+        values.transpose(0, 2, 1).reshape(len(dates), len(field_list) * len(order_book_ids)),
+        index=index, columns=columns
+    )
+
+
 @export_as_api
 @apply_rules(
     verify_that("order_book_id", pre_check=True).is_active_instrument(),
@@ -610,20 +693,10 @@ def all_instruments(type=None, date=None):
     else:
         types = None
 
-    result = env.data_proxy.get_all_instruments(types, dt)
     if types is not None and len(types) == 1:
-        data = []
-        for i in result:
-            instrument_dic = {k: v for k, v in i.__dict__.items() if not k.startswith("_")}
-            data.append(instrument_dic)
-        return pd.DataFrame(data)
-
-    return pd.DataFrame(
-        [
-            [i.order_book_id, i.symbol, i.type, i.listed_date, i.de_listed_date]
-            for i in result
-        ],
-        columns=["order_book_id", "symbol", "type", "listed_date", "de_listed_date"],
+        return env.data_proxy.get_all_instruments_frame(types, dt)
+    return env.data_proxy.get_all_instruments_frame(
+        types, dt, ["order_book_id", "symbol", "type", "listed_date", "de_listed_date"]
     )
 
 
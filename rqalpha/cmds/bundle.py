@@ -27,6 +27,7 @@ import six
 import h5py
 
 from rqalpha.utils.i18n import gettext as _
+from rqalpha.utils.click_helper import Date
 
 from rqalpha.cmds.entry import cli
 from rqalpha.utils import init_rqdatac_env
@@ -124,9 +125,41 @@ def download_bundle(data_bundle_path, confirm):
     tar.extractall(data_bundle_path)
     tar.close()
     os.remove(tmp)
+    # 下载的 bundle 中不含合约表，在此生成，避免首次启动时从 instruments.pk 构建
+    from rqalpha.data.base_data_source.storages import InstrumentTable
+    InstrumentTable.open(
+        os.path.join(data_bundle_path, "instruments.h5"), os.path.join(data_bundle_path, "instruments.pk")
+    )
     six.print_(_(u"Data bundle download successfully in {bundle_path}").format(bundle_path=data_bundle_path))
 
 
+@cli.command(help=_("Slice bundle with given instruments and date range into a smaller one"))
+@click.option('-d', '--data-bundle-path', default=os.path.expanduser('~/.rqalpha'), type=click.Path(file_okay=False))
+@click.option('-o', '--output', required=True, type=click.Path(file_okay=False),
+              help='data bundle path of the sliced bundle, which will be written into the "bundle" directory under it')
+@click.option('-i', '--order-book-id', 'order_book_ids', multiple=True, help='order_book_id to keep, can be repeated')
+@click.option('-t', '--type', 'types', multiple=True, help='instrument type to keep, such as CS and Future, can be repeated')
+@click.option('-s', '--start-date', type=Date())
+@click.option('-e', '--end-date', type=Date())
+@click.option('--compression', default=False, is_flag=True, help='enable compression to reduce file size')
+def slice_bundle(data_bundle_path, output, order_book_ids, types, start_date, end_date, compression):
+    """
+    截取 bundle 中指定合约及日期区间的数据，生成一份较小的 bundle
+    """
+    src = os.path.join(data_bundle_path, "bundle")
+    if not os.path.exists(src):
+        click.echo(_('bundle not exist, use "rqalpha create-bundle" command instead'))
+        return 1
+    from rqalpha.data.bundle import slice_bundle as slice_bundle_
+    h5_kwargs = {"compression": 9} if compression else {}
+    order_book_ids = slice_bundle_(
+        src, os.path.join(output, "bundle"), order_book_ids, types, start_date, end_date, **h5_kwargs
+    )
+    click.echo(_("Sliced bundle with {count} instruments in {bundle_path}").format(
+        count=len(order_book_ids), bundle_path=os.path.join(output, "bundle")
+    ))
+
+
 @cli.command(help=_("Check bundle"))
 @click.option('-d', '--data-bundle-path', default=os.path.expanduser('~/.rqalpha'), type=click.Path(file_okay=False))
 def check_bundle(data_bundle_path):
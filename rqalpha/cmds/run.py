@@ -48,6 +48,8 @@ from .entry import cli
 @click.option('--extra-vars', 'extra__context_vars', type=click.STRING, help="override context vars")
 @click.option("--enable-profiler", "extra__enable_profiler", is_flag=True, default=None,
               help="add line profiler to profile your strategy")
+@click.option("--enable-event-profiler", "extra__enable_event_profiler", is_flag=True, default=None,
+              help="record call counts and wall time of every event listener")
 @click.option('--config', 'config_path', type=click.STRING, help="config file path")
 # -- Mod Configuration
 @click.option('-mc', '--mod-config', 'mod_configs', nargs=2, multiple=True, type=click.STRING, help="mod extra config")
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2021 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：
+#         http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import os
+
+import click
+import six
+import yaml
+
+from rqalpha.utils.i18n import gettext as _
+from rqalpha.utils.click_helper import Date
+
+from .entry import cli
+
+
+def _parse_param_values(values):
+    # "5,10,20" -> [5, 10, 20]，各取值按 yaml 规则解析类型
+    return [yaml.safe_load(v) for v in values.split(",")]
+
+
+@cli.command(help=_("Run a strategy with every combination of the given parameters in parallel"))
+@click.help_option('-h', '--help')
+@click.option('-f', '--strategy-file', type=click.Path(exists=True), required=True)
+@click.option('--config', 'config_path', type=click.Path(exists=True), help="config file path")
+@click.option('-d', '--data-bundle-path', type=click.Path(exists=True))
+@click.option('-s', '--start-date', type=Date())
+@click.option('-e', '--end-date', type=Date())
+@click.option('-a', '--account', 'accounts', nargs=2, multiple=True,
+              help="set account type with starting cash, eg: -a stock 1000000 -a future 1000000")
+@click.option('-p', '--param', 'params', nargs=2, multiple=True, required=True,
+              help="parameter name and comma separated values, eg: -p fast 5,10 -p base.frequency 1d. "
+                   "names without '.' are passed to the strategy as context.<name>")
+@click.option('-n', '--processes', type=click.INT, help="number of worker processes, defaults to cpu count")
+@click.option('-o', '--output-file', type=click.Path(), help="csv file to write the result table to, "
+                                                             "refreshed after each run")
+def sweep(strategy_file, config_path, data_bundle_path, start_date, end_date, accounts, params, processes,
+          output_file):
+    from rqalpha.sweep import run_sweep
+    from rqalpha.utils.config import load_yaml
+
+    config = load_yaml(os.path.abspath(config_path)) if config_path else {}
+    base = config.setdefault("base", {})
+    for key, value in [("data_bundle_path", data_bundle_path), ("start_date", start_date), ("end_date", end_date)]:
+        if value is not None:
+            base[key] = value
+    if accounts:
+        base["accounts"] = {account_type: float(cash) for account_type, cash in accounts}
+
+    param_grid = {name: _parse_param_values(values) for name, values in params}
+    result = run_sweep(os.path.abspath(strategy_file), param_grid, config, processes, output_file)
+    with_errors = result["error"].notnull().sum() if "error" in result else 0
+    six.print_(result.to_string())
+    if with_errors:
+        six.print_(_("{} of {} runs failed").format(with_errors, len(result)))
+        return 1
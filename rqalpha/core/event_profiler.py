@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），
+#         您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、
+#         本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，
+#         否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import inspect
+from array import array
+from collections import Counter, defaultdict
+from functools import wraps
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+
+def _name_of(func):
+    func = getattr(func, "__func__", func)
+    return getattr(func, "__qualname__", None) or repr(func)
+
+
+class EventProfiler(object):
+    """
+    事件处理函数的耗时统计，通过 extra.enable_event_profiler 开启。
+    开启后 EventBus 中注册的每个处理函数（包括策略的 handle_bar 等用户函数）都会被包装并记录每次调用的耗时，
+    同时统计 DataProxy 各公开方法的调用次数；未开启时不做任何包装，没有额外开销。
+    """
+
+    def __init__(self):
+        # (event_type, 处理函数名) -> 每次调用的耗时（秒），嵌套发布的事件的处理耗时会同时计入外层处理函数
+        self._durations = defaultdict(lambda: array("d"))
+        self._data_proxy_calls = Counter()
+
+    def wrap(self, event_type, func):
+        durations = self._durations[(event_type, _name_of(func))]
+
+        @wraps(func)
+        def profiled(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                durations.append(perf_counter() - start)
+        return profiled
+
+    def wrap_data_proxy(self, data_proxy):
+        calls = self._data_proxy_calls
+
+        def count(name, method):
+            @wraps(method)
+            def counted(*args, **kwargs):
+                calls[name] += 1
+                return method(*args, **kwargs)
+            return counted
+
+        for name, _ in inspect.getmembers(type(data_proxy), callable):
+            if not name.startswith("_"):
+                setattr(data_proxy, name, count(name, getattr(data_proxy, name)))
+
+    def listener_report(self):
+        # type: () -> pd.DataFrame
+        rows = []
+        for (event_type, name), durations in self._durations.items():
+            if not durations:
+                continue
+            durations = np.frombuffer(durations, dtype=np.float64)
+            rows.append({
+                "event": getattr(event_type, "name", str(event_type)),
+                "listener": name,
+                "calls": len(durations),
+                "total_time": durations.sum(),
+                "mean_time": durations.mean(),
+                "p99_time": np.percentile(durations, 99),
+            })
+        columns = ["event", "listener", "calls", "total_time", "mean_time", "p99_time"]
+        return pd.DataFrame(rows, columns=columns).sort_values("total_time", ascending=False).reset_index(drop=True)
+
+    def data_proxy_report(self):
+        # type: () -> pd.DataFrame
+        return pd.DataFrame(
+            self._data_proxy_calls.most_common(), columns=["method", "calls"]
+        )
+
+    def format_report(self):
+        # type: () -> str
+        listener_report = self.listener_report()
+        for col in ["total_time", "mean_time", "p99_time"]:
+            # 以毫秒展示
+            listener_report[col] = (listener_report[col] * 1000).round(3)
+        listener_report = listener_report.rename(columns={
+            "total_time": "total(ms)", "mean_time": "mean(ms)", "p99_time": "p99(ms)"
+        })
+        return "\n\n".join([
+            listener_report.to_string(index=False), self.data_proxy_report().to_string(index=False)
+        ])
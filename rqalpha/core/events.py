@@ -14,21 +14,46 @@
 
 from enum import Enum
 from collections import defaultdict
+from itertools import chain
 
 
 class Event(object):
+    # event_type 存放于 slot 中，事件携带的数据直接以构造参数字典作为 __dict__，不再额外拷贝
+    __slots__ = ("event_type", "__dict__")
+
     def __init__(self, event_type, **kwargs):
         self.__dict__ = kwargs
         self.event_type = event_type
 
     def __repr__(self):
-        return ' '.join('{}:{}'.format(k, v) for k, v in self.__dict__.items())
+        return ' '.join('{}:{}'.format(k, v) for k, v in chain(
+            (("event_type", self.event_type), ), self.__dict__.items()
+        ))
 
 
 class EventBus(object):
     def __init__(self):
         self._listeners = defaultdict(list)
         self._user_listeners = defaultdict(list)
+        # event_type -> (系统处理函数元组, 用户处理函数元组)，注册时即时更新，没有处理函数的事件类型不在表中
+        self._dispatch_table = {}
+        self._listener_wrapper = None
+
+    def _update_dispatch_table(self, event_type):
+        listeners, user_listeners = self._listeners[event_type], self._user_listeners[event_type]
+        if self._listener_wrapper is not None:
+            listeners = [self._listener_wrapper(event_type, listener) for listener in listeners]
+            user_listeners = [self._listener_wrapper(event_type, listener) for listener in user_listeners]
+        self._dispatch_table[event_type] = (tuple(listeners), tuple(user_listeners))
+
+    def set_listener_wrapper(self, wrapper):
+        """
+        设置处理函数的包装函数 wrapper(event_type, listener) -> listener，仅作用于分发表，不改变已注册的处理函数，
+        用于性能统计等场景。传入 None 则取消包装。
+        """
+        self._listener_wrapper = wrapper
+        for event_type in set(self._listeners) | set(self._user_listeners):
+            self._update_dispatch_table(event_type)
 
     def add_listener(self, event_type, listener, user=False):
         """
@@ -36,17 +61,25 @@ class EventBus(object):
             注意！对于 Order/Trade/Position 等可能随时会被回收的对象，不应注册其绑定方法为事件处理函数
         """
         (self._user_listeners if user else self._listeners)[event_type].append(listener)
+        self._update_dispatch_table(event_type)
 
     def prepend_listener(self, event_type, listener, user=False):
         (self._user_listeners if user else self._listeners)[event_type].insert(0, listener)
+        self._update_dispatch_table(event_type)
 
     def publish_event(self, event):
-        for listener in self._listeners[event.event_type]:
+        dispatch = self._dispatch_table.get(event.event_type)
+        if dispatch is None:
+            # 没有任何处理函数的事件
+            return
+
+        listeners, user_listeners = dispatch
+        for listener in listeners:
             # 如果返回 True ，那么消息不再传递下去
             if listener(event):
                 break
 
-        for listener in self._user_listeners[event.event_type]:
+        for listener in user_listeners:
             listener(event)
 
 
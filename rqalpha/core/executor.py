@@ -15,7 +15,6 @@
 #         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
 #         详细的授权流程，请联系 public@ricequant.com 获取。
 
-from copy import copy
 from datetime import datetime
 
 from rqalpha.core.events import EVENT, Event
@@ -31,6 +30,9 @@ class Executor(object):
     def get_state(self):
         return convert_dict_to_json({"last_before_trading": self._last_before_trading}).encode('utf-8')
 
+    def get_state_version(self):
+        return self._last_before_trading
+
     def set_state(self, state):
         self._last_before_trading = convert_json_to_dict(state.decode('utf-8')).get("last_before_trading")
 
@@ -91,9 +93,15 @@ class Executor(object):
     }
 
     def _split_and_publish(self, event):
-        if hasattr(event, "calendar_dt") and hasattr(event, "trading_dt"):
-            self._env.update_time(event.calendar_dt, event.trading_dt)
-        for event_type in self.EVENT_SPLIT_MAP[event.event_type]:
-            e = copy(event)
-            e.event_type = event_type
-            self._env.event_bus.publish_event(e)
+        payload = event.__dict__
+        if "calendar_dt" in payload and "trading_dt" in payload:
+            self._env.update_time(payload["calendar_dt"], payload["trading_dt"])
+        # PRE/主/POST 三个阶段复用同一个事件对象，仅改写 event_type，发布完毕后恢复为原事件类型
+        event_types = self.EVENT_SPLIT_MAP[event.event_type]
+        publish_event = self._env.event_bus.publish_event
+        try:
+            for event_type in event_types:
+                event.event_type = event_type
+                publish_event(event)
+        finally:
+            event.event_type = event_types[1]
@@ -29,6 +29,7 @@ from rqalpha.environment import Environment
 def run_when_strategy_not_hold(func):
     from rqalpha.utils.logger import system_log
 
+    @wraps(func)
     def wrapper(*args, **kwargs):
         if not Environment.get_instance().config.extra.is_hold:
             return func(*args, **kwargs)
@@ -24,11 +24,15 @@ from rqalpha.model.instrument import Instrument
 class StrategyUniverse(object):
     def __init__(self):
         self._set = set()
+        self._version = 0
         Environment.get_instance().event_bus.prepend_listener(EVENT.AFTER_TRADING, self._clear_de_listed)
 
     def get_state(self):
         return json.dumps(sorted(self._set)).encode('utf-8')
 
+    def get_state_version(self):
+        return self._version
+
     def set_state(self, state):
         l = json.loads(state.decode('utf-8'))
         self.update(l)
@@ -39,6 +43,7 @@ class StrategyUniverse(object):
         new_set = set(universe)
         if new_set != self._set:
             self._set = new_set
+            self._version += 1
             Environment.get_instance().event_bus.publish_event(Event(EVENT.POST_UNIVERSE_CHANGED, universe=self._set))
 
     def get(self):
@@ -53,4 +58,5 @@ class StrategyUniverse(object):
                 de_listed.add(o)
         if de_listed:
             self._set -= de_listed
+            self._version += 1
             env.event_bus.publish_event(Event(EVENT.POST_UNIVERSE_CHANGED, universe=self._set))
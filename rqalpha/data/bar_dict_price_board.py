@@ -32,6 +32,13 @@ class BarDictPriceBoard(AbstractPriceBoard):
     def get_last_price(self, order_book_id: str):
         return self._get_bar(order_book_id).last
 
+    def get_last_prices(self, order_book_ids):
+        if ExecutionContext.phase() == EXECUTION_PHASE.OPEN_AUCTION:
+            return super(BarDictPriceBoard, self).get_last_prices(order_book_ids)
+        return self._env.data_proxy.get_bars_field(
+            order_book_ids, self._env.calendar_dt, self._env.config.base.frequency, "close"
+        )
+
     def get_limit_up(self, order_book_id):
         return self._get_bar(order_book_id).limit_up
 
@@ -31,31 +31,45 @@ def _factor_for_date(dates, factors, d):
     return factors[pos-1]
 
 
-def adjust_bars(bars, ex_factors, fields, adjust_type, adjust_orig):
-    if ex_factors is None or len(bars) == 0:
-        return bars
-
-    dates = ex_factors['start_date']
-    ex_cum_factors = ex_factors['ex_cum_factor']
-
+def _base_adjust_rate(ex_factors, adjust_type, adjust_orig):
     if adjust_type == 'pre':
         adjust_orig_dt = np.uint64(convert_date_to_int(adjust_orig))
-        base_adjust_rate = _factor_for_date(dates, ex_cum_factors, adjust_orig_dt)
-    else:
-        base_adjust_rate = 1.0
+        return _factor_for_date(ex_factors['start_date'], ex_factors['ex_cum_factor'], adjust_orig_dt)
+    return 1.0
 
-    start_date = bars['datetime'][0]
-    end_date = bars['datetime'][-1]
 
-    if (_factor_for_date(dates, ex_cum_factors, start_date) == base_adjust_rate and
-            _factor_for_date(dates, ex_cum_factors, end_date) == base_adjust_rate):
+def cum_factors_of_bars(bars, ex_factors):
+    # 与 bars 逐行对齐的累计复权因子，可预先计算并缓存，供 adjust_bars 及 adjust_field 使用
+    if ex_factors is None or len(bars) == 0:
+        return None
+    return ex_factors['ex_cum_factor'].take(ex_factors['start_date'].searchsorted(bars['datetime'], side='right') - 1)
+
+
+def adjust_bars(bars, ex_factors, fields, adjust_type, adjust_orig, cum_factors=None):
+    if ex_factors is None or len(bars) == 0:
         return bars
 
-    factors = ex_cum_factors.take(dates.searchsorted(bars['datetime'], side='right') - 1)
+    base_adjust_rate = _base_adjust_rate(ex_factors, adjust_type, adjust_orig)
+
+    if cum_factors is None:
+        dates = ex_factors['start_date']
+        ex_cum_factors = ex_factors['ex_cum_factor']
+        start_date = bars['datetime'][0]
+        end_date = bars['datetime'][-1]
+
+        if (_factor_for_date(dates, ex_cum_factors, start_date) == base_adjust_rate and
+                _factor_for_date(dates, ex_cum_factors, end_date) == base_adjust_rate):
+            return bars
+
+        factors = ex_cum_factors.take(dates.searchsorted(bars['datetime'], side='right') - 1)
+        factors /= base_adjust_rate
+    else:
+        if cum_factors[0] == base_adjust_rate and cum_factors[-1] == base_adjust_rate:
+            return bars
+        factors = cum_factors / base_adjust_rate
 
     # 复权
     bars = np.copy(bars)
-    factors /= base_adjust_rate
     if isinstance(fields, str):
         if fields in PRICE_FIELDS:
             bars[fields] *= factors
@@ -72,3 +86,20 @@ def adjust_bars(bars, ex_factors, fields, adjust_type, adjust_orig):
         elif f == 'volume':
             bars[f] *= (1 / factors)
     return bars
+
+
+def adjust_field(bars, ex_factors, field, adjust_type, adjust_orig, cum_factors):
+    # adjust_bars 的单字段版本，直接返回复权后的 field 列，不再拷贝整个结构化数组
+    if cum_factors is None or len(bars) == 0:
+        return bars[field]
+
+    base_adjust_rate = _base_adjust_rate(ex_factors, adjust_type, adjust_orig)
+    if cum_factors[0] == base_adjust_rate and cum_factors[-1] == base_adjust_rate:
+        return bars[field]
+
+    factors = cum_factors / base_adjust_rate
+    if field in PRICE_FIELDS:
+        return bars[field] * factors
+    elif field == 'volume':
+        return bars[field] * (1 / factors)
+    return bars[field]
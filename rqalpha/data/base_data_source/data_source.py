@@ -14,11 +14,12 @@
 #         否则米筐科技有权追究相应的知识产权侵权责任。
 #         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
 #         详细的授权流程，请联系 public@ricequant.com 获取。
-from collections import ChainMap
+import heapq
+import json
 import os
 from datetime import date, datetime, timedelta
 from itertools import chain, repeat
-from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union, cast, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Union, Tuple
 
 try:
     from typing import Protocol, runtime_checkable
@@ -32,41 +33,24 @@ from rqalpha.utils.i18n import gettext as _
 from rqalpha.const import INSTRUMENT_TYPE, MARKET, TRADING_CALENDAR_TYPE
 from rqalpha.interface import AbstractDataSource, ExchangeRate
 from rqalpha.model.instrument import Instrument
-from rqalpha.utils.datetime_func import (convert_date_to_int, convert_int_to_date, convert_int_to_datetime, convert_dt_to_int)
+from rqalpha.model.tick import TickObject
+from rqalpha.utils.datetime_func import (convert_date_to_int, convert_int_to_date, convert_dt_to_int)
 from rqalpha.utils.exception import RQInvalidArgument
 from rqalpha.utils.functools import lru_cache
 from rqalpha.utils.typing import DateLike
 from rqalpha.utils.logger import system_log
 from rqalpha.environment import Environment
-from rqalpha.data.base_data_source.adjust import FIELDS_REQUIRE_ADJUSTMENT, adjust_bars
+from rqalpha.data.base_data_source.adjust import FIELDS_REQUIRE_ADJUSTMENT, adjust_bars, adjust_field, cum_factors_of_bars
+from rqalpha.data.base_data_source.resample import BAR_RESAMPLE_FIELD_METHODS, WeekGroups, week_groups, resample_by_week_groups
 from rqalpha.data.base_data_source.storage_interface import (AbstractCalendarStore, AbstractDateSet,
-                                AbstractDayBarStore, AbstractDividendStore,
-                                AbstractInstrumentStore, AbstractSimpleFactorStore)
+                                AbstractDayBarStore, AbstractDividendStore, AbstractMinuteBarStore,
+                                AbstractInstrumentStore, AbstractSimpleFactorStore, AbstractTickStore)
 from rqalpha.data.base_data_source.storages import (DateSet, SecuritiesDayBarStore, INDXDayBarStore, 
-                       FutureDayBarStore, DividendStore, ExchangeTradingCalendarStore, 
+                       FutureDayBarStore, MemoryMappedH5Store, MemoryMappedDayBarStore, MemoryMappedDateSet,
+                       MinuteBarStore, FutureMinuteBarStore, TickStore,
+                       DividendStore, ExchangeTradingCalendarStore, 
                        FutureInfoStore, ShareTransformationStore, SimpleFactorStore,
-                       YieldCurveStore, FuturesTradingParameters, load_instruments_from_pkl)
-
-
-BAR_RESAMPLE_FIELD_METHODS = {
-    "open": "first",
-    "close": "last",
-    "iopv": "last",
-    "high": "max",
-    "low": "min",
-    "total_turnover": "sum",
-    "volume": "sum",
-    "num_trades": "sum",
-    "acc_net_value": "last",
-    "unit_net_value": "last",
-    "discount_rate": "last",
-    "settlement": "last",
-    "prev_settlement": "last",
-    "open_interest": "last",
-    "basis_spread": "last",
-    "contract_multiplier": "last",
-    "strike_price": "last",
-}
+                       YieldCurveStore, FuturesTradingParameters, InstrumentTable)
 
 
 @runtime_checkable
@@ -104,35 +88,84 @@ class BaseDataSource(AbstractDataSource):
         self._future_info_store = FutureInfoStore(_p("future_info.json"), custom_future_info)
         self._yield_curve = YieldCurveStore(_p('yield_curve.h5'))
         self._share_transformation = ShareTransformationStore(_p('share_transformation.json'))
-        self._suspend_days = [DateSet(_p('suspended_days.h5'))]  # type: List[AbstractDateSet]
-        self._st_stock_days = DateSet(_p('st_stock_days.h5'))
+        self._precompute_adjust_factors = getattr(base_config, "precompute_adjust_factors", False)
+        self._shared = False
+
+        bundle_mmap = getattr(base_config, "bundle_mmap", False)
+        mmap_path = getattr(base_config, "bundle_mmap_path", None)
+        if bundle_mmap:
+            def _day_bar_store(store_cls, name):
+                return MemoryMappedDayBarStore(_p(name), store_cls.DEFAULT_DTYPE, mmap_path)
+
+            def _date_set(name):
+                return MemoryMappedDateSet(_p(name), mmap_path)
+        else:
+            def _day_bar_store(store_cls, name):
+                return store_cls(_p(name))
+
+            def _date_set(name):
+                return DateSet(_p(name))
+
+        self._suspend_days = [_date_set('suspended_days.h5')]  # type: List[AbstractDateSet]
+        self._st_stock_days = _date_set('st_stock_days.h5')
 
         # dynamic registered storages
         self._ins_id_or_sym_type_map: Dict[str, INSTRUMENT_TYPE] = {}
         self._day_bar_stores: Dict[Tuple[INSTRUMENT_TYPE, MARKET], AbstractDayBarStore] = {}
+        self._minute_bar_stores: Dict[Tuple[INSTRUMENT_TYPE, MARKET], AbstractMinuteBarStore] = {}
+        self._tick_stores: Dict[Tuple[INSTRUMENT_TYPE, MARKET], AbstractTickStore] = {}
         self._dividend_stores: Dict[Tuple[INSTRUMENT_TYPE, MARKET], AbstractDividendStore] = {}
         self._split_stores: Dict[Tuple[INSTRUMENT_TYPE, MARKET], AbstractSimpleFactorStore] = {}
         self._calendar_stores: Dict[TRADING_CALENDAR_TYPE, AbstractCalendarStore] = {}
         self._ex_factor_stores: Dict[Tuple[INSTRUMENT_TYPE, MARKET], AbstractSimpleFactorStore] = {}
 
-        # instruments
+        # instruments，bundle 中的合约表只在合约被访问时构造 Instrument 对象，
+        # _id_instrument_map 及 _sym_instrument_map 缓存已访问过的合约，_grouped_instruments 仅包含通过 register_instruments 注册的合约
+        self._instrument_table = InstrumentTable.open(_p('instruments.h5'), _p('instruments.pk'))
+        self._table_instruments: Dict[int, Instrument] = {}
         self._id_instrument_map: Dict[str, Dict[datetime, Instrument]] = {}
         self._sym_instrument_map: Dict[str, Dict[datetime, Instrument]] = {}
-        self._id_or_sym_instrument_map: Mapping[str, Dict[datetime, Instrument]] = ChainMap(self._id_instrument_map, self._sym_instrument_map)
         self._grouped_instruments: Dict[INSTRUMENT_TYPE, List[Instrument]] = {}
 
-        # register instruments
-        self.register_instruments(load_instruments_from_pkl(_p('instruments.pk'), self._future_info_store))
-
         # register day bar stores
-        funds_day_bar_store = SecuritiesDayBarStore(_p('funds.h5'))
+        funds_day_bar_store = _day_bar_store(SecuritiesDayBarStore, 'funds.h5')
         for ins_type, store in chain([
-            (INSTRUMENT_TYPE.CS, SecuritiesDayBarStore(_p('stocks.h5'))),
-            (INSTRUMENT_TYPE.INDX, INDXDayBarStore(_p('indexes.h5'))),
-            (INSTRUMENT_TYPE.FUTURE, FutureDayBarStore(_p('futures.h5'))),
+            (INSTRUMENT_TYPE.CS, _day_bar_store(SecuritiesDayBarStore, 'stocks.h5')),
+            (INSTRUMENT_TYPE.INDX, _day_bar_store(INDXDayBarStore, 'indexes.h5')),
+            (INSTRUMENT_TYPE.FUTURE, _day_bar_store(FutureDayBarStore, 'futures.h5')),
         ], zip([INSTRUMENT_TYPE.ETF, INSTRUMENT_TYPE.LOF, INSTRUMENT_TYPE.REITs], repeat(funds_day_bar_store))):
             self.register_day_bar_store(ins_type, store)
 
+        # register minute bar stores，分钟线为可选数据
+        minute_bar_path = _p("minute_bars")
+        if os.path.isdir(minute_bar_path):
+            def _minute_bar_stores():
+                funds_store = None
+                for ins_type, store_cls, name in [
+                    (INSTRUMENT_TYPE.CS, MinuteBarStore, "stocks.h5"),
+                    (INSTRUMENT_TYPE.INDX, MinuteBarStore, "indexes.h5"),
+                    (INSTRUMENT_TYPE.FUTURE, FutureMinuteBarStore, "futures.h5"),
+                    (INSTRUMENT_TYPE.ETF, MinuteBarStore, "funds.h5"),
+                    (INSTRUMENT_TYPE.LOF, MinuteBarStore, "funds.h5"),
+                    (INSTRUMENT_TYPE.REITs, MinuteBarStore, "funds.h5"),
+                ]:
+                    f = os.path.join(minute_bar_path, name)
+                    if not os.path.exists(f):
+                        continue
+                    if name == "funds.h5":
+                        funds_store = funds_store or store_cls(f)
+                        yield ins_type, funds_store
+                    else:
+                        yield ins_type, store_cls(f)
+            for ins_type, minute_bar_store in _minute_bar_stores():
+                self.register_minute_bar_store(ins_type, minute_bar_store)
+
+        # register tick store，tick 为可选数据
+        if os.path.isdir(_p("ticks")):
+            tick_store = TickStore(_p("ticks"))
+            for ins_type in self.DEFAULT_INS_TYPES:
+                self.register_tick_store(ins_type, tick_store)
+
         # register dividends and split factors stores
         dividend_store = DividendStore(_p('dividends.h5'))
         split_store = SimpleFactorStore(_p('split_factor.h5'))
@@ -145,14 +178,102 @@ class BaseDataSource(AbstractDataSource):
         # register calendar stores
         self.register_calendar_store(TRADING_CALENDAR_TYPE.CN_STOCK, ExchangeTradingCalendarStore(_p("trading_dates.npy")))
 
+    _shared_instances: Dict[tuple, "BaseDataSource"] = {}
+
+    @staticmethod
+    def _shared_key(base_config) -> tuple:
+        future_info = getattr(base_config, "future_info", {})
+        if hasattr(future_info, "convert_to_dict"):
+            future_info = future_info.convert_to_dict()
+        return (
+            os.path.abspath(base_config.data_bundle_path),
+            json.dumps(future_info, sort_keys=True, default=str),
+            getattr(base_config, "bundle_mmap", False),
+            getattr(base_config, "bundle_mmap_path", None),
+            getattr(base_config, "precompute_adjust_factors", False),
+        )
+
+    @classmethod
+    def share(cls, base_config) -> "BaseDataSource":
+        """
+        创建（或获取已有的）进程内共享的数据源，供同一进程中后续的回测及由当前进程 fork 出的子进程直接复用，
+        省去重复加载合约、期货交易参数等数据的开销。
+        在批量回测的父进程中先调用该方法，再以 fork 方式启动子进程运行回测，子进程中的 BaseDataSource 数据与父进程共享。
+        若同时开启了 bundle_mmap，日线及停牌、ST 数据的内存映射文件会在此时完成转换。
+        """
+        key = cls._shared_key(base_config)
+        try:
+            return cls._shared_instances[key]
+        except KeyError:
+            pass
+        data_source = cls(base_config)
+        for store in chain(data_source._day_bar_stores.values(), data_source._suspend_days, [data_source._st_stock_days]):
+            if isinstance(store, MemoryMappedH5Store):
+                store.prepare()
+        data_source._shared = True
+        cls._shared_instances[key] = data_source
+        return data_source
+
+    @classmethod
+    def get_shared(cls, base_config) -> Optional["BaseDataSource"]:
+        # 返回通过 share 创建的、配置一致的共享数据源，不存在时返回 None
+        return cls._shared_instances.get(cls._shared_key(base_config))
+
+    @property
+    def shared(self) -> bool:
+        return self._shared
+
     def register_day_bar_store(self, instrument_type: INSTRUMENT_TYPE, store: AbstractDayBarStore, market: MARKET = MARKET.CN):
         self._day_bar_stores[instrument_type, market] = store
 
+    def register_minute_bar_store(self, instrument_type: INSTRUMENT_TYPE, store: AbstractMinuteBarStore, market: MARKET = MARKET.CN):
+        self._minute_bar_stores[instrument_type, market] = store
+
+    def register_tick_store(self, instrument_type: INSTRUMENT_TYPE, store: AbstractTickStore, market: MARKET = MARKET.CN):
+        self._tick_stores[instrument_type, market] = store
+
     def register_instruments(self, instruments: Iterable[Instrument]):
         for ins in instruments:
+            # 先载入合约表中的同名合约，保证注册的合约与合约表中的合约按原有的覆盖规则合并
+            self._instruments_of_id(ins.order_book_id)
+            self._instruments_of_symbol(ins.symbol)
             self._id_instrument_map.setdefault(ins.order_book_id, {})[ins.listed_date] = ins
             self._sym_instrument_map.setdefault(ins.symbol, {})[ins.listed_date] = ins
             self._grouped_instruments.setdefault(ins.type, []).append(ins)
+
+    def _table_instrument(self, row: int) -> Instrument:
+        try:
+            return self._table_instruments[row]
+        except KeyError:
+            ins = self._table_instruments[row] = Instrument(
+                self._instrument_table.record(row), self._future_info_store.get_tick_size, market=MARKET.CN
+            )
+            return ins
+
+    def _instruments_of_rows(self, instrument_map, key, rows) -> Optional[Dict[datetime, Instrument]]:
+        if not len(rows):
+            return None
+        instruments = instrument_map[key] = {}
+        for row in rows:
+            ins = self._table_instrument(row)
+            instruments[ins.listed_date] = ins
+        return instruments
+
+    def _instruments_of_id(self, order_book_id: str) -> Optional[Dict[datetime, Instrument]]:
+        try:
+            return self._id_instrument_map[order_book_id]
+        except KeyError:
+            return self._instruments_of_rows(
+                self._id_instrument_map, order_book_id, self._instrument_table.rows_of_id(order_book_id)
+            )
+
+    def _instruments_of_symbol(self, symbol: str) -> Optional[Dict[datetime, Instrument]]:
+        try:
+            return self._sym_instrument_map[symbol]
+        except KeyError:
+            return self._instruments_of_rows(
+                self._sym_instrument_map, symbol, self._instrument_table.rows_of_symbol(symbol)
+            )
     
     def register_dividend_store(self, instrument_type: INSTRUMENT_TYPE, dividend_store: AbstractDividendStore, market: MARKET = MARKET.CN):
         self._dividend_stores[instrument_type, market] = dividend_store
@@ -180,7 +301,8 @@ class BaseDataSource(AbstractDataSource):
         return dividend_store.get_dividend(instrument.order_book_id)
 
     def get_trading_minutes_for(self, instrument, trading_dt):
-        raise NotImplementedError
+        bars = self._minute_bars_of_day(instrument, convert_date_to_int(trading_dt) // 1000000)
+        return bars["datetime"].tolist()
 
     def get_trading_calendars(self) -> Dict[TRADING_CALENDAR_TYPE, pd.DatetimeIndex]:
         return {t: store.get_trading_calendar() for t, store in self._calendar_stores.items()}
@@ -189,15 +311,34 @@ class BaseDataSource(AbstractDataSource):
         if id_or_syms is not None:
             seen = set()
             for i in id_or_syms:
-                v = self._id_or_sym_instrument_map.get(i)
+                v = self._instruments_of_id(i) or self._instruments_of_symbol(i)
                 if v:
                     for ins in v.values():
                         if ins not in seen:
                             seen.add(ins)
                             yield ins
         else:
-            for t in types or self._grouped_instruments.keys():
-                yield from self._grouped_instruments[t]
+            if types:
+                types = [INSTRUMENT_TYPE[t] for t in types]
+            else:
+                types = [INSTRUMENT_TYPE[t] for t in self._instrument_table.types]
+                types.extend(t for t in self._grouped_instruments if t not in types)
+            for t in types:
+                for row in self._instrument_table.select([t.value]):
+                    yield self._table_instrument(row)
+                yield from self._grouped_instruments.get(t, ())
+
+    def get_instruments_frame(
+        self, types: Optional[Iterable[INSTRUMENT_TYPE]] = None, dt: Optional[datetime] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        if self._grouped_instruments:
+            # 存在通过 register_instruments 注册的合约时，逐个合约构造
+            return super(BaseDataSource, self).get_instruments_frame(types, dt, fields)
+        if types:
+            types = [INSTRUMENT_TYPE[t].value for t in types]
+        rows = self._instrument_table.select(types, dt)
+        return self._instrument_table.to_frame(rows, fields)
 
     def get_share_transformation(self, order_book_id):
         return self._share_transformation.get_share_transformation(order_book_id)
@@ -210,6 +351,18 @@ class BaseDataSource(AbstractDataSource):
         else:
             return [False] * len(dates)
 
+    def is_suspended_many(self, order_book_ids: Sequence[str], date: DateLike) -> List[bool]:
+        result = [None] * len(order_book_ids)  # type: List[Optional[bool]]
+        pending = list(range(len(order_book_ids)))
+        for date_set in self._suspend_days:
+            if not pending:
+                break
+            contains = date_set.contains_many([order_book_ids[i] for i in pending], date)
+            for i, c in zip(pending, contains):
+                result[i] = c
+            pending = [i for i in pending if result[i] is None]
+        return [bool(r) for r in result]
+
     def is_st_stock(self, order_book_id: str, dates: Sequence[DateLike]) -> List[bool]:
         result = self._st_stock_days.contains(order_book_id, dates)
         return result if result is not None else [False] * len(dates)
@@ -223,8 +376,80 @@ class BaseDataSource(AbstractDataSource):
         bars = self._all_day_bars_of(instrument)
         return bars[bars['volume'] > 0]
 
+    @lru_cache(None)
+    def _cum_factors_of(self, instrument, filtered):
+        # 与 _filtered_day_bars / _all_day_bars_of 逐行对齐的累计复权因子
+        bars = self._filtered_day_bars(instrument) if filtered else self._all_day_bars_of(instrument)
+        return cum_factors_of_bars(bars, self.get_ex_cum_factor(instrument))
+
+    def _cum_factors_slice(self, instrument, filtered, left, right):
+        if not self._precompute_adjust_factors:
+            return None
+        cum_factors = self._cum_factors_of(instrument, filtered)
+        return None if cum_factors is None else cum_factors[left:right]
+
+    def _minute_bar_store_of(self, instrument) -> AbstractMinuteBarStore:
+        try:
+            return self._minute_bar_stores[instrument.type, instrument.market]
+        except KeyError:
+            raise NotImplementedError(_("minute bars of {} are not available in the bundle").format(
+                instrument.order_book_id
+            ))
+
+    def _trading_date_of_dt(self, dt: datetime) -> int:
+        # 分钟线及 tick 所属的交易日，与 get_future_trading_date 的规则一致：晚八点至次日凌晨四点为下一交易日的夜盘
+        dt = dt - timedelta(hours=4)
+        trading_dates = self._trading_date_ints()
+        date_int = dt.year * 10000 + dt.month * 100 + dt.day
+        pos = trading_dates.searchsorted(date_int)
+        if pos < len(trading_dates) and trading_dates[pos] == date_int and dt.hour >= 16:
+            pos += 1
+        return int(trading_dates[pos]) if pos < len(trading_dates) else date_int
+
+    @lru_cache(None)
+    def _minute_day_offsets(self, instrument) -> Tuple[np.ndarray, np.ndarray]:
+        index = self._minute_bar_store_of(instrument).get_day_index(instrument.order_book_id)
+        return index["trading_date"], np.concatenate([[0], np.cumsum(index["count"], dtype=np.int64)])
+
+    @lru_cache(4096)
+    def _minute_bars_of_day(self, instrument, trading_date: int) -> np.ndarray:
+        return self._minute_bar_store_of(instrument).get_bars(instrument.order_book_id, trading_date, trading_date)
+
+    def _history_minute_bars(self, instrument, bar_count, fields, dt, adjust_type, adjust_orig):
+        store = self._minute_bar_store_of(instrument)
+        dates, offsets = self._minute_day_offsets(instrument)
+        end = dates.searchsorted(self._trading_date_of_dt(dt), side="right")
+        if bar_count is None:
+            start = 0
+        else:
+            # 通过交易日索引确定需要读取的交易日区间；dt 所在交易日中 dt 之后的分钟线会被剔除，故多读取该日的条数
+            need = bar_count + offsets[end] - offsets[max(end - 1, 0)]
+            start = max(offsets.searchsorted(offsets[end] - need, side="right") - 1, 0)
+        if start < end:
+            bars = store.get_bars(instrument.order_book_id, dates[start], dates[end - 1])
+        else:
+            bars = np.empty(0, dtype=store.DEFAULT_DTYPE)
+        if not self._are_fields_valid(fields, bars.dtype.names):
+            raise RQInvalidArgument("invalid fields: {}".format(fields))
+
+        i = bars["datetime"].searchsorted(np.int64(convert_dt_to_int(dt)).astype(bars.dtype["datetime"]), side="right")
+        bars = bars[0 if bar_count is None else max(i - bar_count, 0):i]
+        if not (adjust_type == 'none' or instrument.type in {'Future', 'INDX'} or (
+            isinstance(fields, str) and fields not in FIELDS_REQUIRE_ADJUSTMENT
+        )):
+            # 期货、指数及不涉及价格的字段无需复权
+            bars = adjust_bars(bars, self.get_ex_cum_factor(instrument), fields, adjust_type, adjust_orig)
+        return bars if fields is None else bars[fields]
+
     def get_bar(self, instrument, dt, frequency):
         # type: (Instrument, Union[datetime, date], str) -> Optional[np.ndarray]
+        if frequency == '1m':
+            bars = self._minute_bars_of_day(instrument, self._trading_date_of_dt(dt))
+            dt_int = np.int64(convert_dt_to_int(dt)).astype(bars.dtype["datetime"])
+            pos = bars["datetime"].searchsorted(dt_int)
+            if pos >= len(bars) or bars["datetime"][pos] != dt_int:
+                return None
+            return bars[pos]
         if frequency != '1d':
             raise NotImplementedError
 
@@ -238,6 +463,38 @@ class BaseDataSource(AbstractDataSource):
 
         return bars[pos]
 
+    def get_bars_field(self, instruments, dt, frequency, field):
+        # type: (Sequence[Instrument], Union[datetime, date], str, str) -> np.ndarray
+        # 子类重写了 get_bar 或 bundle 中缺少相应的行情时，逐个合约调用 get_bar，保证与 get_bar 的结果一致
+        stores = {'1m': self._minute_bar_stores, '1d': self._day_bar_stores}.get(frequency)
+        if type(self).get_bar is not BaseDataSource.get_bar or stores is None or not all(
+            (ins.type, ins.market) in stores for ins in instruments
+        ):
+            return super(BaseDataSource, self).get_bars_field(instruments, dt, frequency, field)
+
+        if frequency == '1m':
+            trading_date = self._trading_date_of_dt(dt)
+            dt_int = convert_dt_to_int(dt)
+
+            def bars_of(ins):
+                return self._minute_bars_of_day(ins, trading_date)
+        elif frequency == '1d':
+            dt_int = convert_date_to_int(dt)
+            bars_of = self._all_day_bars_of
+
+        # 与 get_bar 逻辑一致，但省去了逐个合约构造 Bar 对象及层层调用的开销
+        result = np.full(len(instruments), np.nan)
+        for i, instrument in enumerate(instruments):
+            bars = bars_of(instrument)
+            if len(bars) <= 0:
+                continue
+            datetimes = bars['datetime']
+            key = datetimes.dtype.type(dt_int)
+            pos = datetimes.searchsorted(key)
+            if pos < len(bars) and datetimes[pos] == key:
+                result[i] = bars[pos][field]
+        return result
+
     OPEN_AUCTION_BAR_FIELDS = ["datetime", "open", "limit_up", "limit_down", "volume", "total_turnover"]
 
     def get_open_auction_bar(self, instrument, dt):
@@ -288,31 +545,21 @@ class BaseDataSource(AbstractDataSource):
             factors = np.concatenate([np.array([(0, 1.0)], dtype=factors.dtype), factors])
         return factors
 
-    def _update_weekly_trading_date_index(self, idx):
-        env = Environment.get_instance()
-        if env.data_proxy.is_trading_date(idx):
-            return idx
-        return env.data_proxy.get_previous_trading_date(idx)
+    @lru_cache(None)
+    def _trading_date_ints(self) -> np.ndarray:
+        calendar = self._calendar_stores[TRADING_CALENDAR_TYPE.CN_STOCK].get_trading_calendar()
+        return np.asarray(calendar.year * 10000 + calendar.month * 100 + calendar.day, dtype=np.int64)
+
+    @lru_cache(None)
+    def _week_groups_of(self, instrument, filtered) -> WeekGroups:
+        bars = self._filtered_day_bars(instrument) if filtered else self._all_day_bars_of(instrument)
+        return week_groups(bars['datetime'], self._trading_date_ints())
 
     def resample_week_bars(self, bars, bar_count: Optional[int], fields: Union[str, List[str]]):
-        df_bars: pd.DataFrame = pd.DataFrame(bars)
-        df_bars['datetime'] = df_bars.apply(lambda x: convert_int_to_datetime(x['datetime']), axis=1)
-        df_bars = df_bars.set_index('datetime')
-        nead_fields = fields
-        if isinstance(nead_fields, str):
-            nead_fields = [nead_fields]
-        hows = {field: BAR_RESAMPLE_FIELD_METHODS[field] for field in nead_fields if field in BAR_RESAMPLE_FIELD_METHODS}
-        df_bars = df_bars.resample('W-Fri').agg(hows)  # type: ignore
-        df_bars.index = df_bars.index.map(self._update_weekly_trading_date_index)
-        df_bars = cast(pd.DataFrame, df_bars[~df_bars.index.duplicated(keep='first')])
-        df_bars.sort_index(inplace=True)
+        groups = week_groups(bars['datetime'], self._trading_date_ints())
         if bar_count is not None:
-            df_bars = cast(pd.DataFrame, df_bars[-bar_count:])
-        df_bars = df_bars.reset_index()
-        df_bars['datetime'] = df_bars.apply(lambda x: np.uint64(convert_date_to_int(x['datetime'].date())), axis=1)  # type: ignore
-        df_bars = df_bars.set_index('datetime')
-        bars = df_bars.to_records()
-        return bars
+            groups = WeekGroups(*(a[-bar_count:] for a in groups))
+        return resample_by_week_groups(bars, groups, fields)
 
     def history_bars(
         self, 
@@ -327,10 +574,13 @@ class BaseDataSource(AbstractDataSource):
         adjust_orig: Optional[datetime] = None
     ) -> Optional[np.ndarray]:
 
+        if frequency == '1m':
+            return self._history_minute_bars(instrument, bar_count, fields, dt, adjust_type, adjust_orig)
         if frequency != '1d' and frequency != '1w':
             raise NotImplementedError
 
-        if skip_suspended and instrument.type == 'CS':
+        filtered = skip_suspended and instrument.type == 'CS'
+        if filtered:
             bars = self._filtered_day_bars(instrument)
         else:
             bars = self._all_day_bars_of(instrument)
@@ -348,27 +598,27 @@ class BaseDataSource(AbstractDataSource):
                 monday = dt - timedelta(days=dt.weekday())
                 monday = np.uint64(convert_date_to_int(monday))
                 i = bars['datetime'].searchsorted(monday, side='left')
-            
-            if bar_count is None:
-                left = 0
-            else:
-                left = i - bar_count * 5 if i >= bar_count * 5 else 0
+
+            # 周线的分组按合约缓存，每次调用只需对所取的若干周日线做一次聚合
+            groups = self._week_groups_of(instrument, filtered)
+            last = groups.starts.searchsorted(i, side='left')
+            first = 0 if bar_count is None else max(last - bar_count, 0)
+            groups = WeekGroups(groups.starts[first:last], np.minimum(groups.ends[first:last], i), groups.labels[first:last])
+            left = groups.starts[0] if len(groups.starts) else i
             bars = bars[left:i]
 
             resample_fields: Union[str, List[str]] = list(bars.dtype.names) if fields is None else fields
-            if adjust_type == 'none' or instrument.type in {'Future', 'INDX'}:
-                # 期货及指数无需复权
-                week_bars = self.resample_week_bars(bars, bar_count, resample_fields)
-                return week_bars if fields is None else week_bars[fields]
-
-            if isinstance(fields, str) and fields not in FIELDS_REQUIRE_ADJUSTMENT:
-                week_bars = self.resample_week_bars(bars, bar_count, resample_fields)
-                return week_bars if fields is None else week_bars[fields]
-
-            adjust_bars_date = adjust_bars(bars, self.get_ex_cum_factor(instrument),
-                                           fields, adjust_type, adjust_orig)
-            adjust_week_bars = self.resample_week_bars(adjust_bars_date, bar_count, resample_fields)
-            return adjust_week_bars if fields is None else adjust_week_bars[fields]
+            if not (adjust_type == 'none' or instrument.type in {'Future', 'INDX'} or (
+                isinstance(fields, str) and fields not in FIELDS_REQUIRE_ADJUSTMENT
+            )):
+                # 期货、指数及不涉及价格的字段无需复权
+                bars = adjust_bars(bars, self.get_ex_cum_factor(instrument), fields, adjust_type, adjust_orig,
+                                   self._cum_factors_slice(instrument, filtered, left, i))
+            week_bars = resample_by_week_groups(
+                bars, WeekGroups(groups.starts - left, groups.ends - left, groups.labels), resample_fields
+            )
+            return week_bars if fields is None else week_bars[fields]
+
         i = bars['datetime'].searchsorted(np.uint64(convert_date_to_int(dt)), side='right')
         if bar_count is None:
             left = 0
@@ -382,11 +632,66 @@ class BaseDataSource(AbstractDataSource):
         if isinstance(fields, str) and fields not in FIELDS_REQUIRE_ADJUSTMENT:
             return bars if fields is None else bars[fields]
 
-        bars = adjust_bars(bars, self.get_ex_cum_factor(instrument),
-                           fields, adjust_type, adjust_orig)
+        cum_factors = self._cum_factors_slice(instrument, filtered, left, i)
+        if isinstance(fields, str) and cum_factors is not None:
+            return adjust_field(bars, self.get_ex_cum_factor(instrument), fields, adjust_type, adjust_orig, cum_factors)
+
+        bars = adjust_bars(bars, self.get_ex_cum_factor(instrument), fields, adjust_type, adjust_orig, cum_factors)
 
         return bars if fields is None else bars[fields]
 
+    def history_bars_panel(
+        self,
+        instruments: List[Instrument],
+        bar_count: int,
+        frequency: str,
+        fields: List[str],
+        dt: datetime,
+        include_now: bool = False,
+        adjust_type: str = 'pre',
+        adjust_orig: Optional[datetime] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # 子类重写了 history_bars 时逐个合约调用 history_bars，保证与其结果一致
+        if frequency != '1d' or type(self).history_bars is not BaseDataSource.history_bars:
+            return super(BaseDataSource, self).history_bars_panel(
+                instruments, bar_count, frequency, fields, dt, include_now, adjust_type, adjust_orig
+            )
+
+        # 日线按交易日历对齐，每个合约只需对所取区间做一次切片及复权
+        trading_dates = self._trading_date_ints()
+        i = trading_dates.searchsorted(convert_date_to_int(dt) // 1000000, side='right')
+        dates = trading_dates[max(i - bar_count, 0):i] * 1000000
+        values = np.full((len(dates), len(instruments), len(fields)), np.nan)
+        if len(dates) == 0:
+            return dates.astype(np.uint64), values
+
+        for j, instrument in enumerate(instruments):
+            bars = self._all_day_bars_of(instrument)
+            # 保持与日线 datetime 字段类型一致，避免 searchsorted 时整列转换类型
+            keys = dates.astype(bars.dtype['datetime'], copy=False)
+            left = bars['datetime'].searchsorted(keys[0], side='left')
+            right = bars['datetime'].searchsorted(keys[-1], side='right')
+            if left >= right:
+                continue
+            bars = bars[left:right]
+            rows = keys.searchsorted(bars['datetime'])
+
+            ex_factors = cum_factors = None
+            if adjust_type != 'none' and instrument.type not in {'Future', 'INDX'}:
+                ex_factors = self.get_ex_cum_factor(instrument)
+                cum_factors = self._cum_factors_slice(instrument, False, left, right)
+                if cum_factors is None:
+                    cum_factors = cum_factors_of_bars(bars, ex_factors)
+
+            for k, field in enumerate(fields):
+                if field not in bars.dtype.names:
+                    continue
+                if field in FIELDS_REQUIRE_ADJUSTMENT:
+                    values[rows, j, k] = adjust_field(bars, ex_factors, field, adjust_type, adjust_orig, cum_factors)
+                else:
+                    values[rows, j, k] = bars[field]
+        return dates.astype(np.uint64), values
+
     def current_snapshot(self, instrument, frequency, dt):
         raise NotImplementedError
 
@@ -405,7 +710,7 @@ class BaseDataSource(AbstractDataSource):
         accounts = Environment.get_instance().config.base.accounts
         if not (DEFAULT_ACCOUNT_TYPE.STOCK in accounts or DEFAULT_ACCOUNT_TYPE.FUTURE in accounts):
             return date.min, date.max
-        if frequency in ['tick', '1d']:
+        if frequency in ['tick', '1d', '1m']:
             s, e = self._day_bar_stores[INSTRUMENT_TYPE.INDX, MARKET.CN].get_date_range('000001.XSHG')
             return convert_int_to_date(s).date(), convert_int_to_date(e).date()
 
@@ -416,11 +721,62 @@ class BaseDataSource(AbstractDataSource):
     def get_futures_trading_parameters(self, instrument: Instrument, dt: datetime) -> FuturesTradingParameters:
         return self._future_info_store.get_future_info(instrument.order_book_id, instrument.underlying_symbol)
 
+    def _tick_store_of(self, instrument) -> AbstractTickStore:
+        try:
+            return self._tick_stores[instrument.type, instrument.market]
+        except KeyError:
+            raise NotImplementedError(_("ticks of {} are not available in the bundle").format(instrument.order_book_id))
+
+    @staticmethod
+    def _tick_dt_int(dt: datetime) -> int:
+        return convert_dt_to_int(dt) * 1000 + dt.microsecond // 1000
+
+    @staticmethod
+    def _ticks_of_block(instrument, block):
+        # 将按列存储的一块 tick 逐行转换为 TickObject，标量列预先转换为 list 以减少逐个取值的开销
+        scalar_names = [name for name, values in block.items() if values.ndim == 1]
+        book_names = [name for name, values in block.items() if values.ndim > 1]
+        books = [block[name] for name in book_names]
+        for i, row in enumerate(zip(*(block[name].tolist() for name in scalar_names))):
+            tick = dict(zip(scalar_names, row))
+            for name, values in zip(book_names, books):
+                tick[name] = values[i]
+            yield TickObject(instrument, tick)
+
+    def _iter_ticks(self, instrument, key, trading_date, start_dt):
+        for block in self._tick_store_of(instrument).iter_blocks(instrument.order_book_id, trading_date, start_dt):
+            for dt, tick in zip(block["datetime"].tolist(), self._ticks_of_block(instrument, block)):
+                yield dt, key, tick
+
     def get_merge_ticks(self, order_book_id_list, trading_date, last_dt=None):
-        raise NotImplementedError
+        # 各合约的 tick 分块读取后以堆归并，按时间顺序逐个产出，不会一次性加载整个交易日的数据；同一时刻的 tick 按 order_book_id_list 的顺序排列
+        trading_date = convert_date_to_int(trading_date) // 1000000
+        start_dt = None if last_dt is None else self._tick_dt_int(last_dt)
+        iterators = []
+        for key, order_book_id in enumerate(order_book_id_list):
+            instruments = list(self.get_instruments([order_book_id]))
+            if instruments:
+                iterators.append(self._iter_ticks(instruments[-1], key, trading_date, start_dt))
+        for _, _, tick in heapq.merge(*iterators):
+            yield tick
 
     def history_ticks(self, instrument, count, dt):
-        raise NotImplementedError
+        # 自 dt 所在交易日起向前逐日读取，直到取满 count 个 tick
+        store = self._tick_store_of(instrument)
+        trading_dates = store.get_trading_dates()
+        pos = trading_dates.searchsorted(self._trading_date_of_dt(dt), side="right")
+        end_dt = self._tick_dt_int(dt)
+        listed_date = convert_date_to_int(instrument.listed_date) // 1000000
+        chunks = []
+        remaining = count
+        for trading_date in trading_dates[:pos][::-1]:
+            if remaining <= 0 or trading_date < listed_date:
+                break
+            ticks = store.get_ticks(instrument.order_book_id, int(trading_date), end_dt, remaining)
+            if ticks is not None:
+                chunks.append(ticks)
+                remaining -= len(ticks["datetime"])
+        return [tick for block in reversed(chunks) for tick in self._ticks_of_block(instrument, block)]
 
     def get_algo_bar(self, id_or_ins: Union[str, Instrument], start_min: int, end_min: int, dt: datetime) -> Optional[np.ndarray]:
         raise NotImplementedError("open source rqalpha not support algo order")
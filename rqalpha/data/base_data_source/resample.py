@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+from typing import NamedTuple, List, Union
+
+import numpy as np
+
+
+BAR_RESAMPLE_FIELD_METHODS = {
+    "open": "first",
+    "close": "last",
+    "iopv": "last",
+    "high": "max",
+    "low": "min",
+    "total_turnover": "sum",
+    "volume": "sum",
+    "num_trades": "sum",
+    "acc_net_value": "last",
+    "unit_net_value": "last",
+    "discount_rate": "last",
+    "settlement": "last",
+    "prev_settlement": "last",
+    "open_interest": "last",
+    "basis_spread": "last",
+    "contract_multiplier": "last",
+    "strike_price": "last",
+}
+
+
+class WeekGroups(NamedTuple):
+    """
+    日线按周（以周五为界）分组的结果，第 k 周对应日线的 [starts[k], ends[k]) 区间，labels[k] 为该周最后一个交易日（YYYYMMDD000000）。
+    区间内没有日线但存在交易日的周（如整周停牌）以 starts[k] == ends[k] 表示。
+    """
+    starts: np.ndarray
+    ends: np.ndarray
+    labels: np.ndarray
+
+
+def date_int_to_days(date_ints):
+    # type: (np.ndarray) -> np.ndarray
+    # YYYYMMDD 格式的整数转换为距 1970-01-01 的天数
+    date_ints = np.asarray(date_ints, dtype=np.int64)
+    years = (date_ints // 10000 - 1970).astype("datetime64[Y]")
+    months = (date_ints // 100 % 100 - 1).astype("timedelta64[M]")
+    days = (date_ints % 100 - 1).astype("timedelta64[D]")
+    return ((years + months).astype("datetime64[D]") + days).astype(np.int64)
+
+
+def week_groups(dt_ints, trading_dates):
+    # type: (np.ndarray, np.ndarray) -> WeekGroups
+    """
+    :param dt_ints: 日线的 datetime 字段，YYYYMMDDHHMMSS 格式的整数，升序
+    :param trading_dates: 交易日历，YYYYMMDD 格式的整数，升序
+    """
+    if len(dt_ints) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return WeekGroups(empty, empty, np.empty(0, dtype=np.uint64))
+    days = date_int_to_days(np.asarray(dt_ints, dtype=np.int64) // 1000000)
+    # 1970-01-01 为周四，(days + 3) % 7 即为 weekday
+    fridays = days + (4 - (days + 3) % 7) % 7
+    all_fridays = np.arange(fridays[0], fridays[-1] + 1, 7)
+    starts = fridays.searchsorted(all_fridays, side="left")
+    ends = fridays.searchsorted(all_fridays, side="right")
+
+    # 周线以该周最后一个交易日为日期标签，不含交易日的周与前一周标签相同，予以剔除
+    pos = date_int_to_days(trading_dates).searchsorted(all_fridays, side="right") - 1
+    labels = np.asarray(trading_dates, dtype=np.uint64)[np.maximum(pos, 0)]
+    keep = np.ones(len(labels), dtype=bool)
+    keep[1:] = labels[1:] != labels[:-1]
+    return WeekGroups(starts[keep], ends[keep], labels[keep] * np.uint64(1000000))
+
+
+def _first(values, starts, ends):
+    valid = ~np.isnan(values)
+    if valid.all():
+        return values[starts]
+    idx = np.minimum.reduceat(np.where(valid, np.arange(len(values)), len(values)), starts)
+    return np.where(idx < ends, values[np.minimum(idx, len(values) - 1)], np.nan)
+
+
+def _last(values, starts, ends):
+    valid = ~np.isnan(values)
+    if valid.all():
+        return values[ends - 1]
+    idx = np.maximum.reduceat(np.where(valid, np.arange(len(values)), -1), starts)
+    return np.where(idx >= starts, values[np.maximum(idx, 0)], np.nan)
+
+
+_REDUCERS = {
+    "first": _first,
+    "last": _last,
+    "max": lambda values, starts, ends: np.fmax.reduceat(values, starts),
+    "min": lambda values, starts, ends: np.fmin.reduceat(values, starts),
+    "sum": lambda values, starts, ends: np.add.reduceat(np.where(np.isnan(values), 0, values), starts),
+}
+
+
+def resample_by_week_groups(bars, groups, fields):
+    # type: (np.ndarray, WeekGroups, Union[str, List[str]]) -> np.ndarray
+    """
+    按 groups 将日线聚合为周线，bars 需覆盖 groups 中的所有非空周。
+    返回包含 datetime 字段及 fields 中可聚合字段的 record 数组；空周的价格字段为 nan，累计字段为 0。
+    """
+    if isinstance(fields, str):
+        fields = [fields]
+    hows = [(f, BAR_RESAMPLE_FIELD_METHODS[f]) for f in fields if f in BAR_RESAMPLE_FIELD_METHODS]
+    result = np.empty(len(groups.labels), dtype=[("datetime", "<u8")] + [(f, "<f8") for f, _ in hows])
+    result["datetime"] = groups.labels
+    if len(groups.labels) == 0:
+        return result.view(np.recarray)
+
+    non_empty = groups.ends > groups.starts
+    offset = groups.starts[non_empty][0] if non_empty.any() else 0
+    starts = groups.starts[non_empty] - offset
+    ends = groups.ends[non_empty] - offset
+    for f, how in hows:
+        result[f] = 0 if how == "sum" else np.nan
+        if len(starts):
+            values = np.asarray(bars[f][offset:offset + ends[-1]], dtype=np.float64)
+            result[f][non_empty] = _REDUCERS[how](values, starts, ends)
+    return result.view(np.recarray)
@@ -16,7 +16,7 @@
 #         详细的授权流程，请联系 public@ricequant.com 获取。
 
 import abc
-from typing import List, Optional, Sequence, Iterable
+from typing import Dict, List, Optional, Sequence, Iterable
 
 import numpy as np
 import pandas
@@ -37,6 +37,44 @@ class AbstractDayBarStore:
         raise NotImplementedError
 
 
+class AbstractMinuteBarStore:
+    # 分钟线的 dtype，get_bars 返回的数组须与之一致
+    DEFAULT_DTYPE = None
+
+    @abc.abstractmethod
+    def get_day_index(self, order_book_id):
+        # type: (str) -> np.ndarray
+        # 按交易日升序排列的 (trading_date, count) 结构化数组，trading_date 为 YYYYMMDD 格式的整数，count 为该交易日的分钟线条数
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_bars(self, order_book_id, start_date, end_date):
+        # type: (str, int, int) -> np.ndarray
+        # 交易日在 [start_date, end_date] 内的分钟线，按时间升序排列；start_date、end_date 为 YYYYMMDD 格式的整数
+        raise NotImplementedError
+
+
+class AbstractTickStore:
+    @abc.abstractmethod
+    def get_trading_dates(self):
+        # type: () -> np.ndarray
+        # 存在 tick 数据的交易日，YYYYMMDD 格式的整数，升序
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def iter_blocks(self, order_book_id, trading_date, start_dt=None):
+        # type: (str, int, Optional[int]) -> Iterable[Dict[str, np.ndarray]]
+        # 按时间顺序分块返回交易日 trading_date 中 datetime 晚于 start_dt 的 tick，每块为 {字段名: 数组}
+        # datetime 为 YYYYMMDDHHMMSSmmm 格式的整数
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_ticks(self, order_book_id, trading_date, end_dt, count):
+        # type: (str, int, Optional[int], int) -> Optional[Dict[str, np.ndarray]]
+        # 交易日 trading_date 中 datetime 不晚于 end_dt（为 None 时不限）的最后 count 个 tick，没有数据时返回 None
+        raise NotImplementedError
+
+
 class AbstractCalendarStore:
     @abc.abstractmethod
     def get_trading_calendar(self):
@@ -51,6 +89,15 @@ class AbstractDateSet:
         # 若 DateSet 中不包含该 order_book_id 的信息则返回 None，否则返回 List[bool]
         raise NotImplementedError
 
+    def contains_many(self, order_book_ids, date):
+        # type: (Sequence[str], DateLike) -> List[Optional[bool]]
+        # 批量查询多个 order_book_id 在同一日期的情况，不包含对应 order_book_id 信息的位置为 None
+        result = []
+        for order_book_id in order_book_ids:
+            contains = self.contains(order_book_id, [date])
+            result.append(None if contains is None else contains[0])
+        return result
+
 
 class AbstractDividendStore:
     @abc.abstractmethod
@@ -22,13 +22,15 @@ import os
 import sys
 import pickle
 from copy import copy
+from itertools import repeat
 from datetime import datetime
 from contextlib import contextmanager
-from typing import Dict, NamedTuple, List
+from typing import Dict, Iterable, Mapping, NamedTuple, List, Optional, Sequence, Tuple
 
 import h5py
 import numpy as np
 import pandas
+from filelock import FileLock
 
 from rqalpha.const import COMMISSION_TYPE, MARKET, INSTRUMENT_TYPE
 from rqalpha.model.instrument import Instrument
@@ -36,10 +38,12 @@ from rqalpha.utils.datetime_func import convert_date_to_date_int
 from rqalpha.utils.i18n import gettext as _
 from rqalpha.utils.functools import lru_cache
 from rqalpha.utils.logger import system_log
+from rqalpha.utils.typing import DateLike
 
 from .storage_interface import (AbstractCalendarStore, AbstractDateSet,
                                 AbstractDayBarStore, AbstractDividendStore,
-                                AbstractSimpleFactorStore)
+                                AbstractMinuteBarStore, AbstractSimpleFactorStore,
+                                AbstractTickStore)
 from .deprecated import InstrumentStore
 
 class FuturesTradingParameters(NamedTuple):
@@ -146,6 +150,325 @@ def load_instruments_from_pkl(pkl_path: str, future_info_store: FutureInfoStore)
         return instruments
 
 
+_MISSING = object()
+
+
+class InstrumentTable(object):
+    """
+    列式存储的合约表，bundle 中对应 instruments.h5。
+
+    每个合约字段存储为一列，字符串列存储为排序后的 UTF-8 定长取值表及各行的取值编号，载入时无需逐个解码字符串。
+    另有按 Instrument 语义修正过的上市、退市日期列及连续合约标记，按类型、日期的筛选及按 order_book_id、symbol 的查找
+    均在列上以向量化的方式完成。合约记录只在被访问时才从各列组装为字典，不必在启动时为全部合约构造 Instrument 对象。
+    """
+    VERSION = 2
+
+    _STR, _INT, _FLOAT, _PICKLE = "str", "int", "float", "pickle"
+    _DAY_BASED_DE_LISTING_TYPES = (INSTRUMENT_TYPE.FUTURE.value, INSTRUMENT_TYPE.OPTION.value)
+
+    def __init__(self, fields, kinds, columns, categories, present, listed_dates, de_listed_dates, continuous):
+        # type: (List[str], Dict[str, str], Dict[str, np.ndarray], Dict[str, np.ndarray], Dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray) -> None
+        type_names = [t.decode("utf-8") for t in categories["type"]]
+        supported = np.array([t in INSTRUMENT_TYPE for t in type_names], dtype=bool)
+        unique_codes, first_rows, inverse = np.unique(columns["type"], return_index=True, return_inverse=True)
+        for code in unique_codes[~supported[unique_codes]]:
+            system_log.warning(f"Unsupported type: {type_names[code]}")
+        if not supported[unique_codes].all():
+            mask = supported[columns["type"]]
+            columns = {f: c[mask] for f, c in columns.items()}
+            present = {f: p[mask] for f, p in present.items()}
+            listed_dates, de_listed_dates, continuous = listed_dates[mask], de_listed_dates[mask], continuous[mask]
+            unique_codes, first_rows, inverse = np.unique(columns["type"], return_index=True, return_inverse=True)
+
+        self._fields = fields
+        self._kinds = kinds
+        self._columns = columns
+        self._categories = categories
+        self._present = present
+        self._code_orders = {}  # type: Dict[str, Tuple[np.ndarray, np.ndarray]]
+
+        self._continuous = continuous
+        # 与 load_instruments_from_pkl 一致，连续合约的上市日期统一为 1990-01-01
+        listed_dates = listed_dates.copy()
+        listed_dates[continuous] = np.datetime64(Instrument.DEFAULT_LISTED_DATE, "us")
+        self._listed_dates = listed_dates
+        self._de_listed_dates = de_listed_dates
+        self._day_based_de_listing = np.isin(
+            columns["type"], [type_names.index(t) for t in self._DAY_BASED_DE_LISTING_TYPES if t in type_names]
+        )
+
+        # 按类型首次出现的顺序分组
+        self._type_rows = {
+            type_names[unique_codes[k]]: np.flatnonzero(inverse == k) for k in np.argsort(first_rows)
+        }  # type: Dict[str, np.ndarray]
+
+    def __len__(self):
+        return len(self._listed_dates)
+
+    @property
+    def types(self):
+        # type: () -> List[str]
+        return list(self._type_rows.keys())
+
+    @classmethod
+    def _encode(cls, records):
+        # type: (List[Dict]) -> Dict
+        fields = []  # type: List[str]
+        seen = set()
+        for r in records:
+            for f in r:
+                if f not in seen:
+                    seen.add(f)
+                    fields.append(f)
+        if "type" not in seen:
+            # 合约表按类型分组，records 为空时也需要 type 列
+            fields.append("type")
+
+        kinds, columns, categories, present = {}, {}, {}, {}
+        for f in fields:
+            values = [r.get(f, _MISSING) for r in records]
+            mask = np.array([v is not _MISSING for v in values], dtype=bool)
+            kinds[f], columns[f], category = cls._encode_column(values, mask)
+            if category is not None:
+                categories[f] = category
+            if not mask.all():
+                present[f] = mask
+
+        listed_dates = cls._fix_dates(records, "listed_date", Instrument.DEFAULT_LISTED_DATE)
+        de_listed_dates = cls._fix_dates(records, "de_listed_date", Instrument.DEFAULT_DE_LISTED_DATE)
+        continuous = np.array([
+            r.get("type") == INSTRUMENT_TYPE.FUTURE.value and bool(Instrument.is_future_continuous_contract(
+                r["order_book_id"]
+            )) for r in records
+        ], dtype=bool)
+        return {
+            "fields": fields, "kinds": kinds, "columns": columns, "categories": categories, "present": present,
+            "listed_dates": listed_dates, "de_listed_dates": de_listed_dates, "continuous": continuous,
+        }
+
+    @staticmethod
+    def _fix_dates(records, field, default):
+        # type: (List[Dict], str, datetime) -> np.ndarray
+        # 合约表中日期取值的重复度很高，每个不同的取值只解析一次
+        values = [r.get(field) for r in records]
+        index = {v: i for i, v in enumerate(set(values))}
+        dates = np.array([Instrument._fix_date(v, default) for v in index], dtype="datetime64[us]")
+        return dates[np.array([index[v] for v in values], dtype=np.intp)]
+
+    @classmethod
+    def _encode_column(cls, values, mask):
+        # 返回 (kind, column, categories)，字符串列的 column 为各行在 categories 中的编号
+        present_values = [v for v, p in zip(values, mask) if p]
+        if all(type(v) is str for v in present_values):
+            strings = set(present_values)
+            categories = np.array(sorted(v.encode("utf-8") for v in strings) or [b""], dtype=bytes)
+            # 缺失的行编号为 0，由 present 列标记
+            index = {v.decode("utf-8"): i for i, v in enumerate(categories.tolist())}
+            return cls._STR, np.array([index.get(v, 0) for v in values], dtype=np.int32), categories
+        if all(type(v) is int for v in present_values):
+            try:
+                return cls._INT, np.array([v if type(v) is int else 0 for v in values], dtype=np.int64), None
+            except OverflowError:
+                pass
+        elif all(type(v) is float for v in present_values):
+            return cls._FLOAT, np.array([v if type(v) is float else np.nan for v in values], dtype=np.float64), None
+        column = np.empty(len(values), dtype=object)
+        column[:] = [None if v is _MISSING else v for v in values]
+        return cls._PICKLE, column, None
+
+    @classmethod
+    def from_records(cls, records):
+        # type: (List[Dict]) -> InstrumentTable
+        return cls(**cls._encode(records))
+
+    @classmethod
+    def _write(cls, data, path):
+        # 先写入临时文件再替换，多个进程同时写入或读取时不会读到不完整的文件
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        with h5_file(tmp_path, mode="w") as h5:
+            h5.attrs["version"] = cls.VERSION
+            h5.attrs["fields"] = data["fields"]
+            for f in data["fields"]:
+                kind, column = data["kinds"][f], data["columns"][f]
+                if kind == cls._PICKLE:
+                    ds = h5.create_dataset("columns/" + f, data=np.void(pickle.dumps(column.tolist(), protocol=4)))
+                else:
+                    ds = h5.create_dataset("columns/" + f, data=column)
+                ds.attrs["kind"] = kind
+                if f in data["categories"]:
+                    h5.create_dataset("categories/" + f, data=data["categories"][f])
+                if f in data["present"]:
+                    h5.create_dataset("present/" + f, data=data["present"][f])
+            h5.create_dataset("index/listed_date", data=data["listed_dates"].view(np.int64))
+            h5.create_dataset("index/de_listed_date", data=data["de_listed_dates"].view(np.int64))
+            h5.create_dataset("index/continuous", data=data["continuous"])
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def write(cls, records, path):
+        # type: (List[Dict], str) -> None
+        """
+        将 instruments.pk 中的合约记录写为列式的合约表
+        """
+        cls._write(cls._encode(records), path)
+
+    @classmethod
+    def load(cls, path):
+        # type: (str) -> Optional[InstrumentTable]
+        with h5_file(path) as h5:
+            if h5.attrs.get("version") != cls.VERSION:
+                return None
+            fields = [str(f) for f in h5.attrs["fields"]]
+            kinds, columns, categories, present = {}, {}, {}, {}
+            for f in fields:
+                ds = h5["columns/" + f]
+                kind = kinds[f] = ds.attrs["kind"]
+                if kind == cls._PICKLE:
+                    values = pickle.loads(ds[()].tobytes())
+                    columns[f] = np.empty(len(values), dtype=object)
+                    columns[f][:] = values
+                else:
+                    columns[f] = ds[:]
+                if kind == cls._STR:
+                    categories[f] = h5["categories/" + f][:]
+                if "present/" + f in h5:
+                    present[f] = h5["present/" + f][:]
+            listed_dates = h5["index/listed_date"][:].view("datetime64[us]")
+            de_listed_dates = h5["index/de_listed_date"][:].view("datetime64[us]")
+            continuous = h5["index/continuous"][:]
+        return cls(fields, kinds, columns, categories, present, listed_dates, de_listed_dates, continuous)
+
+    @classmethod
+    def open(cls, path, pkl_path):
+        # type: (str, str) -> InstrumentTable
+        """
+        优先读取合约表；合约表不存在、版本不符或比 instruments.pk 旧（如 instruments.pk 由旧版本工具或 download-bundle 更新）时，
+        从 instruments.pk 构建，并尝试写入合约表供下次启动时直接读取
+        """
+        if os.path.exists(path) and (not os.path.exists(pkl_path) or os.path.getmtime(path) >= os.path.getmtime(pkl_path)):
+            table = cls.load(path)
+            if table is not None:
+                return table
+        with open(pkl_path, "rb") as f:
+            data = cls._encode(pickle.load(f))
+        try:
+            cls._write(data, path)
+        except (OSError, RuntimeError) as e:
+            system_log.debug("failed to cache instrument table to {}: {}".format(path, e))
+        return cls(**data)
+
+    def _rows_of(self, field, key):
+        # type: (str, str) -> np.ndarray
+        if field not in self._columns:
+            return np.empty(0, dtype=np.intp)
+        if self._kinds[field] != self._STR:
+            return np.flatnonzero(self._columns[field] == key)
+        categories = self._categories[field]
+        key = key.encode("utf-8")
+        code = categories.searchsorted(key)
+        # 定长字节串比较时超长的 key 会被截断，需先排除
+        if len(key) > categories.itemsize or code >= len(categories) or categories[code] != key:
+            return np.empty(0, dtype=np.intp)
+        try:
+            order, sorted_codes = self._code_orders[field]
+        except KeyError:
+            order = np.argsort(self._columns[field], kind="stable")
+            sorted_codes = self._columns[field][order]
+            self._code_orders[field] = order, sorted_codes
+        return order[sorted_codes.searchsorted(code, "left"):sorted_codes.searchsorted(code, "right")]
+
+    def rows_of_id(self, order_book_id):
+        # type: (str) -> np.ndarray
+        return self._rows_of("order_book_id", order_book_id)
+
+    def rows_of_symbol(self, symbol):
+        # type: (str) -> np.ndarray
+        return self._rows_of("symbol", symbol)
+
+    def select(self, types=None, dt=None):
+        # type: (Optional[Iterable[str]], Optional[datetime]) -> np.ndarray
+        """
+        返回指定类型且在 dt 上市交易的合约所在的行，按类型分组，组内保持原有顺序
+        """
+        types = self._type_rows.keys() if types is None else types
+        rows = [self._type_rows[t] for t in types if t in self._type_rows]
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+        if dt is None:
+            return rows
+        dt = np.datetime64(dt, "us")
+        de_listed_dates = self._de_listed_dates[rows]
+        # 与 Instrument.active_at 一致，期货、期权在交割日当天仍视为在交易
+        de_listed = np.where(
+            self._day_based_de_listing[rows],
+            de_listed_dates.astype("datetime64[D]") < dt.astype("datetime64[D]"),
+            de_listed_dates <= dt
+        )
+        return rows[(self._listed_dates[rows] <= dt) & ~de_listed]
+
+    def _values(self, field, rows):
+        # type: (str, np.ndarray) -> np.ndarray
+        kind, column = self._kinds[field], self._columns[field][rows]
+        if kind != self._STR:
+            return column
+        categories = self._categories[field]
+        codes, inverse = np.unique(column, return_inverse=True)
+        decoded = np.array([c.decode("utf-8") for c in categories[codes]], dtype=object)
+        return decoded[inverse.reshape(-1)]
+
+    def record(self, row):
+        # type: (int) -> Dict
+        """
+        组装第 row 行的合约记录，与 instruments.pk 中的记录一致
+        """
+        record = {}
+        for f in self._fields:
+            present = self._present.get(f)
+            if present is not None and not present[row]:
+                continue
+            kind, value = self._kinds[f], self._columns[f][row]
+            if kind == self._STR:
+                value = self._categories[f][value].decode("utf-8")
+            elif kind != self._PICKLE:
+                value = value.item()
+            record[f] = value
+        if self._continuous[row]:
+            record["listed_date"] = Instrument.DEFAULT_LISTED_DATE
+        return record
+
+    def to_frame(self, rows, fields=None):
+        # type: (np.ndarray, Optional[Sequence[str]]) -> pandas.DataFrame
+        """
+        以 DataFrame 的形式返回指定行的合约字段，日期字段与 Instrument 一致地修正为 datetime，type 字段为 INSTRUMENT_TYPE
+        """
+        if fields is None:
+            fields = [f for f in self._fields if f not in self._present or self._present[f][rows].any()]
+        data = {}
+        for f in fields:
+            present = self._present[f][rows] if f in self._present else None
+            if f == "listed_date":
+                values = self._listed_dates[rows].astype(object)
+            elif f == "de_listed_date":
+                values = self._de_listed_dates[rows].astype(object)
+            elif f == "type":
+                type_map = {t: INSTRUMENT_TYPE[t] for t in self._type_rows}
+                values = np.array([type_map[t] for t in self._values(f, rows)], dtype=object)
+            elif f == "maturity_date":
+                values = np.array([
+                    Instrument._fix_date(v, Instrument.DEFAULT_DE_LISTED_DATE) if present is None or p else None
+                    for v, p in zip(self._values(f, rows), repeat(True) if present is None else present)
+                ], dtype=object)
+            elif f in self._columns:
+                values = self._values(f, rows)
+            else:
+                values = np.full(len(rows), np.nan)
+            if present is not None and not present.all():
+                values = values.astype(np.float64 if values.dtype.kind in "iuf" else object)
+                values[~present] = np.nan
+            # 对象列以 list 传入，由 pandas 与逐个合约构造 DataFrame 时一致地推断类型
+            data[f] = values.tolist() if values.dtype == object and len(values) else values
+        return pandas.DataFrame(data, columns=list(fields))
+
+
 class ShareTransformationStore(object):
     def __init__(self, f):
         with codecs.open(f, 'r', encoding="utf-8") as store:
@@ -228,6 +551,129 @@ class DayBarStore(AbstractDayBarStore):
                 return 20050104, 20050104
             
 
+class MemoryMappedH5Store(object):
+    """
+    将以 order_book_id 为 key 的 h5 文件一次性转换为平铺的记录文件（.npy）及 order_book_id 偏移索引，之后通过 np.memmap 以零拷贝切片的方式读取。
+
+    转换结果与源文件的修改时间及大小绑定，源文件更新后会自动重新转换。同一台机器上的多个回测进程读取同一份转换结果时共享操作系统的页缓存，
+    不再各自持有一份数据的拷贝。
+    """
+    FORMAT_VERSION = 1
+    DATA_SUFFIX = ".npy"
+
+    def __init__(self, path, dtype, cache_dir=None):
+        # type: (str, np.dtype, Optional[str]) -> None
+        if not os.path.exists(path):
+            raise FileExistsError("File {} not exist，please update bundle.".format(path))
+        self._path = path
+        self._dtype = dtype
+        cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), "mmap")
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(path))[0]
+        self._data_path = os.path.join(cache_dir, name + self.DATA_SUFFIX)
+        self._index_path = os.path.join(cache_dir, name + ".index.json")
+        self._lock = FileLock(os.path.join(cache_dir, name + ".lock"))
+
+        self._data = None  # type: Optional[np.ndarray]
+        self._index = None  # type: Optional[Dict[str, Tuple[int, int]]]
+
+    def _source_signature(self):
+        stat = os.stat(self._path)
+        return {
+            "version": self.FORMAT_VERSION,
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "dtype": self._dtype.descr
+        }
+
+    def _load_index(self):
+        # type: () -> Optional[Dict[str, Tuple[int, int]]]
+        if not (os.path.exists(self._index_path) and os.path.exists(self._data_path)):
+            return None
+        try:
+            with open(self._index_path, "r") as f:
+                meta = json.load(f)
+        except ValueError:
+            return None
+        if meta.get("signature") != json.loads(json.dumps(self._source_signature())):
+            return None
+        return {k: (v[0], v[1]) for k, v in meta["index"].items()}
+
+    def _read_dataset(self, dataset):
+        # type: (h5py.Dataset) -> np.ndarray
+        return dataset[:]
+
+    def _convert(self):
+        # type: () -> Dict[str, Tuple[int, int]]
+        system_log.info(_("converting {} to memory mapped file, this may take a while").format(self._path))
+        index = {}  # type: Dict[str, Tuple[int, int]]
+        total = 0
+        with h5_file(self._path) as h5:
+            for order_book_id in h5.keys():
+                length = len(h5[order_book_id])
+                index[order_book_id] = (total, total + length)
+                total += length
+
+            tmp_data_path = self._data_path + ".tmp.npy"
+            data = np.lib.format.open_memmap(tmp_data_path, mode="w+", dtype=self._dtype, shape=(total, ))
+            for order_book_id, (s, e) in index.items():
+                if s == e:
+                    continue
+                values = self._read_dataset(h5[order_book_id])
+                if self._dtype.names:
+                    # 结构化数组之间的赋值是按位置而非字段名进行的，此处需逐字段赋值
+                    for field in self._dtype.names:
+                        data[field][s:e] = values[field]
+                else:
+                    data[s:e] = values
+            data.flush()
+            del data
+
+        tmp_index_path = self._index_path + ".tmp"
+        with open(tmp_index_path, "w") as f:
+            json.dump({"signature": self._source_signature(), "index": index}, f)
+        os.replace(tmp_data_path, self._data_path)
+        os.replace(tmp_index_path, self._index_path)
+        return index
+
+    def prepare(self):
+        """ 完成转换（如有需要）并映射数据文件，供多进程共享数据前在父进程中预先调用 """
+        if self._data is not None:
+            return
+        with self._lock:
+            index = self._load_index()
+            if index is None:
+                index = self._convert()
+            data = np.load(self._data_path, mmap_mode="r", allow_pickle=False)
+        self._index, self._data = index, data
+
+    def _get(self, order_book_id):
+        # type: (str) -> Optional[np.ndarray]
+        self.prepare()
+        try:
+            s, e = self._index[order_book_id]
+        except KeyError:
+            return None
+        return self._data[s:e]
+
+
+class MemoryMappedDayBarStore(MemoryMappedH5Store, AbstractDayBarStore):
+    DATA_SUFFIX = ".bars.npy"
+
+    def get_bars(self, order_book_id):
+        bars = self._get(order_book_id)
+        if bars is None:
+            return np.empty(0, dtype=self._dtype)
+        return bars
+
+    def get_date_range(self, order_book_id):
+        bars = self.get_bars(order_book_id)
+        if len(bars) == 0:
+            return 20050104, 20050104
+        return bars[0]['datetime'], bars[-1]['datetime']
+
+
 class INDXDayBarStore(DayBarStore):
     pass
             
@@ -249,6 +695,171 @@ class FutureDayBarStore(DayBarStore):
     ])
 
 
+MINUTE_BAR_INDEX_DTYPE = np.dtype([("trading_date", np.uint32), ("count", np.uint32)])
+
+
+class MinuteBarStore(AbstractMinuteBarStore):
+    """
+    分钟线存储，h5 文件中每个 order_book_id 对应一个 group：
+
+    * index：按交易日排列的 (trading_date, count)，用于在不读取分钟线的情况下定位任意交易日区间
+    * YYYYMM：该月各交易日的分钟线（按交易日所属月份划分，期货夜盘归属下一交易日），每月单独压缩存储
+
+    读取时以合约-月份为单位解压并缓存，缓存数量有上限，回测占用的内存不随回测区间的长度增长。
+    """
+    DEFAULT_DTYPE = DayBarStore.DEFAULT_DTYPE
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileExistsError("File {} not exist，please update bundle.".format(path))
+        self._path = path
+
+    @lru_cache(None)
+    def get_day_index(self, order_book_id):
+        with h5_file(self._path) as h5:
+            try:
+                return h5[order_book_id]["index"][:]
+            except KeyError:
+                return np.empty(0, dtype=MINUTE_BAR_INDEX_DTYPE)
+
+    @lru_cache(512)
+    def _get_month(self, order_book_id, month):
+        with h5_file(self._path) as h5:
+            return h5[order_book_id][str(month)][:]
+
+    @lru_cache(None)
+    def _month_offsets(self, order_book_id):
+        # 各交易日所属的月份及其在该月数据中的起止行
+        index = self.get_day_index(order_book_id)
+        months = (index["trading_date"] // 100).astype(np.int64)
+        ends = np.cumsum(index["count"], dtype=np.int64)
+        starts = ends - index["count"]
+        month_base = starts[np.searchsorted(months, months, side="left")]
+        return months, starts - month_base, ends - month_base
+
+    def get_bars(self, order_book_id, start_date, end_date):
+        index = self.get_day_index(order_book_id)
+        left = index["trading_date"].searchsorted(start_date, side="left")
+        right = index["trading_date"].searchsorted(end_date, side="right")
+        if left >= right:
+            return np.empty(0, dtype=self.DEFAULT_DTYPE)
+
+        months, starts, ends = self._month_offsets(order_book_id)
+        chunks = []
+        i = left
+        while i < right:
+            month = months[i]
+            j = min(months.searchsorted(month, side="right"), right)
+            chunks.append(self._get_month(order_book_id, int(month))[starts[i]:ends[j - 1]])
+            i = j
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+
+class FutureMinuteBarStore(MinuteBarStore):
+    DEFAULT_DTYPE = np.dtype(DayBarStore.DEFAULT_DTYPE.descr + [("open_interest", np.float64)])
+
+
+def write_minute_bars(h5, order_book_id, bars, trading_dates=None, **h5_kwargs):
+    # type: (h5py.File, str, np.ndarray, Optional[np.ndarray], ...) -> None
+    """
+    以 MinuteBarStore 的格式写入（覆盖）单个合约的分钟线。
+
+    :param bars: 按时间升序排列的分钟线，datetime 字段为 YYYYMMDDHHMMSS 格式的整数
+    :param trading_dates: 与 bars 逐行对应的交易日（YYYYMMDD），缺省时取 datetime 的日期部分；期货夜盘需显式给出
+    """
+    if trading_dates is None:
+        trading_dates = bars["datetime"] // 1000000
+    trading_dates = np.asarray(trading_dates, dtype=np.uint32)
+    h5_kwargs.setdefault("compression", "lzf")
+    h5_kwargs.setdefault("shuffle", True)
+
+    if order_book_id in h5:
+        del h5[order_book_id]
+    group = h5.create_group(order_book_id)
+    days, day_starts, counts = np.unique(trading_dates, return_index=True, return_counts=True)
+    index = np.empty(len(days), dtype=MINUTE_BAR_INDEX_DTYPE)
+    index["trading_date"], index["count"] = days, counts
+    group.create_dataset("index", data=index)
+    months = days // 100
+    for month in np.unique(months):
+        month_days = np.flatnonzero(months == month)
+        start = day_starts[month_days[0]]
+        stop = start + counts[month_days].sum()
+        group.create_dataset(str(month), data=bars[start:stop], chunks=(stop - start, ), **h5_kwargs)
+
+
+class TickStore(AbstractTickStore):
+    """
+    tick 存储，每个交易日一个 h5 文件（YYYYMMDD.h5，期货夜盘归属下一交易日），文件中每个 order_book_id 对应一个 group，
+    group 下每个字段单独存储为一列：datetime 为 YYYYMMDDHHMMSSmmm 格式的整数，五档盘口 asks、ask_vols、bids、bid_vols 为 (n, 5) 的二维数组。
+
+    按块读取 tick，合并多个合约的 tick 时内存占用与合约数量及块大小成正比，与整个交易日的数据量无关。
+    """
+    BLOCK_SIZE = 1024
+
+    def __init__(self, path):
+        self._path = path
+
+    def _file_of(self, trading_date):
+        return os.path.join(self._path, "{}.h5".format(trading_date))
+
+    @lru_cache(None)
+    def get_trading_dates(self):
+        dates = [int(name[:-3]) for name in os.listdir(self._path) if name.endswith(".h5") and name[:-3].isdigit()]
+        return np.array(sorted(dates), dtype=np.int64)
+
+    def iter_blocks(self, order_book_id, trading_date, start_dt=None):
+        path = self._file_of(trading_date)
+        if not os.path.exists(path):
+            return
+        with h5_file(path) as h5:
+            try:
+                group = h5[order_book_id]
+            except KeyError:
+                return
+            dts = group["datetime"][:]
+            datasets = {name: group[name] for name in group.keys() if name != "datetime"}
+            i = 0 if start_dt is None else dts.searchsorted(start_dt, side="right")
+            while i < len(dts):
+                j = min(i + self.BLOCK_SIZE, len(dts))
+                block = {name: dataset[i:j] for name, dataset in datasets.items()}
+                block["datetime"] = dts[i:j]
+                yield block
+                i = j
+
+    def get_ticks(self, order_book_id, trading_date, end_dt, count):
+        path = self._file_of(trading_date)
+        if not os.path.exists(path):
+            return None
+        with h5_file(path) as h5:
+            try:
+                group = h5[order_book_id]
+            except KeyError:
+                return None
+            dts = group["datetime"][:]
+            j = len(dts) if end_dt is None else dts.searchsorted(end_dt, side="right")
+            i = max(j - count, 0)
+            return {name: (dts[i:j] if name == "datetime" else group[name][i:j]) for name in group.keys()}
+
+
+def write_ticks(h5, order_book_id, ticks, **h5_kwargs):
+    # type: (h5py.File, str, Mapping[str, np.ndarray], ...) -> None
+    """
+    以 TickStore 的格式写入（覆盖）单个合约在一个交易日的 tick，h5 为该交易日对应的文件。
+
+    :param ticks: {字段名: 数组}，须包含 datetime 列（YYYYMMDDHHMMSSmmm 格式的整数），各列按时间升序逐行对应
+    """
+    h5_kwargs.setdefault("compression", "lzf")
+    h5_kwargs.setdefault("shuffle", True)
+    if order_book_id in h5:
+        del h5[order_book_id]
+    group = h5.create_group(order_book_id)
+    for name, values in ticks.items():
+        values = np.asarray(values)
+        chunks = (max(min(len(values), 4096), 1), ) + values.shape[1:]
+        group.create_dataset(name, data=values, chunks=chunks, **h5_kwargs)
+
+
 class DividendStore(AbstractDividendStore):
     def __init__(self, path):
         self._path = path
@@ -303,28 +914,88 @@ class SimpleFactorStore(AbstractSimpleFactorStore):
                 return None
 
 
+def _to_date_int(d):
+    if isinstance(d, (int, np.int64, np.uint64)):
+        return int(d // 1000000) if d > 100000000 else int(d)
+    else:
+        return d.year * 10000 + d.month * 100 + d.day
+
+
+def _to_date_ints(dates):
+    # type: (Sequence[DateLike]) -> np.ndarray
+    # 整数日期（YYYYMMDD 或 YYYYMMDDHHMMSS）直接向量化转换，其余类型逐个转换
+    if isinstance(dates, np.ndarray) and dates.dtype.kind in "iu":
+        ints = dates.astype(np.int64)
+    else:
+        ints = np.fromiter((_to_date_int(d) for d in dates), dtype=np.int64, count=len(dates))
+    return np.where(ints > 100000000, ints // 1000000, ints)
+
+
+def _sorted_contains(days, keys):
+    # type: (np.ndarray, np.ndarray) -> np.ndarray
+    keys = keys.astype(days.dtype)
+    pos = np.minimum(days.searchsorted(keys), len(days) - 1)
+    return days[pos] == keys
+
+
 class DateSet(AbstractDateSet):
+    """ 各 order_book_id 的日期（YYYYMMDD）以排序后的 int32 数组缓存，查询时二分查找 """
     def __init__(self, f):
         self._f = f
 
     @lru_cache(None)
     def get_days(self, order_book_id):
+        # type: (str) -> np.ndarray
         with h5_file(self._f) as h5:
             try:
                 days = h5[order_book_id][:]
             except KeyError:
-                return set()
-            return set(days.tolist())
+                return np.empty(0, dtype=np.int32)
+            return np.sort(days.astype(np.int32))
 
     def contains(self, order_book_id, dates):
-        date_set = self.get_days(order_book_id)
-        if not date_set:
+        days = self.get_days(order_book_id)
+        if len(days) == 0:
             return None
-
-        def _to_dt_int(d):
-            if isinstance(d, (int, np.int64, np.uint64)):
-                return int(d // 1000000) if d > 100000000 else int(d)
+        return _sorted_contains(days, _to_date_ints(dates)).tolist()
+
+    def contains_many(self, order_book_ids, date):
+        key = np.int32(_to_date_int(date))
+        result = []
+        for order_book_id in order_book_ids:
+            days = self.get_days(order_book_id)
+            if len(days) == 0:
+                result.append(None)
             else:
-                return d.year * 10000 + d.month * 100 + d.day
+                pos = days.searchsorted(key)
+                result.append(bool(pos < len(days) and days[pos] == key))
+        return result
 
-        return [(_to_dt_int(d) in date_set) for d in dates]
+
+class MemoryMappedDateSet(MemoryMappedH5Store, AbstractDateSet):
+    """ 以内存映射文件读取的 DateSet，各 order_book_id 的日期（YYYYMMDD）在转换时排序 """
+    DATA_SUFFIX = ".days.npy"
+
+    def __init__(self, f, cache_dir=None):
+        super(MemoryMappedDateSet, self).__init__(f, np.dtype(np.int64), cache_dir)
+
+    def _read_dataset(self, dataset):
+        return np.sort(dataset[:])
+
+    def contains(self, order_book_id, dates):
+        days = self._get(order_book_id)
+        if days is None or len(days) == 0:
+            return None
+        return _sorted_contains(days, _to_date_ints(dates)).tolist()
+
+    def contains_many(self, order_book_ids, date):
+        key = _to_date_int(date)
+        result = []
+        for order_book_id in order_book_ids:
+            days = self._get(order_book_id)
+            if days is None or len(days) == 0:
+                result.append(None)
+            else:
+                pos = days.searchsorted(key)
+                result.append(bool(pos < len(days) and days[pos] == key))
+        return result
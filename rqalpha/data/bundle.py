@@ -17,7 +17,6 @@ import json
 import os
 import pickle
 import re
-from itertools import chain
 from typing import Callable, Optional, Union, List, Iterable, Tuple
 from filelock import FileLock, Timeout
 import multiprocessing
@@ -26,6 +25,7 @@ from ctypes import c_bool
 
 import h5py
 import numpy as np
+import pandas as pd
 from rqalpha.apis.api_rqdatac import rqdatac
 from rqalpha.utils.concurrent import ProgressedProcessPoolExecutor, ProgressedTask
 from rqalpha.utils.datetime_func import convert_date_to_date_int, convert_date_to_int
@@ -34,6 +34,7 @@ from rqalpha.utils.functools import lru_cache
 from rqalpha.utils.logger import init_logger, system_log
 from rqalpha.environment import Environment
 from rqalpha.model.instrument import Instrument
+from rqalpha.data.base_data_source.storages import InstrumentTable, MinuteBarStore, write_minute_bars
 
 
 START_DATE = 20050104
@@ -53,6 +54,7 @@ def gen_instruments(d):
     instruments = [i.__dict__ for i in rqdatac.instruments(stocks)]
     with open(os.path.join(d, 'instruments.pk'), 'wb') as out:
         pickle.dump(instruments, out, protocol=2)
+    InstrumentTable.write(instruments, os.path.join(d, 'instruments.h5'))
 
 
 def gen_yield_curve(d):
@@ -357,6 +359,50 @@ FUTURES_FIELDS = STOCK_FIELDS + ['settlement', 'prev_settlement', 'open_interest
 FUND_FIELDS = STOCK_FIELDS
 
 
+# 可追加数据集每个分块的行数，日线约为一年的数据；分块按整块分配空间，过大的分块会使短数据集（如截取的 bundle）占用过多空间
+APPENDABLE_CHUNK_ROWS = 256
+
+
+def _cast_records(records, dtype):
+    # type: (np.ndarray, np.dtype) -> np.ndarray
+    # 按字段名逐列转换为目标 dtype，字段顺序及类型宽度可以不同
+    if records.dtype == dtype:
+        return records
+    result = np.empty(len(records), dtype=dtype)
+    for name in dtype.names:
+        result[name] = records[name]
+    return result
+
+
+def write_appendable_dataset(h5, name, records, **h5_kwargs):
+    # type: (h5py.File, str, np.ndarray, ...) -> None
+    """
+    以可扩展（maxshape=None）的分块数据集写入（覆盖）records，之后的更新可通过 append_to_dataset 原地追加
+    """
+    if name in h5:
+        del h5[name]
+    h5.create_dataset(name, data=records, maxshape=(None, ), chunks=(APPENDABLE_CHUNK_ROWS, ), **h5_kwargs)
+
+
+def append_to_dataset(h5, name, records, **h5_kwargs):
+    # type: (h5py.File, str, np.ndarray, ...) -> None
+    """
+    在数据集末尾追加 records，只写入新增的行。
+    数据集不存在或为空的占位数据集时直接写入；旧版本生成的不可扩展数据集会在首次追加时一次性转换为可扩展数据集。
+    """
+    if name not in h5 or h5[name].dtype.names is None:
+        write_appendable_dataset(h5, name, records, **h5_kwargs)
+        return
+    ds = h5[name]
+    records = _cast_records(records, ds.dtype)
+    if ds.maxshape[0] is not None:
+        write_appendable_dataset(h5, name, np.concatenate([ds[:], records]), **h5_kwargs)
+        return
+    size = ds.shape[0]
+    ds.resize((size + len(records), ))
+    ds[size:] = records
+
+
 class DayBarTask(ProgressedTask):
     def __init__(self, order_book_ids, file_path: str, fields: List[str], market="cn", **h5_kwargs):
         self._order_book_ids = order_book_ids
@@ -391,12 +437,12 @@ class GenerateDayBarTask(DayBarTask):
                                         adjust_type='none', fields=self._fields, expect_df=True, market=self._market)
                     if not (df is None or df.empty):
                         df.reset_index(inplace=True)
-                        df['datetime'] = [convert_date_to_int(d) for d in df['date']]
+                        df['datetime'] = convert_date_to_int(pd.DatetimeIndex(df['date']))
                         del df['date']
                         df.set_index(['order_book_id', 'datetime'], inplace=True)
                         df.sort_index(inplace=True)
                         for order_book_id in df.index.levels[0]:
-                            h5.create_dataset(order_book_id, data=df.loc[order_book_id].to_records(), **self._h5_kwargs)
+                            write_appendable_dataset(h5, order_book_id, df.loc[order_book_id].to_records(), **self._h5_kwargs)
                     i += step
                     yield len(order_book_ids)
                     if i >= len(self._order_book_ids):
@@ -439,9 +485,11 @@ class UpdateDayBarTask(DayBarTask):
                 for order_book_id in self._order_book_ids:
                     # 特殊处理前复权合约，需要全量更新
                     is_pre = is_futures and "888" in order_book_id
+                    append = False
                     if order_book_id in h5 and not is_pre:
                         try:
-                            last_date = int(h5[order_book_id]['datetime'][-1] // 1000000)
+                            # 只读取最后一行，避免读取整个数据集
+                            last_date = int(h5[order_book_id][-1]['datetime'] // 1000000)
                         except OSError:
                             system_log.error("File {} update failed, if it is using, please update later, "
                                             "or you can delete then update again".format(self._file_path))
@@ -453,6 +501,7 @@ class UpdateDayBarTask(DayBarTask):
                             start_date = START_DATE
                         else:
                             start_date = rqdatac.get_next_trading_date(last_date)
+                            append = True
                     else:
                         start_date = START_DATE
                     df = rqdatac.get_price(order_book_id, start_date, END_DATE, '1d',
@@ -461,18 +510,13 @@ class UpdateDayBarTask(DayBarTask):
                         df = df[self._fields]  # Future order_book_id like SC888 will auto add 'dominant_id'
                         df = df.loc[order_book_id]
                         df.reset_index(inplace=True)
-                        df['datetime'] = [convert_date_to_int(d) for d in df['date']]
+                        df['datetime'] = convert_date_to_int(pd.DatetimeIndex(df['date']))
                         del df['date']
                         df.set_index('datetime', inplace=True)
-                        if order_book_id in h5:
-                            data = np.array(
-                                [tuple(i) for i in chain(h5[order_book_id][:], df.to_records())],
-                                dtype=h5[order_book_id].dtype
-                            )
-                            del h5[order_book_id]
-                            h5.create_dataset(order_book_id, data=data, **self._h5_kwargs)
+                        if append:
+                            append_to_dataset(h5, order_book_id, df.to_records(), **self._h5_kwargs)
                         else:
-                            h5.create_dataset(order_book_id, data=df.to_records(), **self._h5_kwargs)
+                            write_appendable_dataset(h5, order_book_id, df.to_records(), **self._h5_kwargs)
                     yield 1
             finally:
                 if h5:
@@ -540,6 +584,156 @@ def update_bundle(path, create, enable_compression=False, concurrency=1, rqdata_
     return run_tasks(tasks, concurrency, **rqdata_kwargs)
 
 
+DAY_BAR_FILES = ("stocks.h5", "indexes.h5", "futures.h5", "funds.h5")
+# 分红、拆分及复权因子文件及其中用于按日期截取的字段
+CORPORATE_ACTION_FILES = (
+    ("dividends.h5", "book_closure_date"), ("split_factor.h5", "ex_date"), ("ex_cum_factor.h5", "start_date")
+)
+DATE_SET_FILES = ("suspended_days.h5", "st_stock_days.h5")
+
+
+def _to_date_ints(values):
+    # type: (np.ndarray) -> np.ndarray
+    # YYYYMMDDHHMMSS 或 YYYYMMDD 格式的整数统一为 YYYYMMDD
+    values = np.asarray(values, dtype=np.int64)
+    return np.where(values > 100000000, values // 1000000, values)
+
+
+def _slice_h5(src, dst, order_book_ids, rows_to_keep, appendable=False, **h5_kwargs):
+    # type: (str, str, Iterable[str], Callable[[np.ndarray], np.ndarray], bool, ...) -> None
+    if not os.path.exists(src):
+        return
+    with h5py.File(src, "r") as src_h5, h5py.File(dst, "w") as dst_h5:
+        for order_book_id in order_book_ids:
+            if order_book_id not in src_h5:
+                continue
+            data = src_h5[order_book_id][:]
+            if len(data):
+                data = data[rows_to_keep(data)]
+            if appendable:
+                write_appendable_dataset(dst_h5, order_book_id, data, **h5_kwargs)
+            else:
+                dst_h5.create_dataset(order_book_id, data=data, **h5_kwargs)
+
+
+def slice_bundle(src, dst, order_book_ids=None, types=None, start_date=None, end_date=None, **h5_kwargs):
+    # type: (str, str, Optional[Iterable[str]], Optional[Iterable[str]], Optional[datetime.date], Optional[datetime.date], ...) -> List[str]
+    """
+    从 src 中截取指定合约及日期区间的数据，在 dst 下写入一份自洽的 bundle，供只涉及少量合约的测试及研究使用。
+
+    合约信息、日线、分钟线、tick、停牌及 ST 数据、国债利率只保留区间内的数据；分红、拆分及复权因子保留截止日期前的全部记录，
+    以保证区间内的复权价格与原 bundle 一致；交易日历保留截止日期及其下一个交易日之前的全部交易日。
+
+    :param order_book_ids: 需要保留的合约代码，与 types 均为空时保留全部合约
+    :param types: 需要保留的合约类型，如 CS、Future
+    :param start_date: 开始日期，为空时不截取
+    :param end_date: 截止日期，为空时不截取
+
+    :return: 保留的合约代码列表
+    """
+    if os.path.abspath(src) == os.path.abspath(dst):
+        raise ValueError("can not slice bundle {} into itself".format(src))
+    os.makedirs(dst, exist_ok=True)
+    start = START_DATE if start_date is None else convert_date_to_date_int(start_date)
+    end = END_DATE if end_date is None else convert_date_to_date_int(end_date)
+    order_book_ids, types = set(order_book_ids or ()), set(types or ())
+    if order_book_ids or types:
+        # BaseDataSource 以上证指数的日线确定数据的可用区间，需始终保留
+        order_book_ids.add("000001.XSHG")
+
+    def _src(name):
+        return os.path.join(src, name)
+
+    def _dst(name):
+        return os.path.join(dst, name)
+
+    def _in_range(dates):
+        dates = _to_date_ints(dates)
+        return (dates >= start) & (dates <= end)
+
+    # instruments，保留在区间内上市的合约
+    with open(_src("instruments.pk"), "rb") as f:
+        records = pickle.load(f)
+    selected = []
+    for r in records:
+        if (order_book_ids or types) and r["order_book_id"] not in order_book_ids and r["type"] not in types:
+            continue
+        listed_date = Instrument._fix_date(r.get("listed_date"), Instrument.DEFAULT_LISTED_DATE)
+        de_listed_date = Instrument._fix_date(r.get("de_listed_date"), Instrument.DEFAULT_DE_LISTED_DATE)
+        if convert_date_to_date_int(listed_date) > end or convert_date_to_date_int(de_listed_date) < start:
+            continue
+        selected.append(r)
+    with open(_dst("instruments.pk"), "wb") as out:
+        pickle.dump(selected, out, protocol=2)
+    InstrumentTable.write(selected, _dst("instruments.h5"))
+    selected_ids = list(dict.fromkeys(r["order_book_id"] for r in selected))
+
+    trading_dates = np.load(_src("trading_dates.npy"), allow_pickle=False)
+    np.save(_dst("trading_dates.npy"), trading_dates[:trading_dates.searchsorted(end, side="right") + 1], allow_pickle=False)
+
+    for name in DAY_BAR_FILES:
+        _slice_h5(_src(name), _dst(name), selected_ids, lambda d: _in_range(d["datetime"]), appendable=True, **h5_kwargs)
+    for name, field in CORPORATE_ACTION_FILES:
+        _slice_h5(_src(name), _dst(name), selected_ids, lambda d, f=field: _to_date_ints(d[f]) <= end, **h5_kwargs)
+    for name in DATE_SET_FILES:
+        _slice_h5(_src(name), _dst(name), selected_ids, _in_range, **h5_kwargs)
+
+    if os.path.exists(_src("yield_curve.h5")):
+        with h5py.File(_src("yield_curve.h5"), "r") as src_h5, h5py.File(_dst("yield_curve.h5"), "w") as dst_h5:
+            data = src_h5["data"][:]
+            dst_h5.create_dataset("data", data=data[_in_range(data["date"])])
+
+    if os.path.exists(_src("future_info.json")):
+        with open(_src("future_info.json"), "r") as f:
+            future_info = json.load(f)
+        underlying_symbols = {r.get("underlying_symbol") for r in selected if r["type"] == "Future"}
+        sliced = [item for item in future_info if (
+            item.get("order_book_id") in selected_ids or item.get("underlying_symbol") in underlying_symbols
+        )]
+        with open(_dst("future_info.json"), "w") as f:
+            # FutureInfoStore 要求文件中至少有一条记录，不包含期货时保留原文件内容
+            json.dump(sliced or future_info, f)
+
+    if os.path.exists(_src("share_transformation.json")):
+        with open(_src("share_transformation.json"), "r") as f:
+            share_transformation = json.load(f)
+        with open(_dst("share_transformation.json"), "w") as f:
+            json.dump({k: v for k, v in share_transformation.items() if k in selected_ids}, f)
+
+    minute_bar_path = _src("minute_bars")
+    if os.path.isdir(minute_bar_path):
+        os.makedirs(_dst("minute_bars"), exist_ok=True)
+        for name in os.listdir(minute_bar_path):
+            if not name.endswith(".h5"):
+                continue
+            store = MinuteBarStore(os.path.join(minute_bar_path, name))
+            with h5py.File(os.path.join(dst, "minute_bars", name), "w") as h5:
+                for order_book_id in selected_ids:
+                    index = store.get_day_index(order_book_id)
+                    mask = _in_range(index["trading_date"])
+                    if not mask.any():
+                        continue
+                    write_minute_bars(
+                        h5, order_book_id, store.get_bars(order_book_id, start, end),
+                        np.repeat(index["trading_date"][mask], index["count"][mask]), **h5_kwargs
+                    )
+
+    tick_path = _src("ticks")
+    if os.path.isdir(tick_path):
+        os.makedirs(_dst("ticks"), exist_ok=True)
+        for name in os.listdir(tick_path):
+            if not (name.endswith(".h5") and name[:-3].isdigit() and start <= int(name[:-3]) <= end):
+                continue
+            with h5py.File(os.path.join(tick_path, name), "r") as src_h5:
+                ids = [order_book_id for order_book_id in selected_ids if order_book_id in src_h5]
+                if not ids:
+                    continue
+                with h5py.File(os.path.join(dst, "ticks", name), "w") as dst_h5:
+                    for order_book_id in ids:
+                        src_h5.copy(src_h5[order_book_id], dst_h5, name=order_book_id)
+    return selected_ids
+
+
 class AutomaticUpdateBundle(object):
     def __init__(self, path: str, filename: str, api: Callable, fields: List[str], end_date: datetime.date, start_date: Union[int, datetime.date] = START_DATE) -> None:
         if not os.path.exists(path):
@@ -608,14 +802,7 @@ class AutomaticUpdateBundle(object):
                         arr = np.array([])
                         h5.create_dataset(order_book_id, data=arr)
                 else:
-                    if order_book_id in h5:
-                        data = np.array(
-                            [tuple(i) for i in chain(h5[order_book_id][:], arr)],
-                            dtype=h5[order_book_id].dtype)
-                        del h5[order_book_id]
-                        h5.create_dataset(order_book_id, data=data)
-                    else:
-                        h5.create_dataset(order_book_id, data=arr)
+                    append_to_dataset(h5, order_book_id, arr)
         except (OSError, Timeout) as e:
             raise OSError(_("File {} update failed, if it is using, please update later, "
                           "or you can delete then update again".format(self._file))) from e
@@ -16,7 +16,7 @@
 #         详细的授权流程，请联系 public@ricequant.com 获取。
 
 from datetime import datetime, date
-from typing import Union, List, Sequence, Optional, Tuple
+from typing import Iterable, Union, List, Sequence, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -37,6 +37,7 @@ from rqalpha.core.execution_context import ExecutionContext
 from rqalpha.utils.typing import DateLike
 from rqalpha.utils.exception import InstrumentNotFound
 from rqalpha.data.base_data_source.storages import FuturesTradingParameters
+from rqalpha.data.price_matrix import PriceMatrix
 
 from .instruments_mixin import InstrumentsMixin
 
@@ -45,6 +46,7 @@ class DataProxy(TradingDatesMixin, InstrumentsMixin):
     def __init__(self, data_source: AbstractDataSource, price_board: AbstractPriceBoard):
         self._data_source = data_source
         self._price_board = price_board
+        self._price_matrix: Optional[PriceMatrix] = None
         TradingDatesMixin.__init__(self, data_source)
         InstrumentsMixin.__init__(self, data_source)
 
@@ -169,8 +171,34 @@ class DataProxy(TradingDatesMixin, InstrumentsMixin):
             return np.nan
         return self._data_source.get_settle_price(instrument, trading_dt)
 
-    @lru_cache(512)
+    def enable_price_matrix(self, start_date: DateLike, end_date: DateLike):
+        """
+        启用价格矩阵，此后 start_date 至 end_date 之间的日线 get_bar 及 get_bars_field 均从矩阵中取数
+        """
+        self._price_matrix = PriceMatrix(self._data_source, self.get_trading_dates(start_date, end_date))
+
+    def load_price_matrix(self, order_book_ids: Iterable[str]):
+        """
+        将合约预先载入价格矩阵，未启用价格矩阵时不做任何操作
+        """
+        if self._price_matrix is None:
+            return
+        instruments = (self.instruments(order_book_id) for order_book_id in order_book_ids)
+        self._price_matrix.load(instrument for instrument in instruments if instrument is not None)
+
     def get_bar(self, order_book_id: str, dt: date, frequency: str = '1d') -> BarObject:
+        if self._price_matrix is not None and frequency == '1d' and dt is not None:
+            row = self._price_matrix.row_of(dt)
+            if row is not None:
+                instrument = self.instruments(order_book_id)
+                bar = self._price_matrix.get_bar(instrument, row)
+                if bar is not None:
+                    return BarObject(instrument, bar)
+                return BarObject(instrument, NANDict, dt)
+        return self._get_bar(order_book_id, dt, frequency)
+
+    @lru_cache(512)
+    def _get_bar(self, order_book_id: str, dt: date, frequency: str = '1d') -> BarObject:
         instrument = self.instruments(order_book_id)
         if dt is None:
             return BarObject(instrument, NANDict, dt)
@@ -179,6 +207,14 @@ class DataProxy(TradingDatesMixin, InstrumentsMixin):
             return BarObject(instrument, bar)
         return BarObject(instrument, NANDict, dt)
 
+    def get_bars_field(self, order_book_ids: Sequence[str], dt: date, frequency: str = '1d', field: str = 'close') -> np.ndarray:
+        instruments = [self.get_instrument_history(order_book_id)[0] for order_book_id in order_book_ids]
+        if self._price_matrix is not None and frequency == '1d' and field in PriceMatrix.FIELDS:
+            row = self._price_matrix.row_of(dt)
+            if row is not None:
+                return self._price_matrix.get_field(instruments, row, field)
+        return self._data_source.get_bars_field(instruments, dt, frequency, field)
+
     def get_open_auction_bar(self, order_book_id: str, dt):
         instrument = self.instruments(order_book_id)
         try:
@@ -229,6 +265,31 @@ class DataProxy(TradingDatesMixin, InstrumentsMixin):
                                               skip_suspended=skip_suspended, include_now=include_now,
                                               adjust_type=adjust_type, adjust_orig=adjust_orig)
 
+    def history_bars_panel(
+        self,
+        order_book_ids: List[str],
+        bar_count: int,
+        frequency: str,
+        fields: List[str],
+        dt: datetime,
+        include_now: bool = False,
+        adjust_type: str = 'pre',
+        adjust_orig: Optional[datetime] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        instruments = []
+        for order_book_id in order_book_ids:
+            instrument_history = self.get_instrument_history(order_book_id, dt)
+            if len(instrument_history) == 0:
+                raise InstrumentNotFound(_("No instrument found at {dt}: {id_or_sym}").format(
+                    dt=dt, id_or_sym=order_book_id
+                ))
+            instruments.append(instrument_history[-1])
+        if adjust_orig is None:
+            adjust_orig = dt
+        return self._data_source.history_bars_panel(instruments, bar_count, frequency, fields, dt,
+                                                    include_now=include_now, adjust_type=adjust_type,
+                                                    adjust_orig=adjust_orig)
+
     def history_ticks(self, order_book_id, count, dt):
         instrument = self.instrument_not_none(order_book_id)
         return self._data_source.history_ticks(instrument, count, dt)
@@ -276,6 +337,9 @@ class DataProxy(TradingDatesMixin, InstrumentsMixin):
         trading_dates = self.get_n_trading_dates_until(dt, count)
         return self._data_source.is_suspended(order_book_id, trading_dates)
 
+    def is_suspended_many(self, order_book_ids: Sequence[str], dt: DateLike) -> List[bool]:
+        return self._data_source.is_suspended_many(order_book_ids, dt)
+
     def is_st_stock(self, order_book_id: str, dt: DateLike, count: int = 1) -> Union[bool, List[bool]]:
         if count == 1:
             return self._data_source.is_st_stock(order_book_id, [dt])[0]
@@ -289,6 +353,9 @@ class DataProxy(TradingDatesMixin, InstrumentsMixin):
     def get_last_price(self, order_book_id: str) -> float:
         return float(self._price_board.get_last_price(order_book_id))
 
+    def get_last_prices(self, order_book_ids: Sequence[str]) -> np.ndarray:
+        return np.asarray(self._price_board.get_last_prices(order_book_ids), dtype=np.float64)
+
     def get_future_contracts(self, underlying: str, date: DateLike) -> List[str]:
         return sorted(i.order_book_id for i in self.all_instruments(
             [INSTRUMENT_TYPE.FUTURE], date
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），
+#         您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、
+#         本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，
+#         否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from rqalpha.interface import AbstractDataSource
+from rqalpha.model.instrument import Instrument
+
+
+class _Listing:
+    """ 同一代码对应的全部合约，按上市时间排序 """
+    __slots__ = ("instruments", "listed_dates", "disjoint")
+
+    def __init__(self, instruments: List[Instrument]):
+        self.instruments = sorted(instruments, key=lambda ins: ins.listed_date)
+        self.listed_dates = [ins.listed_date for ins in self.instruments]
+        # 后一个合约上市时前一个合约均已退市，则任意时点至多只有最后一个已上市的合约处于上市状态
+        self.disjoint = all(
+            prev.de_listed_at(ins.listed_date) for prev, ins in zip(self.instruments, self.instruments[1:])
+        )
+
+    def listed(self, dt: datetime) -> List[Instrument]:
+        return self.instruments[:bisect_right(self.listed_dates, dt)]
+
+    def active(self, dt: datetime) -> List[Instrument]:
+        n = bisect_right(self.listed_dates, dt)
+        if self.disjoint:
+            if n and not self.instruments[n - 1].de_listed_at(dt):
+                return [self.instruments[n - 1]]
+            return []
+        return [ins for ins in self.instruments[:n] if not ins.de_listed_at(dt)]
+
+
+class InstrumentIndex:
+    """
+    按合约代码或 order_book_id 索引的合约表，保存每个代码对应合约的上市时间有序数组，
+    “某时点处于上市状态的合约”及“某时点已上市的合约”均只需一次二分查找，无需以时间为键缓存查询结果。
+
+    索引在首次查询某个代码时从数据源建立；查询不到合约的代码不会被记录，以便数据源之后注册的合约仍能被查询到。
+    """
+
+    def __init__(self, data_source: AbstractDataSource):
+        self._data_source = data_source
+        self._listings: Dict[str, _Listing] = {}
+
+    def _listing(self, id_or_sym: str) -> Optional[_Listing]:
+        try:
+            return self._listings[id_or_sym]
+        except KeyError:
+            instruments = list(self._data_source.get_instruments(id_or_syms=[id_or_sym]))
+            if not instruments:
+                return None
+            listing = self._listings[id_or_sym] = _Listing(instruments)
+            return listing
+
+    def history(self, id_or_sym: str, listed_at: Optional[datetime] = None) -> List[Instrument]:
+        """ 按上市时间排序的合约列表，指定 listed_at 时只返回该时点已上市的合约 """
+        listing = self._listing(id_or_sym)
+        if listing is None:
+            return []
+        if listed_at is None:
+            return list(listing.instruments)
+        return listing.listed(listed_at)
+
+    def active(self, id_or_sym: str, dt: Optional[datetime]) -> List[Instrument]:
+        """ 指定时点处于上市状态的合约，dt 为 None 时返回全部合约 """
+        listing = self._listing(id_or_sym)
+        if listing is None:
+            return []
+        if dt is None:
+            return list(listing.instruments)
+        return listing.active(dt)
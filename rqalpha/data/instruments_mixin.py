@@ -15,9 +15,11 @@
 #         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
 #         详细的授权流程，请联系 public@ricequant.com 获取。
 
-from typing import List, Optional, Iterable, Dict, Union
+from typing import List, Optional, Iterable, Dict, Union, Sequence
 from datetime import datetime
 
+import pandas as pd
+
 from typing_extensions import deprecated
 
 from rqalpha.model.instrument import Instrument
@@ -27,13 +29,14 @@ from rqalpha.utils.exception import InstrumentNotFound
 from rqalpha.const import INSTRUMENT_TYPE
 
 from rqalpha.interface import AbstractDataSource
+from .instrument_index import InstrumentIndex
 
 
 class InstrumentsMixin:
     def __init__(self, data_source: AbstractDataSource):
         self._data_source = data_source
+        self._instrument_index = InstrumentIndex(data_source)
 
-    @lru_cache(2048)
     def get_active_instrument(self, id_or_sym: str, dt: datetime) -> Instrument:
         """获取指定时间点上市的合约对象。
 
@@ -42,17 +45,13 @@ class InstrumentsMixin:
         :returns: 合约对象
         :raises InstrumentNotFound: 找不到合约或找到多个合约时抛出
         """
-        candidates = []
-        for instrument in self._data_source.get_instruments(id_or_syms=[id_or_sym]):
-            if dt is None or instrument.active_at(dt):
-                candidates.append(instrument)
+        candidates = self._instrument_index.active(id_or_sym, dt)
         if not candidates:
             raise InstrumentNotFound(_("No instrument found at {dt}: {id_or_sym}").format(dt=dt, id_or_sym=id_or_sym))
         if len(candidates) > 1:
             raise InstrumentNotFound(_("Multiple instruments found at {dt}: {id_or_sym}").format(dt=dt, id_or_sym=id_or_sym))
         return candidates[0]
 
-    @lru_cache(2048)
     def get_instrument_history(self, id_or_sym: str, listed_at: Optional[datetime] = None) -> List[Instrument]:
         """获取合约历史记录列表（包括已退市的合约）。
 
@@ -60,10 +59,7 @@ class InstrumentsMixin:
         :param listed_at: 可选，指定时间点，若提供则只返回该时间点已经上市了的合约
         :returns: 合约对象列表，按上市时间排序，上市时间早的在前
         """
-        result = list(self._data_source.get_instruments(id_or_syms=[id_or_sym]))
-        if listed_at is not None:
-            result = [ins for ins in result if ins.listed_at(listed_at)]
-        return sorted(result, key=lambda ins: ins.listed_date)
+        return self._instrument_index.history(id_or_sym, listed_at)
 
     def get_active_instruments(self, id_or_syms: Iterable[str], dt: datetime) -> Dict[str, Instrument]:
         """批量获取指定时间点上市的合约对象。
@@ -73,9 +69,8 @@ class InstrumentsMixin:
         :returns: order_book_id 到合约对象的字典
         """
         result = {}
-        ins_iter = self._data_source.get_instruments(id_or_syms=id_or_syms)
-        for ins in ins_iter:
-            if ins.active_at(dt):
+        for id_or_sym in id_or_syms:
+            for ins in self._instrument_index.active(id_or_sym, dt):
                 result[ins.order_book_id] = ins
         return result
 
@@ -100,6 +95,19 @@ class InstrumentsMixin:
                 li.append(i)
         return li
 
+    def get_all_instruments_frame(
+        self, types: Optional[List[INSTRUMENT_TYPE]] = None, dt: Optional[datetime] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> pd.DataFrame:
+        """以 DataFrame 的形式获取指定类型的所有合约。
+
+        :param types: 可选，合约类型列表，为 None 时返回全部类型的合约
+        :param dt: 可选，指定时间点，若提供则只返回该时间点上市的合约
+        :param fields: 可选，返回的合约字段，为 None 时返回合约的全部字段
+        :returns: 每行对应一个合约的 DataFrame
+        """
+        return self._data_source.get_instruments_frame(types, dt, fields)
+
     @lru_cache(2048)
     def assure_order_book_id(self, order_book_id: str, expected_type: Optional[INSTRUMENT_TYPE] = None) -> str:
         """确保返回有效的 order_book_id。
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），
+#         您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、
+#         本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，
+#         否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from rqalpha.interface import AbstractDataSource
+from rqalpha.model.instrument import Instrument
+from rqalpha.utils.datetime_func import convert_date_to_int, convert_int_to_date
+
+
+class PriceMatrix:
+    """
+    按 交易日 × 合约 排列的日线行情矩阵，用于日线回测中 bar_dict 及 PriceBoard 的取价。
+
+    矩阵覆盖回测区间内的全部交易日，合约按需（首次访问或加入 universe 时）整列载入，
+    此后取某一合约当日的行情只需一次行号和列号的查找。未载入矩阵的字段从数据源中读取完整的 Bar 获取。
+    """
+
+    FIELDS = ["open", "close", "high", "low", "volume", "limit_up", "limit_down"]
+
+    def __init__(self, data_source: AbstractDataSource, trading_dates: Iterable[date]):
+        self._data_source = data_source
+        self._dates = np.asarray(convert_date_to_int(pd.DatetimeIndex(trading_dates)), dtype=np.int64)
+        self._field_index = {field: i for i, field in enumerate(self.FIELDS)}
+        self._columns: Dict[str, int] = {}
+        self._instruments: List[Instrument] = []
+        # (交易日, 合约, 字段)，合约一维预留空间，按倍数扩容
+        self._values = np.full((len(self._dates), 0, len(self.FIELDS)), np.nan)
+        self._last_dt = None
+        self._last_row = None
+
+    def __len__(self):
+        return len(self._instruments)
+
+    def row_of(self, dt: date) -> Optional[int]:
+        """ dt 所在交易日在矩阵中的行号，不在回测区间内时返回 None """
+        if dt == self._last_dt:
+            return self._last_row
+        key = convert_date_to_int(dt)
+        row = int(self._dates.searchsorted(key))
+        if row >= len(self._dates) or self._dates[row] != key:
+            row = None
+        self._last_dt, self._last_row = dt, row
+        return row
+
+    def load(self, instruments: Iterable[Instrument]):
+        """ 将尚未载入的合约整列载入矩阵 """
+        new = {}
+        for instrument in instruments:
+            if instrument.order_book_id not in self._columns:
+                new.setdefault(instrument.order_book_id, instrument)
+        if not new or len(self._dates) == 0:
+            return
+        instruments = list(new.values())
+        dates, values = self._data_source.history_bars_panel(
+            instruments, len(self._dates), "1d", self.FIELDS, convert_int_to_date(int(self._dates[-1])),
+            include_now=True, adjust_type="none"
+        )
+        dates = dates.astype(np.int64)
+        rows = self._dates.searchsorted(dates)
+        found = rows < len(self._dates)
+        found[found] = self._dates[rows[found]] == dates[found]
+
+        start = len(self._instruments)
+        stop = start + len(instruments)
+        capacity = self._values.shape[1]
+        if stop > capacity:
+            matrix = np.full((len(self._dates), max(stop, capacity * 2, 16), len(self.FIELDS)), np.nan)
+            matrix[:, :start] = self._values[:, :start]
+            self._values = matrix
+        self._values[rows[found], start:stop] = values[found]
+        for i, instrument in enumerate(instruments):
+            self._columns[instrument.order_book_id] = start + i
+        self._instruments.extend(instruments)
+
+    def column_of(self, instrument: Instrument) -> int:
+        try:
+            return self._columns[instrument.order_book_id]
+        except KeyError:
+            self.load([instrument])
+            return self._columns[instrument.order_book_id]
+
+    def get_bar(self, instrument: Instrument, row: int) -> Optional["PriceMatrixRow"]:
+        """ 合约在第 row 个交易日的行情，当日无行情时返回 None """
+        col = self.column_of(instrument)
+        if np.isnan(self._values[row, col, self._field_index["close"]]):
+            return None
+        return PriceMatrixRow(self, instrument, row, col)
+
+    def get_field(self, instruments: List[Instrument], row: int, field: str) -> np.ndarray:
+        """ 多个合约在第 row 个交易日的某一字段，field 须为 FIELDS 之一 """
+        self.load(instruments)
+        cols = [self._columns[instrument.order_book_id] for instrument in instruments]
+        return self._values[row, cols, self._field_index[field]]
+
+
+class PriceMatrixRow:
+    """
+    价格矩阵中某一合约某一交易日的行情视图，可作为 BarObject 的数据；矩阵之外的字段从数据源读取完整的 Bar
+    """
+    __slots__ = ("_matrix", "_instrument", "_row", "_col", "_bar")
+
+    def __init__(self, matrix: PriceMatrix, instrument: Instrument, row: int, col: int):
+        self._matrix = matrix
+        self._instrument = instrument
+        self._row = row
+        self._col = col
+        self._bar = None
+
+    def _full_bar(self):
+        if self._bar is None:
+            self._bar = self._matrix._data_source.get_bar(
+                self._instrument, convert_int_to_date(int(self._matrix._dates[self._row])), "1d"
+            )
+        return self._bar
+
+    def __getitem__(self, field):
+        try:
+            k = self._matrix._field_index[field]
+        except KeyError:
+            if field == "datetime":
+                return self._matrix._dates[self._row]
+            return self._full_bar()[field]
+        return self._matrix._values[self._row, self._col, k]
+
+    @property
+    def dtype(self):
+        return self._full_bar().dtype
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import numpy as np
+
+from rqalpha.interface import AbstractPriceBoard
+from rqalpha.environment import Environment
+from rqalpha.core.events import EVENT
+
+
+class TickPriceBoard(AbstractPriceBoard):
+    """ tick 回测使用的 PriceBoard，价格取自各合约最新一个 tick；尚未收到 tick 的合约以昨收价作为最新价 """
+    def __init__(self):
+        self._env = Environment.get_instance()
+        self._ticks = {}
+        self._env.event_bus.prepend_listener(EVENT.PRE_TICK, self._on_tick)
+        self._env.event_bus.prepend_listener(EVENT.PRE_BEFORE_TRADING, self._on_before_trading)
+
+    def _on_before_trading(self, _):
+        # 涨跌停价等随交易日变化，新交易日收到 tick 前不能沿用上一交易日的 tick
+        self._ticks.clear()
+
+    def _on_tick(self, event):
+        tick = event.tick
+        self._ticks[tick.order_book_id] = tick
+
+    def get_last_price(self, order_book_id: str):
+        try:
+            return self._ticks[order_book_id].last
+        except KeyError:
+            return self._env.data_proxy.get_prev_close(order_book_id, self._env.trading_dt)
+
+    def get_limit_up(self, order_book_id):
+        try:
+            return self._ticks[order_book_id].limit_up
+        except KeyError:
+            return np.nan
+
+    def get_limit_down(self, order_book_id):
+        try:
+            return self._ticks[order_book_id].limit_down
+        except KeyError:
+            return np.nan
+
+    def get_a1(self, order_book_id):
+        try:
+            return self._ticks[order_book_id].asks[0]
+        except (KeyError, IndexError, TypeError):
+            return np.nan
+
+    def get_b1(self, order_book_id):
+        try:
+            return self._ticks[order_book_id].bids[0]
+        except (KeyError, IndexError, TypeError):
+            return np.nan
@@ -62,6 +62,7 @@ class Environment(object):
         self.persist_provider = None
         self.persist_helper = None
         self.profile_deco = None
+        self.event_profiler = None
         self.system_log = system_log
         self.user_log = user_log
         self.user_system_log = user_system_log
@@ -171,6 +172,9 @@ class Environment(object):
     def get_last_price(self, order_book_id):
         return self.data_proxy.get_last_price(order_book_id)
 
+    def get_last_prices(self, order_book_ids):
+        return self.data_proxy.get_last_prices(order_book_ids)
+
     @deprecated("Use APIs from data_proxy instead", category=None)
     def get_instrument(self, order_book_id):
         return self.data_proxy.instrument(order_book_id)
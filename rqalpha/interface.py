@@ -17,7 +17,7 @@
 
 import abc
 from datetime import datetime, date
-from typing import Any, Union, Optional, Iterable, Dict, List, Sequence, TYPE_CHECKING, NamedTuple
+from typing import Any, Union, Optional, Iterable, Dict, List, Sequence, Tuple, TYPE_CHECKING, NamedTuple
 
 import numpy
 from six import with_metaclass
@@ -267,6 +267,15 @@ class AbstractPriceBoard(with_metaclass(abc.ABCMeta)):
         """
         raise NotImplementedError
 
+    def get_last_prices(self, order_book_ids: Sequence[str]) -> numpy.ndarray:
+        """
+        批量获取多个合约的最新价，返回与 order_book_ids 一一对应的数组。默认逐个调用 get_last_price，可覆盖以提供更高效的实现
+        """
+        return numpy.fromiter(
+            (self.get_last_price(order_book_id) for order_book_id in order_book_ids),
+            dtype=numpy.float64, count=len(order_book_ids)
+        )
+
 
 class ExchangeRate(NamedTuple):
     bid_reference: float  # 参考汇率买入价
@@ -292,6 +301,27 @@ class AbstractDataSource(object):
         """
         raise NotImplementedError
 
+    def get_instruments_frame(
+        self, types: Optional[Iterable[INSTRUMENT_TYPE]] = None, dt: Optional[datetime] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> pandas.DataFrame:
+        """
+        以 DataFrame 的形式获取合约信息，每行对应一个合约
+
+        :param types: 合约类型，为 None 时返回全部类型的合约
+        :param dt: 若提供则只返回该时间点上市交易的合约
+        :param fields: 返回的合约字段，为 None 时返回合约的全部字段；日期字段为修正后的 datetime，type 字段为 INSTRUMENT_TYPE
+
+        :return: `pandas.DataFrame`
+        """
+        rows = []
+        for ins in self.get_instruments(types=types or None):
+            if dt is None or ins.active_at(dt):
+                rows.append(dict(ins._dict, type=ins.type))
+        if fields is None:
+            return pandas.DataFrame(rows)
+        return pandas.DataFrame([[r.get(f) for f in fields] for r in rows], columns=list(fields))
+
     def get_trading_calendars(self):
         # type: () -> Dict[TRADING_CALENDAR_TYPE, pandas.DatetimeIndex]
         """
@@ -392,6 +422,29 @@ class AbstractDataSource(object):
         """
         raise NotImplementedError
 
+    def get_bars_field(self, instruments, dt, frequency, field):
+        # type: (Sequence[Instrument], Union[datetime, date], str, str) -> numpy.ndarray
+        """
+        批量获取多个合约在 dt 对应的 Bar 的某一字段，没有对应 Bar 的合约取 nan
+
+        :param instruments: 合约对象列表
+        :param datetime.datetime dt: calendar_datetime
+        :param str frequency: 周期频率
+        :param str field: 字段名，如 close
+
+        :return: 与 instruments 一一对应的 `numpy.ndarray`
+        """
+        result = numpy.full(len(instruments), numpy.nan)
+        for i, instrument in enumerate(instruments):
+            bar = self.get_bar(instrument, dt, frequency)
+            if bar is None:
+                continue
+            try:
+                result[i] = bar[field]
+            except (KeyError, ValueError):
+                pass
+        return result
+
     def get_open_auction_bar(self, instrument, dt):
         # type: (Instrument, Union[datetime, date]) -> Dict
         """
@@ -477,6 +530,54 @@ class AbstractDataSource(object):
         """
         raise NotImplementedError
 
+    def history_bars_panel(
+        self,
+        instruments: List[Instrument],
+        bar_count: int,
+        frequency: str,
+        fields: List[str],
+        dt: datetime,
+        include_now: bool = False,
+        adjust_type: str = 'pre',
+        adjust_orig: Optional[datetime] = None
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        批量获取多个合约的历史数据，各合约的数据按时间对齐，缺失的数据以 nan 填充。
+        默认实现逐个合约调用 history_bars（不跳过停牌）后再按时间对齐，DataSource 可覆盖该方法以提供向量化的实现。
+
+        :param instruments: 合约对象列表
+        :param int bar_count: 获取的历史数据数量
+        :param str frequency: 周期频率，`1d` 表示日周期, `1m` 表示分钟周期
+        :param fields: 返回数据字段列表，不应包含 datetime
+        :param datetime.datetime dt: 时间
+        :param bool include_now: 是否包含当天最新数据
+        :param str adjust_type: 复权类型，'pre', 'none', 'post'
+        :param datetime.datetime adjust_orig: 复权起点；
+
+        :return: `(dates, values)`，dates 为 YYYYMMDDHHMMSS 格式的整数时间戳数组，
+            values 为形如 (len(dates), len(instruments), len(fields)) 的浮点数组
+        """
+        bars_list = []
+        for instrument in instruments:
+            bars = self.history_bars(
+                instrument, bar_count, frequency, ["datetime"] + list(fields), dt, skip_suspended=False,
+                include_now=include_now, adjust_type=adjust_type, adjust_orig=adjust_orig
+            )
+            bars_list.append(bars if bars is not None else numpy.empty(0, dtype=[("datetime", "<u8")]))
+        dates = numpy.unique(numpy.concatenate(
+            [bars["datetime"].astype(numpy.uint64) for bars in bars_list] + [numpy.empty(0, dtype=numpy.uint64)]
+        ))[-bar_count:]
+        values = numpy.full((len(dates), len(instruments), len(fields)), numpy.nan)
+        for j, bars in enumerate(bars_list):
+            if len(bars) == 0:
+                continue
+            bars = bars[bars["datetime"] >= dates[0]]
+            rows = dates.searchsorted(bars["datetime"].astype(numpy.uint64))
+            for k, field in enumerate(fields):
+                if field in bars.dtype.names:
+                    values[rows, j, k] = bars[field]
+        return dates, values
+
     def history_ticks(self, instrument, count, dt):
         # type: (Instrument, int, datetime) -> List[TickObject]
         """
@@ -565,6 +666,15 @@ class AbstractDataSource(object):
     def is_suspended(self, order_book_id: str, dates: Sequence[DateLike]) -> List[bool]:
         raise NotImplementedError
 
+    def is_suspended_many(self, order_book_ids: Sequence[str], date: DateLike) -> List[bool]:
+        """
+        批量获取多个合约在同一交易日的停牌状态
+        :param order_book_ids: 合约代码列表
+        :param date: 交易日
+        :return: 与 order_book_ids 一一对应的停牌状态
+        """
+        return [self.is_suspended(order_book_id, [date])[0] for order_book_id in order_book_ids]
+
     def is_st_stock(self, order_book_id: str, dates: Sequence[DateLike]) -> List[bool]:
         raise NotImplementedError
 
@@ -699,6 +809,15 @@ class Persistable(with_metaclass(abc.ABCMeta)):
         """
         raise NotImplementedError
 
+    def get_state_version(self):
+        """
+        返回状态的版本号，状态发生变化时版本号必须随之改变。PersistHelper 在版本号与上次持久化时相同时会跳过该对象，
+        不再调用 get_state 进行序列化。返回 None 表示无法判断，此时每次都会调用 get_state 并按内容去重。
+
+        :return: hashable object or None
+        """
+        return None
+
     @classmethod
     def __subclasshook__(cls, C):
         if cls is Persistable:
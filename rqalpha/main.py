@@ -77,7 +77,9 @@ def init_persist_helper(env, ucontext, executor, config):
     persist_provider = env.persist_provider
     if persist_provider is None:
         raise RuntimeError(_(u"Missing persist provider. You need to set persist_provider before use persist"))
-    persist_helper = PersistHelper(persist_provider, env.event_bus, config.base.persist_mode)
+    persist_helper = PersistHelper(
+        persist_provider, env.event_bus, config.base.persist_mode, config.base.persist_queue_size
+    )
     for key, obj in chain([
         ('user_context', ucontext),
         ('global_vars', env.global_vars),
@@ -144,16 +146,29 @@ def run(config, source_code=None, user_funcs=None):
 
         env.set_strategy_loader(init_strategy_loader(env, source_code, user_funcs, config))
         mod_handler.set_env(env)
+        if config.extra.enable_event_profiler:
+            enable_event_profiler(env)
         mod_handler.start_up()
 
         if not hasattr(env, "data_source"):
-            env.set_data_source(BaseDataSource(config.base))
+            env.set_data_source(BaseDataSource.get_shared(config.base) or BaseDataSource(config.base))
         if not hasattr(env, "price_board"):
-            from rqalpha.data.bar_dict_price_board import BarDictPriceBoard
-            env.price_board = BarDictPriceBoard()
+            if config.base.frequency == "tick":
+                from rqalpha.data.tick_price_board import TickPriceBoard
+                env.price_board = TickPriceBoard()
+            else:
+                from rqalpha.data.bar_dict_price_board import BarDictPriceBoard
+                env.price_board = BarDictPriceBoard()
         env.set_data_proxy(DataProxy(env.data_source, env.price_board))
+        if env.event_profiler:
+            env.event_profiler.wrap_data_proxy(env.data_proxy)
 
         _adjust_start_date(env.config, env.data_proxy)
+        if config.base.price_matrix and config.base.frequency == "1d":
+            env.data_proxy.enable_price_matrix(config.base.start_date, config.base.end_date)
+            env.event_bus.add_listener(
+                EVENT.POST_UNIVERSE_CHANGED, lambda event: env.data_proxy.load_price_matrix(event.universe)
+            )
 
         ctx = ExecutionContext(const.EXECUTION_PHASE.GLOBAL)
         ctx._push()
@@ -196,6 +211,8 @@ def run(config, source_code=None, user_funcs=None):
                     v = v.__dict__
                 setattr(ucontext, k, v)
 
+        if env.event_profiler:
+            user_strategy.init = env.event_profiler.wrap(const.EXECUTION_PHASE.ON_INIT, user_strategy.init)
         if persist_helper:
             with LogCapture(user_log) as log_capture:
                 user_strategy.init()
@@ -224,16 +241,22 @@ def run(config, source_code=None, user_funcs=None):
 
         if env.profile_deco:
             output_profile_result(env)
+        if env.event_profiler:
+            output_event_profile_result(env)
         release_print(scope)
     except CustomException as e:
         if init_succeed and persist_helper and env.config.base.persist_mode == const.PERSIST_MODE.ON_CRASH:
             persist_helper.persist()
+        if persist_helper:
+            persist_helper.flush()
         code = _exception_handler(e)
         mod_handler.tear_down(code, e)
         raise e
     except Exception as e:
         if init_succeed and persist_helper and env.config.base.persist_mode == const.PERSIST_MODE.ON_CRASH:
             persist_helper.persist()
+        if persist_helper:
+            persist_helper.flush()
 
         exc_type, exc_val, exc_tb = sys.exc_info()
         user_exc = create_custom_exception(exc_type, exc_val, exc_tb, config.base.strategy_file)
@@ -244,10 +267,14 @@ def run(config, source_code=None, user_funcs=None):
     else:
         if persist_helper and env.config.base.persist_mode == const.PERSIST_MODE.ON_NORMAL_EXIT:
             persist_helper.persist()
+        if persist_helper:
+            persist_helper.flush()
         result = mod_handler.tear_down(const.EXIT_CODE.EXIT_SUCCESS)
         system_log.debug(_(u"strategy run successfully, normal exit"))
         return result
     finally:
+        if persist_helper:
+            persist_helper.close()
         cleanup_resources(env)
 
 
@@ -294,6 +321,16 @@ def output_profile_result(env):
     env.event_bus.publish_event(Event(EVENT.ON_LINE_PROFILER_RESULT, result=profile_output))
 
 
+def enable_event_profiler(env):
+    from rqalpha.core.event_profiler import EventProfiler
+    env.event_profiler = EventProfiler()
+    env.event_bus.set_listener_wrapper(env.event_profiler.wrap)
+
+
+def output_event_profile_result(env):
+    six.print_(env.event_profiler.format_report())
+
+
 def cleanup_resources(env):
     """
     清理资源，防止内存泄漏
@@ -309,9 +346,9 @@ def cleanup_resources(env):
             method = getattr(env.data_proxy, method_name, None)
             if method and hasattr(method, 'cache_clear'):
                 method.cache_clear()
-    # 3. 清理 BaseDataSource 中的 Instrument 缓存（这是最大的内存占用）
-    if hasattr(env, 'data_source'):
-        for property_name in ['_id_instrument_map', '_sym_instrument_map', '_grouped_instruments']:
+    # 3. 清理 BaseDataSource 中的 Instrument 缓存（这是最大的内存占用），通过 BaseDataSource.share 共享的数据源需保留
+    if hasattr(env, 'data_source') and not getattr(env.data_source, 'shared', False):
+        for property_name in ['_table_instruments', '_id_instrument_map', '_sym_instrument_map', '_grouped_instruments']:
             if hasattr(env.data_source, property_name):
                 getattr(env.data_source, property_name).clear()
 
@@ -130,7 +130,8 @@ class OrderTargetPortfolio:
             dtype='int64',
         )
         self._suspended = Series(
-            {i: env.data_proxy.is_suspended(i, env.trading_dt) for i in index},
+            env.data_proxy.is_suspended_many(index, env.trading_dt),
+            index=index,
             dtype=bool,
         )
 
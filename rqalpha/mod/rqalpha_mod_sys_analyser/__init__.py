@@ -35,6 +35,9 @@ __config__ = {
     "output_file": None,
     # 回测报告的数据目录，报告为 csv 格式；若不设置则不输出报告
     "report_save_path": None,
+    # 每日组合、账户及持仓记录的 HDF5 文件路径，设置后上述记录在运行过程中按列分批写入该文件，内存占用不随回测长度增长，
+    # 且可在回测结束前读取该文件查看已写入的记录；若不设置则全部记录保存在内存中
+    "record_file": None,
     # 是否在回测结束后绘制收益曲线图
     'plot': False,
     # 收益曲线图路径，若设置则将收益曲线图保存为 png 文件
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），
+#         您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、
+#         本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，
+#         否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+import datetime
+import pickle
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import h5py
+import numpy as np
+import pandas as pd
+
+_DATE = np.dtype("M8[D]")
+
+
+def _infer_dtype(value):
+    # 动态列按首个值选择列的类型，无法确定的一律使用 object
+    if isinstance(value, (bool, np.bool_)):
+        return np.dtype(object)
+    if isinstance(value, (int, np.integer)):
+        return np.dtype(np.int64)
+    if isinstance(value, (float, np.floating)):
+        return np.dtype(np.float64)
+    if type(value) is datetime.date:
+        return _DATE
+    return np.dtype(object)
+
+
+def _missing_value(dtype):
+    return np.datetime64("NaT") if dtype.kind == "M" else np.nan
+
+
+def _columns_to_dataframe(names: Sequence[str], columns: Mapping[str, np.ndarray]) -> pd.DataFrame:
+    # object 列转换为 list 后再交由 pandas 推断类型，与由 dict 列表构造 DataFrame 的结果保持一致
+    def _convert(column):
+        if column.dtype == object:
+            return column.tolist()
+        if column.dtype.kind == "M":
+            return column.astype("M8[ns]")
+        return column.copy()
+    return pd.DataFrame({name: _convert(columns[name]) for name in names}, columns=list(names))
+
+
+class ColumnarLog:
+    """
+    按列存储的追加式记录表，每列为一个按倍数扩容的 numpy 数组，每行只占用各列元素本身的空间。
+
+    整数列只接受整数，其他无法以声明类型存储的值（如 None、字符串形式的 id）会使该列退化为 object 类型。
+    通过 append_record 追加的记录中出现的新字段会新增一列，记录中缺失的字段与由 dict 列表构造 DataFrame 时一致记为 NaN。
+    """
+
+    def __init__(self, columns: Sequence[Tuple[str, Any]] = (), capacity: int = 1024):
+        self._names: List[str] = [name for name, _ in columns]
+        self._columns: Dict[str, np.ndarray] = {name: np.empty(capacity, dtype=dtype) for name, dtype in columns}
+        self._capacity = capacity
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def names(self) -> List[str]:
+        return self._names
+
+    def _grow(self):
+        self._capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.empty(self._capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _add_column(self, name, value):
+        dtype = _infer_dtype(value)
+        if self._size and dtype.kind in "iu":
+            # 整数列无法表示此前缺失的行
+            dtype = np.dtype(object)
+        column = np.empty(self._capacity, dtype=dtype)
+        column[:self._size] = _missing_value(dtype)
+        self._names.append(name)
+        self._columns[name] = column
+
+    def append(self, *values):
+        size = self._size
+        if size == self._capacity:
+            self._grow()
+        for name, value in zip(self._names, values):
+            column = self._columns[name]
+            if (column.dtype.kind in "iu" and not isinstance(value, (int, np.integer))) or (
+                column.dtype == _DATE and not (type(value) is datetime.date or isinstance(value, np.datetime64))
+            ):
+                # 避免字符串、浮点数被静默转换为整数，datetime 被静默截断为日期
+                column = self._columns[name] = column.astype(object)
+            try:
+                column[size] = value
+            except (TypeError, ValueError, OverflowError):
+                column = self._columns[name] = column.astype(object)
+                column[size] = value
+        self._size = size + 1
+
+    def append_record(self, record: Mapping[str, Any]):
+        for name, value in record.items():
+            if name not in self._columns:
+                self._add_column(name, value)
+        columns = self._columns
+        self.append(*(
+            record[name] if name in record else _missing_value(columns[name].dtype) for name in self._names
+        ))
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name][:self._size]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return _columns_to_dataframe(self._names, {name: self.column(name) for name in self._names})
+
+    def get_state(self) -> Dict[str, list]:
+        return {name: self.column(name).tolist() for name in self._names}
+
+    def set_state(self, state: Dict[str, list]):
+        self._size = 0
+        names = list(state)
+        for values in zip(*(state[name] for name in names)):
+            self.append_record(dict(zip(names, values)))
+
+
+class ColumnarRecorder:
+    """
+    以 ColumnarLog 为缓冲的记录表。指定 path 时，缓冲的行数达到 flush_rows 后会按列追加写入 HDF5 文件并清空缓冲，
+    使运行期间的内存占用不随记录数增长，且在运行结束前即可读取文件查看已写入的记录。
+
+    文件中每张表为一个 group，每次写入为其下以序号命名的子 group，每列为一个 dataset；
+    字符串列以变长字符串保存，日期列以 int64 保存并在 dtype 属性中记录原类型，其他 object 列整列以 pickle 保存。
+    """
+
+    def __init__(self, name: str, path: Optional[str] = None, flush_rows: int = 4096):
+        self._name = name
+        self._path = path
+        self._flush_rows = flush_rows
+        self._buffer = ColumnarLog()
+        self._chunks = 0
+        self._flushed_rows = 0
+        # 首次写入前需移除文件中此前运行遗留的、序号不小于 _chunks 的记录
+        self._truncated = False
+
+    def __len__(self):
+        return self._flushed_rows + len(self._buffer)
+
+    def append_record(self, record: Mapping[str, Any]):
+        self._buffer.append_record(record)
+        if self._path and len(self._buffer) >= self._flush_rows:
+            self.flush()
+
+    def _open(self, mode):
+        return h5py.File(self._path, mode)
+
+    def flush(self):
+        if not self._path:
+            return
+        with self._open("a") as h5:
+            table = h5.require_group(self._name)
+            if not self._truncated:
+                for key in [k for k in table.keys() if int(k) >= self._chunks]:
+                    del table[key]
+                self._truncated = True
+            if len(self._buffer) == 0:
+                return
+            chunk = table.create_group(str(self._chunks))
+            chunk.attrs["columns"] = self._buffer.names
+            for name in self._buffer.names:
+                self._write_column(chunk, name, self._buffer.column(name))
+        self._chunks += 1
+        self._flushed_rows += len(self._buffer)
+        self._buffer = ColumnarLog()
+
+    @staticmethod
+    def _write_column(chunk, name, column):
+        if column.dtype.kind == "M":
+            dataset = chunk.create_dataset(name, data=column.view(np.int64))
+            dataset.attrs["dtype"] = column.dtype.str
+        elif column.dtype != object:
+            chunk.create_dataset(name, data=column)
+        elif all(isinstance(v, str) for v in column):
+            chunk.create_dataset(name, data=column, dtype=h5py.string_dtype())
+        else:
+            dataset = chunk.create_dataset(name, data=np.void(pickle.dumps(column.tolist())))
+            dataset.attrs["dtype"] = "pickle"
+
+    @staticmethod
+    def _read_column(dataset):
+        dtype = dataset.attrs.get("dtype")
+        if dtype == "pickle":
+            values = pickle.loads(dataset[()].tobytes())
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            return column
+        if dtype is not None:
+            return dataset[()].view(np.dtype(dtype))
+        if h5py.check_string_dtype(dataset.dtype) is not None:
+            return dataset.asstr()[()].astype(object)
+        return dataset[()]
+
+    def _iter_chunks(self):
+        if self._chunks:
+            with self._open("r") as h5:
+                table = h5[self._name]
+                for i in range(self._chunks):
+                    chunk = table[str(i)]
+                    yield list(chunk.attrs["columns"]), {k: self._read_column(v) for k, v in chunk.items()}
+        if len(self._buffer):
+            yield self._buffer.names, {name: self._buffer.column(name) for name in self._buffer.names}
+
+    def to_dataframe(self) -> pd.DataFrame:
+        names = []  # type: List[str]
+        chunks = []
+        for chunk_names, columns in self._iter_chunks():
+            names.extend(n for n in chunk_names if n not in names)
+            chunks.append((len(columns[chunk_names[0]]) if chunk_names else 0, columns))
+        merged = {}
+        for name in names:
+            dtype = next(columns[name].dtype for _, columns in chunks if name in columns)
+            if dtype.kind not in "fM":
+                dtype = np.dtype(object)
+            parts = [
+                columns[name] if name in columns else np.full(size, _missing_value(dtype), dtype=dtype)
+                for size, columns in chunks
+            ]
+            if len({p.dtype for p in parts}) > 1:
+                parts = [p.astype(object) for p in parts]
+            merged[name] = np.concatenate(parts)
+        return _columns_to_dataframe(names, merged)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {"chunks": self._chunks, "flushed_rows": self._flushed_rows, "buffer": self._buffer.get_state()}
+
+    def set_state(self, state):
+        if isinstance(state, dict):
+            # 已写入文件的记录保留在文件中，保存状态之后写入的部分在下次写入时移除
+            self._chunks = state["chunks"] if self._path else 0
+            self._flushed_rows = state["flushed_rows"] if self._path else 0
+            self._truncated = False
+            self._buffer = ColumnarLog()
+            self._buffer.set_state(state["buffer"])
+        else:
+            # 兼容旧版本以 dict 列表保存的记录
+            self._chunks = self._flushed_rows = 0
+            self._truncated = False
+            self._buffer = ColumnarLog()
+            for record in state:
+                self._buffer.append_record(record)
@@ -23,6 +23,7 @@ import jsonpickle
 import datetime
 from operator import attrgetter, itemgetter
 from collections import defaultdict
+from itertools import chain
 from typing import Dict, Optional, List, Tuple, Union, Iterable, NamedTuple
 try:
     from typing import Protocol
@@ -45,6 +46,7 @@ from rqalpha.api import export_as_api
 from rqalpha.const import TRADING_CALENDAR_TYPE
 from rqalpha.model import Instrument
 from rqalpha.model.order import Order
+from .columnar import ColumnarLog, ColumnarRecorder
 from .plot.consts import DefaultPlot, PLOT_TEMPLATE
 from .plot.utils import max_ddd as _max_ddd
 from .plot_store import PlotStore
@@ -96,6 +98,7 @@ class ModConfigProtocol(Protocol):
     strategy_name: Optional[str]
     output_file: Optional[str]
     report_save_path: Optional[str]
+    record_file: Optional[str]
     plot: bool
     plot_save_file: Optional[str]
     plot_config: PlotConfigProtocol
@@ -105,15 +108,29 @@ class AnalyserMod(AbstractMod):
     _env: Environment
     _mod_config: ModConfigProtocol
 
+    TRADE_COLUMNS = [
+        ("datetime", "M8[s]"), ("trading_datetime", "M8[s]"), ("order_book_id", object), ("symbol", object),
+        ("side", object), ("position_effect", object), ("exec_id", np.int64), ("tax", np.float64),
+        ("commission", np.float64), ("last_quantity", np.int64), ("last_price", np.float64), ("order_id", np.int64),
+        ("transaction_cost", np.float64),
+    ]
+    ORDER_COLUMNS = [
+        ("order_id", np.int64), ("datetime", "M8[s]"), ("trading_datetime", "M8[s]"), ("order_book_id", object),
+        ("side", object), ("position_effect", object), ("type", object), ("quantity", np.int64), ("price", np.float64),
+    ]
+
     def __init__(self):
         self._enabled = False
 
-        self._orders = []
-        self._trades = []
-        self._total_portfolios = []
+        # 订单及成交按列记录，避免在整个回测期间持有全部 Order 对象及每笔成交一个 dict
+        self._orders = ColumnarLog(self.ORDER_COLUMNS)
+        self._trades = ColumnarLog(self.TRADE_COLUMNS)
+        # 每日的组合、账户及持仓记录按列记录，设置 record_file 时在运行过程中写入文件
+        self._record_file = None
+        self._total_portfolios = ColumnarRecorder("portfolio")
         self._total_benchmark_portfolios = []
-        self._sub_accounts = defaultdict(list)
-        self._positions = defaultdict(list)
+        self._sub_accounts = {}  # type: Dict[str, ColumnarRecorder]
+        self._positions = {}  # type: Dict[str, ColumnarRecorder]
         self._daily_pnl = []
 
         self._benchmark_daily_returns = []
@@ -129,23 +146,27 @@ class AnalyserMod(AbstractMod):
         return jsonpickle.dumps({
             'benchmark_daily_returns': [float(v) for v in self._benchmark_daily_returns],
             'portfolio_daily_returns': [float(v) for v in self._portfolio_daily_returns],
-            'total_portfolios': self._total_portfolios,
+            'total_portfolios': self._total_portfolios.get_state(),
             'total_benchmark_portfolios': self._total_benchmark_portfolios,
-            'sub_accounts': self._sub_accounts,
-            'positions': self._positions,
-            'orders': self._orders,
-            'trades': self._trades,
+            'sub_accounts': {k: r.get_state() for k, r in self._sub_accounts.items()},
+            'positions': {k: r.get_state() for k, r in self._positions.items()},
+            'orders': self._orders.get_state(),
+            'trades': self._trades.get_state(),
             'daily_pnl': self._daily_pnl
         }).encode('utf-8')  # type: ignore
 
     def set_state(self, state):
         value = jsonpickle.loads(state.decode('utf-8'))
         self._portfolio_daily_returns = value["portfolio_daily_returns"]
-        self._total_portfolios = value['total_portfolios']
-        self._sub_accounts = value['sub_accounts']
-        self._positions = value["positions"]
-        self._orders = value["orders"]
-        self._trades = value["trades"]
+        self._total_portfolios.set_state(value['total_portfolios'])
+        for account_type, account_state in value['sub_accounts'].items():
+            self._sub_account_recorder(account_type).set_state(account_state)
+        for account_type, positions_state in value["positions"].items():
+            self._positions_recorder(account_type).set_state(positions_state)
+        self._set_log_state(self._orders, value["orders"], self._append_order)
+        self._set_log_state(self._trades, value["trades"], lambda r: self._trades.append(
+            *(r[name] for name in self._trades.names)
+        ))
         self._daily_pnl = value.get("daily_pnl", [])
 
     def start_up(self, env, mod_config):
@@ -159,6 +180,10 @@ class AnalyserMod(AbstractMod):
         if self._enabled:
             env.event_bus.add_listener(EVENT.POST_SYSTEM_INIT, self._subscribe_events)
 
+            if mod_config.record_file:
+                self._record_file = os.path.abspath(os.path.expanduser(mod_config.record_file))
+                self._total_portfolios = ColumnarRecorder("portfolio", self._record_file)
+
             if not mod_config.benchmark:
                 if getattr(env.config.base, "benchmark", None):
                     user_system_log.warning(
@@ -269,21 +294,67 @@ class AnalyserMod(AbstractMod):
         self._env.event_bus.add_listener(EVENT.TAXES_PAID, self._on_taxes_paid)
 
     def _collect_trade(self, event):
-        self._trades.append(self._to_trade_record(event.trade))
+        trade = event.trade
+        self._trades.append(
+            trade.datetime, trade.trading_datetime, trade.order_book_id,
+            self._symbol(trade.order_book_id, trade.trading_datetime), trade.side.name, trade.position_effect.name,
+            trade.exec_id, trade.tax, trade.commission, trade.last_quantity, self._safe_convert(trade.last_price),
+            trade.order_id, trade.transaction_cost
+        )
 
     def _collect_order(self, event):
-        self._orders.append(event.order)
+        self._append_order(event.order)
+
+    def _append_order(self, order: Order):
+        self._orders.append(
+            order.order_id, order.datetime, order.trading_datetime, order.order_book_id, order.side.name,
+            order.position_effect.name, order.type.name, order.quantity, order.price
+        )
+
+    @staticmethod
+    def _set_log_state(log: ColumnarLog, state, append_record):
+        if isinstance(state, dict):
+            log.set_state(state)
+        else:
+            # 兼容旧版本以 list 保存的记录
+            for record in state:
+                append_record(record)
+
+    def _trades_dataframe(self) -> pd.DataFrame:
+        if len(self._trades) == 0:
+            return pd.DataFrame()
+        trades = self._trades.to_dataframe()
+        for column in ("datetime", "trading_datetime"):
+            trades[column] = trades[column].dt.strftime("%Y-%m-%d %H:%M:%S")
+        return trades
+
+    def _sub_account_recorder(self, account_type) -> ColumnarRecorder:
+        try:
+            return self._sub_accounts[account_type]
+        except KeyError:
+            return self._sub_accounts.setdefault(
+                account_type, ColumnarRecorder("{}_account".format(account_type.lower()), self._record_file)
+            )
+
+    def _positions_recorder(self, account_type) -> ColumnarRecorder:
+        try:
+            return self._positions[account_type]
+        except KeyError:
+            return self._positions.setdefault(
+                account_type, ColumnarRecorder("{}_positions".format(account_type.lower()), self._record_file)
+            )
 
     def _collect_daily(self, _):
         date = self._env.calendar_dt.date()
         portfolio = self._env.portfolio
 
         self._portfolio_daily_returns.append(portfolio.daily_returns)
-        self._total_portfolios.append(self._to_portfolio_record(date, portfolio))
+        self._total_portfolios.append_record(self._to_portfolio_record(date, portfolio))
         self._daily_pnl.append(portfolio.daily_pnl)
 
         for account_type, account in self._env.portfolio.accounts.items():
-            self._sub_accounts[account_type].append(self._to_account_record(date, account))
+            self._sub_account_recorder(account_type).append_record(self._to_account_record(date, account))
+            positions_recorder = self._positions_recorder(account_type)
             pos_dict = {}
             for pos in account.get_positions():
                 pos_dict.setdefault(pos.order_book_id, {})[pos.direction] = pos
@@ -293,7 +364,7 @@ class AnalyserMod(AbstractMod):
                     self._env.calendar_dt, order_book_id, pos.get(POSITION_DIRECTION.LONG), pos.get(POSITION_DIRECTION.SHORT)
                 )
                 if record is not None:
-                    self._positions[account_type].append(record)
+                    positions_recorder.append_record(record)
 
     def _on_taxes_paid(self, event):
         # 将扣税事件信息加入 self._portfolio_event 中
@@ -414,23 +485,6 @@ class AnalyserMod(AbstractMod):
                 data[direction_prefix + "_avg_open_price"] = self._safe_convert(getattr(pos, "avg_price", None))
         return data
 
-    def _to_trade_record(self, trade):
-        return {
-            'datetime': trade.datetime.strftime("%Y-%m-%d %H:%M:%S"),
-            'trading_datetime': trade.trading_datetime.strftime("%Y-%m-%d %H:%M:%S"),
-            'order_book_id': trade.order_book_id,
-            'symbol': self._symbol(trade.order_book_id, trade.trading_datetime),
-            'side': trade.side.name,
-            'position_effect': trade.position_effect.name,
-            'exec_id': trade.exec_id,
-            'tax': trade.tax,
-            'commission': trade.commission,
-            'last_quantity': trade.last_quantity,
-            'last_price': self._safe_convert(trade.last_price),
-            'order_id': trade.order_id,
-            'transaction_cost': trade.transaction_cost,
-        }
-
     def _to_portfolio_event_record(self, portfolio_event: PortfolioEventRecord):
         return {
             "datetime": portfolio_event.event_datetime.strftime("%Y-%m-%d %H:%M:%S"),
@@ -568,11 +622,15 @@ class AnalyserMod(AbstractMod):
             benchmark_annualized_returns = (benchmark_total_returns + 1) ** (trading_days_a_year / date_count) - 1
             summary['benchmark_annualized_returns'] = benchmark_annualized_returns
 
-        trades = pd.DataFrame(self._trades)
+        trades = self._trades_dataframe()
         if 'datetime' in trades.columns:
             trades = trades.set_index(pd.DatetimeIndex(trades['datetime']))
 
-        df = pd.DataFrame(self._total_portfolios)
+        for recorder in chain([self._total_portfolios], self._sub_accounts.values(), self._positions.values()):
+            # 将缓冲中剩余的记录写入文件，使文件包含完整的记录
+            recorder.flush()
+
+        df = self._total_portfolios.to_dataframe()
         df['date'] = pd.to_datetime(df['date'])
         total_portfolios = df.set_index('date').sort_index()
         if self._benchmark:
@@ -695,14 +753,12 @@ class AnalyserMod(AbstractMod):
 
         for account_type, account in self._env.portfolio.accounts.items():
             account_name = account_type.lower()
-            portfolios_list = self._sub_accounts[account_type]
-            df = pd.DataFrame(portfolios_list)
+            df = self._sub_account_recorder(account_type).to_dataframe()
             df["date"] = pd.to_datetime(df["date"])
             df = df.set_index("date").sort_index()
             result_dict["{}_account".format(account_name)] = df
 
-            positions_list = self._positions[account_type]
-            df = pd.DataFrame(positions_list)
+            df = self._positions_recorder(account_type).to_dataframe()
             if "date" in df.columns:
                 df["date"] = pd.to_datetime(df["date"])
                 df = df.set_index("date").sort_index()
@@ -730,6 +786,10 @@ class AnalyserMod(AbstractMod):
         result_dict["positions_weight"] = positions_weight_df
         result_dict["yearly_risk_free_rates"] = dict(_get_yearly_risk_free_rates(data_proxy, start_date, end_date))
 
+        if self._env.event_profiler:
+            result_dict["event_profile"] = self._env.event_profiler.listener_report()
+            result_dict["data_proxy_calls"] = self._env.event_profiler.data_proxy_report()
+
         if self._mod_config.output_file:
             with open(self._mod_config.output_file, 'wb') as f:
                 pickle.dump(result_dict, f)
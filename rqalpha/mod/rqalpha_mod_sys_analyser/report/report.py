@@ -187,7 +187,8 @@ def generate_report(result_dict, output_path):
     generate_xlsx_reports(generate_dict, output_path)
 
     for name in ["portfolio", "stock_account", "future_account",
-                 "stock_positions", "future_positions", "trades", "positions_weight"]:
+                 "stock_positions", "future_positions", "trades", "positions_weight", "event_profile",
+                 "data_proxy_calls"]:
         try:
             df = result_dict[name]
         except KeyError:
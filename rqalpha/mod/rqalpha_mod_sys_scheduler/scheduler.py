@@ -17,7 +17,8 @@
 
 import datetime
 import json
-from typing import List, Tuple, Callable, Optional
+from bisect import bisect_right
+from typing import Dict, List, Tuple, Callable, Optional, Union
 
 from dateutil.parser import parse
 
@@ -63,13 +64,13 @@ def _verify_function(name, func):
 
 class Scheduler(object):
     def __init__(self, frequency):
-        self._registry = []       # type: List[Tuple[Callable[[], bool], Callable[[], bool], Callable]]
+        # time_rule 为 'before_trading' 或自零点起的分钟数
+        self._registry = []       # type: List[Tuple[Callable[[], bool], Union[str, int], Callable]]
         self._today = None        # type: Optional[datetime.date]
         self._this_week = None    # type: Optional[List[datetime.date]]
         self._this_month = None   # type: Optional[List[datetime.date]]
         self._last_minute = 0     # type: Optional[int]
         self._current_minute = 0  # type: Optional[int]
-        self._stage = None
         self._frequency = frequency
         self._trading_calendar = None
         self._ucontext = None
@@ -93,6 +94,11 @@ class Scheduler(object):
         # 开盘时间
         self._start_minute = 0
 
+        # 当日的触发表，在每个交易日开始及标的变化时根据 _registry 生成，避免每个 bar 逐个判断触发条件
+        self._before_trading_jobs = []  # type: List[Callable]
+        self._minute_jobs = {}          # type: Dict[int, List[Tuple[int, Callable]]]
+        self._job_minutes = []          # type: List[int]
+
     def _universe_change(self, event):
         # 清空交易时段
         self._trading_minute_range.clear()
@@ -119,6 +125,9 @@ class Scheduler(object):
             self._trading_minute_range.add((571, 690))
             self._trading_minute_range.add((780, 900))
 
+        if self._today is not None:
+            self._compile_jobs()
+
     @property
     def trading_calendar(self):
         if self._trading_calendar is not None:
@@ -154,45 +163,52 @@ class Scheduler(object):
         except IndexError:
             return False
 
-    def _should_trigger(self, n):
-        # 非交易时间段内不触发
-        flag = False
+    def _in_trading_minute_range(self, n):
         for start_minute, end_minute in self._trading_minute_range:
             if start_minute <= n <= end_minute:
-                flag = True
-
-        # 不在交易时段内
-        if not flag:
-            return False
-
-        # 盘前
-        if self._stage == "before_trading":
-            return False
-
-        # 日频
-        if self._frequency == "1d":
-            return True
-
-        # 处理期货夜盘跨物理日期的0点0分
-        if n == 0 and self._current_minute == n:
-            return True
-
-        return self._last_minute < n <= self._current_minute
-
-    def _is_before_trading(self):
-        return self._stage == 'before_trading'
+                return True
+        return False
 
     def _time_rule_for(self, time_rule):
         if time_rule == 'before_trading':
-            return lambda: self._is_before_trading()
+            return time_rule
 
         if time_rule is not None and not isinstance(time_rule, int):
             raise patch_user_exc(ValueError(
                 'invalid time_rule, "before_trading" or int expected, got {}'.format(repr(time_rule))
             ))
         # 期货交易的交易时段存在0点
-        time_rule = time_rule if time_rule is not None else self._minutes_since_midnight(9, 31)
-        return lambda: self._should_trigger(time_rule)
+        return time_rule if time_rule is not None else self._minutes_since_midnight(9, 31)
+
+    def _compile_jobs(self):
+        # 日期规则每个交易日只需判断一次；时间规则为分钟数的函数按分钟归类，非交易时段内的不触发
+        self._before_trading_jobs = []
+        self._minute_jobs = {}
+        for i, (day_rule, time_rule, func) in enumerate(self._registry):
+            if not day_rule():
+                continue
+            if time_rule == 'before_trading':
+                self._before_trading_jobs.append(func)
+            elif self._in_trading_minute_range(time_rule):
+                self._minute_jobs.setdefault(time_rule, []).append((i, func))
+        self._job_minutes = sorted(self._minute_jobs)
+
+    def _jobs_to_trigger(self):
+        # 日频每个 bar 触发全部函数
+        if self._frequency == "1d":
+            minutes = self._job_minutes
+        # 处理期货夜盘跨物理日期的0点0分
+        elif self._current_minute == 0:
+            minutes = [0] if 0 in self._minute_jobs else []
+        else:
+            # 触发自上一个 bar 之后（不含）至当前 bar（含）之间的函数
+            minutes = self._job_minutes[
+                bisect_right(self._job_minutes, self._last_minute):bisect_right(self._job_minutes, self._current_minute)
+            ]
+        if len(minutes) == 1:
+            return [func for _, func in self._minute_jobs[minutes[0]]]
+        # 同一个 bar 内触发多个函数时按注册顺序执行
+        return [func for _, func in sorted((job for m in minutes for job in self._minute_jobs[m]), key=lambda j: j[0])]
 
     @ExecutionContext.enforce_phase(EXECUTION_PHASE.ON_INIT)
     def run_daily(self, func, time_rule=None):
@@ -256,6 +272,7 @@ class Scheduler(object):
             self._fill_week()
         if not self._this_month or self._today > self._this_month[-1]:
             self._fill_month()
+        self._compile_jobs()
 
     @staticmethod
     def _minutes_since_midnight(hour, minute):
@@ -264,21 +281,17 @@ class Scheduler(object):
     def next_bar_(self, event):
         bars = event.bar_dict
         self._current_minute = self._minutes_since_midnight(self.ucontext.now.hour, self.ucontext.now.minute)
-        for day_rule, time_rule, func in self._registry:
-            if day_rule() and time_rule():
-                with ExecutionContext(EXECUTION_PHASE.SCHEDULED):
-                    with ModifyExceptionFromType(EXC_TYPE.USER_EXC):
-                        func(self.ucontext, bars)
+        for func in self._jobs_to_trigger():
+            with ExecutionContext(EXECUTION_PHASE.SCHEDULED):
+                with ModifyExceptionFromType(EXC_TYPE.USER_EXC):
+                    func(self.ucontext, bars)
         self._last_minute = self._current_minute
 
     def before_trading_(self, event):
-        self._stage = 'before_trading'
-        for day_rule, time_rule, func in self._registry:
-            if day_rule() and time_rule():
-                with ExecutionContext(EXECUTION_PHASE.BEFORE_TRADING):
-                    with ModifyExceptionFromType(EXC_TYPE.USER_EXC):
-                        func(self.ucontext, None)
-        self._stage = None
+        for func in self._before_trading_jobs:
+            with ExecutionContext(EXECUTION_PHASE.BEFORE_TRADING):
+                with ModifyExceptionFromType(EXC_TYPE.USER_EXC):
+                    func(self.ucontext, None)
 
     def _fill_week(self):
         weekday = self._today.isoweekday()
@@ -306,6 +319,7 @@ class Scheduler(object):
         self._last_minute = r['last_minute']
         self._fill_month()
         self._fill_week()
+        self._compile_jobs()
 
     def get_state(self):
         if self._today is None:
@@ -19,6 +19,7 @@ from collections import defaultdict
 from copy import copy
 
 import numpy as np
+import pandas as pd
 
 from rqalpha.const import MATCHING_TYPE, ORDER_TYPE, POSITION_EFFECT, SIDE
 from rqalpha.environment import Environment
@@ -28,8 +29,8 @@ from rqalpha.model.trade import Trade
 from rqalpha.model.tick import TickObject
 from rqalpha.portfolio.account import Account
 from rqalpha.utils import is_valid_price
-from rqalpha.utils.price_limits import reaches_limit
-from typing import Dict
+from rqalpha.utils.price_limits import reaches_limit, reaches_limit_up_vectorized, reaches_limit_down_vectorized
+from typing import Dict, Sequence, Tuple
 from rqalpha.utils.i18n import gettext as _
 from .slippage import SlippageDecider
 
@@ -38,6 +39,15 @@ class AbstractMatcher:
     def match(self, account: Account, order: Order, open_auction: bool) -> None:
         raise NotImplementedError
 
+    def match_batch(self, account_orders: Sequence[Tuple[Account, Order]], open_auction: bool) -> None:
+        """
+        按顺序撮合一批订单，子类可以重写该方法以批量获取行情。
+        订单可能在撮合前一个订单所触发的事件中被撤销，因此需逐个判断订单是否已结束。
+        """
+        for account, order in account_orders:
+            if not order.is_final():
+                self.match(account, order, open_auction)
+
     def update(self, event):
         raise NotImplementedError
 
@@ -52,6 +62,11 @@ class DefaultBarMatcher(AbstractMatcher):
         self._volume_limit = mod_config.volume_limit
         self._env: Environment = env
         self._deal_price_decider = self._create_deal_price_decider(mod_config.matching_type)
+        # 可直接从 bar 中批量读取成交价的撮合方式
+        self._deal_price_field = {
+            MATCHING_TYPE.CURRENT_BAR_CLOSE: "close",
+            MATCHING_TYPE.NEXT_BAR_OPEN: "open",
+        }.get(mod_config.matching_type)
 
     def _create_deal_price_decider(self, matching_type):
         decider_dict = {
@@ -117,23 +132,9 @@ class DefaultBarMatcher(AbstractMatcher):
         deal_price = self._get_deal_price(order, open_auction)
 
         if not is_valid_price(deal_price):
-            listed_date = instrument.listed_date.date()
-            if listed_date == self._env.trading_dt.date():
-                reason = _(
-                    u"Order Cancelled: current security [{order_book_id}] can not be traded"
-                    u" in listed date [{listed_date}]").format(
-                    order_book_id=order.order_book_id,
-                    listed_date=listed_date,
-                )
-            elif isinstance(order.style, ALGO_ORDER_STYLES):
-                reason = _(u"Order Cancelled: {order_book_id} miss market data or bar no volume.").format(order_book_id=order.order_book_id)
-            else:
-                # 撮合的时候无行情数据也不需要撤单，等到有行情再撮合
-                reason = None
-            if reason:
-                order.mark_rejected(reason)
+            self._on_invalid_deal_price(order, instrument)
             return
-        
+
         price_board = self._env.price_board
         if order.type == ORDER_TYPE.LIMIT:
             if order.side == SIDE.BUY and order.price < deal_price:
@@ -147,21 +148,117 @@ class DefaultBarMatcher(AbstractMatcher):
         else:
             if self._price_limit:
                 if reaches_limit(order_book_id, deal_price, order.side, price_board, tick_size):
-                    reason = _(
-                        "Order Cancelled: current bar [{order_book_id}] reach the {limit_up_or_down} price."
-                    ).format(order_book_id=order.order_book_id, limit_up_or_down="limit_up" if order.side == SIDE.BUY else "limit_down")
-                    order.mark_rejected(reason)
+                    self._on_reaches_limit(order)
                     return
 
+        if self._inactive_limit or self._volume_limit:
+            volume = self._get_bar_volume(order, open_auction=open_auction)
+        else:
+            volume = np.nan
+        if self._inactive_limit and volume == 0:
+            self._on_no_volume(order)
+            return
+        self._fill(account, order, instrument, deal_price, volume, open_auction)
+
+    def match_batch(self, account_orders: Sequence[Tuple[Account, Order]], open_auction: bool) -> None:
+        """
+        批量撮合同一个 bar 内的订单：按合约一次性取出成交价、成交量及涨跌停价，并用向量运算筛出无行情、
+        未触及委托价、涨跌停及无成交量的订单，只有剩余订单需要逐个计算成交量、滑点并生成成交。
+        由于成交量限制及资金检查依赖于此前订单的成交结果，成交仍按订单顺序逐个生成，结果与逐个调用 match 一致。
+        """
+        batch = [
+            i for i, (account, order) in enumerate(account_orders)
+            if not isinstance(order.style, ALGO_ORDER_STYLES)
+            and order.position_effect in self.SUPPORT_POSITION_EFFECTS and order.side in self.SUPPORT_SIDES
+        ]
+        if open_auction or self._deal_price_field is None or len(batch) < 2:
+            return super(DefaultBarMatcher, self).match_batch(account_orders, open_auction)
+
+        data_proxy = self._env.data_proxy
+        price_board = self._env.price_board
+        orders = [account_orders[i][1] for i in batch]
+        order_book_ids = list(dict.fromkeys(o.order_book_id for o in orders))
+        columns = {o: i for i, o in enumerate(order_book_ids)}
+        index = np.array([columns[o.order_book_id] for o in orders])
+
+        dt, frequency = self._env.calendar_dt, self._env.config.base.frequency
+        deal_prices = data_proxy.get_bars_field(order_book_ids, dt, frequency, self._deal_price_field)[index]
+        volumes = data_proxy.get_bars_field(order_book_ids, dt, frequency, "volume")[index]
+        instruments = [data_proxy.instrument(o) for o in order_book_ids]
+        tick_sizes = np.array([ins.tick_size() for ins in instruments], dtype=float)[index]
+
+        is_buy = np.array([o.side == SIDE.BUY for o in orders])
+        is_limit = np.array([o.type == ORDER_TYPE.LIMIT for o in orders])
+        order_prices = np.array([o.price if o.type == ORDER_TYPE.LIMIT else np.nan for o in orders], dtype=float)
+
+        with np.errstate(invalid="ignore"):
+            invalid = ~(deal_prices > 0)
+            not_reached = is_limit & np.where(is_buy, order_prices < deal_prices, order_prices > deal_prices)
+        if self._price_limit:
+            limit_ups = np.array([price_board.get_limit_up(o) for o in order_book_ids], dtype=float)[index]
+            limit_downs = np.array([price_board.get_limit_down(o) for o in order_book_ids], dtype=float)[index]
+            prices, ticks = pd.Series(deal_prices), pd.Series(tick_sizes)
+            limit_reached = np.where(
+                is_buy,
+                reaches_limit_up_vectorized(prices, pd.Series(limit_ups), ticks).values,
+                reaches_limit_down_vectorized(prices, pd.Series(limit_downs), ticks).values,
+            )
+        else:
+            limit_reached = np.zeros(len(orders), dtype=bool)
         if self._inactive_limit:
-            bar_volume = self._get_bar_volume(order, open_auction=open_auction)
-            if bar_volume == 0:
-                reason = _(u"Order Cancelled: {order_book_id} bar no volume").format(order_book_id=order.order_book_id)
-                order.mark_cancelled(reason)
-                return
+            no_volume = volumes == 0
+        else:
+            no_volume = np.zeros(len(orders), dtype=bool)
+
+        batch_pos = dict(zip(batch, range(len(batch))))
+        for i, (account, order) in enumerate(account_orders):
+            if order.is_final():
+                continue
+            j = batch_pos.get(i)
+            if j is None:
+                self.match(account, order, open_auction)
+            elif invalid[j]:
+                self._on_invalid_deal_price(order, instruments[index[j]])
+            elif not_reached[j]:
+                continue
+            elif limit_reached[j]:
+                if not is_limit[j]:
+                    self._on_reaches_limit(order)
+            elif no_volume[j]:
+                self._on_no_volume(order)
+            else:
+                self._fill(account, order, instruments[index[j]], deal_prices[j], volumes[j], open_auction)
 
+    def _on_invalid_deal_price(self, order, instrument):
+        listed_date = instrument.listed_date.date()
+        if listed_date == self._env.trading_dt.date():
+            reason = _(
+                u"Order Cancelled: current security [{order_book_id}] can not be traded"
+                u" in listed date [{listed_date}]").format(
+                order_book_id=order.order_book_id,
+                listed_date=listed_date,
+            )
+        elif isinstance(order.style, ALGO_ORDER_STYLES):
+            reason = _(u"Order Cancelled: {order_book_id} miss market data or bar no volume.").format(order_book_id=order.order_book_id)
+        else:
+            # 撮合的时候无行情数据也不需要撤单，等到有行情再撮合
+            reason = None
+        if reason:
+            order.mark_rejected(reason)
+
+    def _on_reaches_limit(self, order):
+        reason = _(
+            "Order Cancelled: current bar [{order_book_id}] reach the {limit_up_or_down} price."
+        ).format(order_book_id=order.order_book_id, limit_up_or_down="limit_up" if order.side == SIDE.BUY else "limit_down")
+        order.mark_rejected(reason)
+
+    def _on_no_volume(self, order):
+        reason = _(u"Order Cancelled: {order_book_id} bar no volume").format(order_book_id=order.order_book_id)
+        order.mark_cancelled(reason)
+
+    def _fill(self, account, order, instrument, deal_price, volume, open_auction):
+        order_book_id = order.order_book_id
         if self._volume_limit:
-            volume = self._get_bar_volume(order, open_auction=open_auction)
             if volume == volume:
                 volume_limit = round(volume * self._volume_percent) - self._turnover[order.order_book_id]
 
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），
+#         您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、
+#         本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，
+#         否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from rqalpha.portfolio.account import Account
+from rqalpha.model.order import Order
+
+
+class OpenOrderBook(object):
+    """
+    未完成订单簿。订单按加入顺序保存，并按 order_book_id 建立索引，
+    加入、移除订单及按合约查找订单的开销与其他合约上的订单数量无关。
+    """
+
+    def __init__(self):
+        # order -> (加入序号, account)
+        self._orders = {}  # type: Dict[Order, Tuple[int, Account]]
+        self._by_order_book_id = {}  # type: Dict[str, Dict[Order, Tuple[int, Account]]]
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order):
+        return order in self._orders
+
+    def _orders_of(self, order_book_id):
+        # type: (Optional[str]) -> Dict[Order, Tuple[int, Account]]
+        if order_book_id is None:
+            return self._orders
+        return self._by_order_book_id.get(order_book_id, {})
+
+    def add(self, account, order):
+        # type: (Account, Order) -> None
+        entry = (self._seq, account)
+        self._seq += 1
+        self._orders[order] = entry
+        self._by_order_book_id.setdefault(order.order_book_id, {})[order] = entry
+
+    def remove(self, order):
+        # type: (Order) -> bool
+        if self._orders.pop(order, None) is None:
+            return False
+        orders = self._by_order_book_id[order.order_book_id]
+        del orders[order]
+        if not orders:
+            del self._by_order_book_id[order.order_book_id]
+        return True
+
+    def clear(self):
+        self._orders.clear()
+        self._by_order_book_id.clear()
+
+    def get(self, order_book_id=None):
+        # type: (Optional[str]) -> List[Tuple[Account, Order]]
+        """ 按加入顺序返回订单，指定 order_book_id 时只返回该合约的订单 """
+        return [(account, order) for order, (_, account) in self._orders_of(order_book_id).items()]
+
+    def iter_batches(self, order_book_id=None):
+        # type: (Optional[str]) -> Iterator[List[Tuple[Account, Order]]]
+        """
+        按加入顺序分批返回尚未结束的订单，每一批为上一批返回后新加入的订单。
+        批内订单可能在处理前一个订单时结束，调用方需在处理到时再次判断。
+        """
+        last_seq = -1
+        while True:
+            batch = [(seq, account, order) for order, (seq, account) in self._orders_of(order_book_id).items()
+                     if seq > last_seq]
+            if not batch:
+                return
+            last_seq = batch[-1][0]
+            yield [(account, order) for _, account, order in batch if not order.is_final()]
+
+    def iter_active(self, order_book_id=None):
+        # type: (Optional[str]) -> Iterator[Tuple[Account, Order]]
+        """
+        按加入顺序遍历尚未结束的订单，订单是否结束在遍历到时判断。
+        遍历过程中（如撮合触发的事件中）新加入的订单同样会被遍历到。
+        """
+        for batch in self.iter_batches(order_book_id):
+            for account, order in batch:
+                if not order.is_final():
+                    yield account, order
+
+    def pop_final(self, order_book_id=None):
+        # type: (Optional[str]) -> List[Tuple[Account, Order]]
+        """ 移除并返回已结束的订单，指定 order_book_id 时只处理该合约的订单 """
+        final = [(account, order) for order, (_, account) in self._orders_of(order_book_id).items() if order.is_final()]
+        for _, order in final:
+            self.remove(order)
+        return final
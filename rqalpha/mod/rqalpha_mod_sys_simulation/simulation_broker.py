@@ -17,7 +17,7 @@
 
 from typing import List, Tuple, Dict
 from rqalpha.utils.functools import lru_cache
-from itertools import chain
+from itertools import chain, groupby
 
 import jsonpickle
 
@@ -31,6 +31,7 @@ from rqalpha.model.order import Order
 from rqalpha.environment import Environment
 
 from .matcher import DefaultBarMatcher, AbstractMatcher, CounterPartyOfferMatcher, DefaultTickMatcher
+from .order_book import OpenOrderBook
 
 
 class SimulationBroker(AbstractBroker, Persistable):
@@ -42,11 +43,13 @@ class SimulationBroker(AbstractBroker, Persistable):
 
         self._match_immediately = mod_config.matching_type in [MATCHING_TYPE.CURRENT_BAR_CLOSE, MATCHING_TYPE.VWAP]
 
-        self._open_orders = []  # type: List[Tuple[Account, Order]]
-        self._open_auction_orders = []  # type: List[Tuple[Account, Order]]
+        self._open_orders = OpenOrderBook()
+        self._open_auction_orders = OpenOrderBook()
         self._open_exercise_orders = []  # type: List[Tuple[Account, Order]]
 
         self._frontend_validator = {}
+        # 未完成订单发生变化时递增，用于持久化时跳过未变化的状态
+        self._state_version = 0
 
         if self._mod_config.matching_type == MATCHING_TYPE.COUNTERPARTY_OFFER:
             for instrument_type in INSTRUMENT_TYPE:
@@ -61,6 +64,8 @@ class SimulationBroker(AbstractBroker, Persistable):
         # 该事件会触发策略的after_trading函数
         self._env.event_bus.add_listener(EVENT.AFTER_TRADING, self.after_trading)
         self._env.event_bus.add_listener(EVENT.PRE_SETTLEMENT, self.pre_settlement)
+        # 成交会改变未完成订单的成交数量及状态
+        self._env.event_bus.add_listener(EVENT.TRADE, self._on_trade)
 
     @lru_cache(1024)
     def _get_matcher(self, order_book_id):
@@ -79,43 +84,47 @@ class SimulationBroker(AbstractBroker, Persistable):
         self._matchers[instrument_type] = matcher
 
     def get_open_orders(self, order_book_id=None):
-        if order_book_id is None:
-            return [order for account, order in chain(self._open_orders, self._open_auction_orders)]
-        else:
-            return [order for account, order in chain(self._open_orders, self._open_auction_orders) if
-                    order.order_book_id == order_book_id]
+        return [order for account, order in chain(
+            self._open_orders.get(order_book_id), self._open_auction_orders.get(order_book_id)
+        )]
 
     def get_state(self):
         return jsonpickle.dumps({
-            'open_orders': [o.get_state() for account, o in self._open_orders],
-            "open_auction_orders": [o.get_state() for account, o in self._open_auction_orders],
+            'open_orders': [o.get_state() for account, o in self._open_orders.get()],
+            "open_auction_orders": [o.get_state() for account, o in self._open_auction_orders.get()],
         }).encode('utf-8')
 
+    def get_state_version(self):
+        return self._state_version
+
     def set_state(self, state):
-        def _account_order_from_state(order_state):
-            o = Order()
-            o.set_state(order_state)
-            account = self._env.get_account(o.order_book_id)
-            return account, o
+        def _load_orders(order_book, order_states):
+            order_book.clear()
+            for order_state in order_states:
+                o = Order()
+                o.set_state(order_state)
+                order_book.add(self._env.get_account(o.order_book_id), o)
 
         value = jsonpickle.loads(state.decode('utf-8'))
-        self._open_orders = [_account_order_from_state(v) for v in value["open_orders"]]
-        self._open_auction_orders = [_account_order_from_state(v) for v in value.get("open_auction_orders", [])]
+        _load_orders(self._open_orders, value["open_orders"])
+        _load_orders(self._open_auction_orders, value.get("open_auction_orders", []))
+        self._state_version += 1
 
     def submit_order(self, order):
         self._check_subscribe(order)
         if order.position_effect == POSITION_EFFECT.MATCH:
             raise TypeError(_("unsupported position_effect {}").format(order.position_effect))
         account = self._env.get_account(order.order_book_id)
+        self._state_version += 1
         self._env.event_bus.publish_event(Event(EVENT.ORDER_PENDING_NEW, account=account, order=order))
         if order.is_final():
             return
         if order.position_effect == POSITION_EFFECT.EXERCISE:
             return self._open_exercise_orders.append((account, order))
         if ExecutionContext.phase() == EXECUTION_PHASE.OPEN_AUCTION:
-            self._open_auction_orders.append((account, order))
+            self._open_auction_orders.add(account, order)
         else:
-            self._open_orders.append((account, order))
+            self._open_orders.add(account, order)
         order.active()
         self._env.event_bus.publish_event(Event(EVENT.ORDER_CREATION_PASS, account=account, order=order))
         if self._match_immediately:
@@ -123,6 +132,7 @@ class SimulationBroker(AbstractBroker, Persistable):
 
     def cancel_order(self, order):
         account = self._env.get_account(order.order_book_id)
+        self._state_version += 1
 
         self._env.event_bus.publish_event(Event(EVENT.ORDER_PENDING_CANCEL, account=account, order=order))
 
@@ -130,23 +140,24 @@ class SimulationBroker(AbstractBroker, Persistable):
 
         self._env.event_bus.publish_event(Event(EVENT.ORDER_CANCELLATION_PASS, account=account, order=order))
 
-        try:
-            self._open_orders.remove((account, order))
-        except ValueError:
-            pass
+        self._open_orders.remove(order)
 
     def before_trading(self, _):
-        for account, order in self._open_orders:
+        if self._open_orders:
+            self._state_version += 1
+        for account, order in self._open_orders.get():
             order.active()
             self._env.event_bus.publish_event(Event(EVENT.ORDER_CREATION_PASS, account=account, order=order))
 
     def after_trading(self, __):
-        for account, order in self._open_orders:
+        if self._open_orders:
+            self._state_version += 1
+        for account, order in self._open_orders.get():
             order.mark_rejected(_(u"Order Rejected: {order_book_id} can not match. Market close.").format(
                 order_book_id=order.order_book_id
             ))
             self._env.event_bus.publish_event(Event(EVENT.ORDER_UNSOLICITED_UPDATE, account=account, order=order))
-        self._open_orders = []
+        self._open_orders.clear()
 
     def pre_settlement(self, __):
         for account, order in self._open_exercise_orders:
@@ -166,20 +177,32 @@ class SimulationBroker(AbstractBroker, Persistable):
         self._match(tick.order_book_id)
 
     def _match(self, order_book_id=None):
-        # 撮合未完成的订单，若指定标的时只撮合指定的标的的订单
-        order_filter = lambda a_and_o: not (a_and_o[1].is_final() or (order_book_id and a_and_o[1].order_book_id != order_book_id))
-        for account, order in filter(order_filter, self._open_orders):
-            self._get_matcher(order.order_book_id).match(account, order, open_auction=False)
-        for account, order in filter(order_filter, self._open_auction_orders):
-            self._get_matcher(order.order_book_id).match(account, order, open_auction=True)
-        final_orders = [(a, o) for a, o in chain(self._open_orders, self._open_auction_orders) if o.is_final()]
-        self._open_orders = [(a, o) for a, o in chain(self._open_orders, self._open_auction_orders) if not o.is_final()]
+        # 撮合未完成的订单，若指定标的时只撮合及清理指定的标的的订单
+        order_book_id = order_book_id or None
+        for batch in self._open_orders.iter_batches(order_book_id):
+            self._match_batch(batch, open_auction=False)
+        for batch in self._open_auction_orders.iter_batches(order_book_id):
+            self._match_batch(batch, open_auction=True)
+        final_orders = self._open_orders.pop_final(order_book_id) + self._open_auction_orders.pop_final()
+        if final_orders or self._open_auction_orders:
+            self._state_version += 1
+        # 集合竞价阶段未成交完的订单转入连续竞价
+        for account, order in self._open_auction_orders.get():
+            self._open_orders.add(account, order)
         self._open_auction_orders.clear()
 
         for account, order in final_orders:
             if order.status == ORDER_STATUS.REJECTED or order.status == ORDER_STATUS.CANCELLED:
                 self._env.event_bus.publish_event(Event(EVENT.ORDER_UNSOLICITED_UPDATE, account=account, order=order))
 
+    def _on_trade(self, _):
+        self._state_version += 1
+
+    def _match_batch(self, account_orders, open_auction):
+        # 相邻且使用同一撮合器的订单交由撮合器批量撮合，不同撮合器之间仍保持订单的先后顺序
+        for matcher, group in groupby(account_orders, key=lambda item: self._get_matcher(item[1].order_book_id)):
+            matcher.match_batch(list(group), open_auction)
+
     def _check_subscribe(self, order):
         if self._env.config.base.frequency == "tick" and order.order_book_id not in self._env.get_universe():
             raise RuntimeError(_("{order_book_id} should be subscribed when frequency is tick.").format(
@@ -29,10 +29,15 @@ from rqalpha.utils.repr import property_repr, properties
 from rqalpha.utils.logger import user_system_log
 from rqalpha.environment import Environment
 from rqalpha.model.instrument import Instrument
-from rqalpha.utils.class_helper import cached_property
 
 
 class Order(object):
+    # 高频策略会产生大量订单，使用 __slots__ 减少每个对象的内存占用
+    __slots__ = (
+        "_env", "_order_id", "_secondary_order_id", "_calendar_dt", "_trading_dt", "_quantity", "_order_book_id",
+        "_side", "_position_effect", "_message", "_filled_quantity", "_status", "_frozen_price", "_init_frozen_cash",
+        "_type", "_avg_price", "_transaction_cost", "_style", "_kwargs", "_instrument",
+    )
 
     order_id_gen = id_gen(int(time.time()) * 10000)
 
@@ -58,6 +63,7 @@ class Order(object):
     _transaction_cost: float
     _style: "OrderStyle"
     _kwargs: dict
+    _instrument: Optional[Instrument]
 
     @staticmethod
     def _str_to_enum(enum_class, s):
@@ -86,6 +92,7 @@ class Order(object):
         }
 
     def set_state(self, d):
+        self._instrument = None
         self._order_id = d['order_id']
         if 'secondary_order_id' in d:
             self._secondary_order_id = d['secondary_order_id']
@@ -119,6 +126,7 @@ class Order(object):
         env = Environment.get_instance()
         order = cls()
         order._env = env
+        order._instrument = None
         order._order_id = next(order.order_id_gen)
         order._secondary_order_id = None 
         order._calendar_dt = env.calendar_dt
@@ -307,11 +315,13 @@ class Order(object):
     def kwargs(self):
         return self._kwargs
     
-    @cached_property
+    @property
     def instrument(self) -> Instrument:
-        return self._env.data_proxy.instrument_not_none(self._order_book_id)
-    
-    @cached_property
+        if self._instrument is None:
+            self._instrument = self._env.data_proxy.instrument_not_none(self._order_book_id)
+        return self._instrument
+
+    @property
     def market(self) -> MARKET:
         return self.instrument.market
 
@@ -330,7 +340,7 @@ class Order(object):
 
     def __getattr__(self, item):
         try:
-            return object.__getattribute__(self, '__dict__')["_kwargs"][item]
+            return object.__getattribute__(self, "_kwargs")[item]
         except KeyError:
             raise AttributeError("'{}' object has no attribute '{}'".format(self.__class__.__name__, item))
 
@@ -21,7 +21,6 @@ from typing import TYPE_CHECKING, Optional
 from rqalpha.utils import id_gen, get_position_direction
 from rqalpha.utils.i18n import gettext as _
 from rqalpha.utils.repr import property_repr, properties
-from rqalpha.utils.class_helper import cached_property
 from rqalpha.environment import Environment
 from rqalpha.const import POSITION_EFFECT, SIDE, MARKET
 from rqalpha.model.instrument import Instrument
@@ -29,8 +28,13 @@ from rqalpha.model.instrument import Instrument
 if TYPE_CHECKING:
     from rqalpha.interface import TransactionCost
 
-# TODO: 改成 namedtuple，提升性能
 class Trade(object):
+    # 高频策略会产生大量成交，使用 __slots__ 减少每个对象的内存占用
+    __slots__ = (
+        "_env", "_calendar_dt", "_trading_dt", "_price", "_amount", "_order_id", "_transaction_cost", "_trade_id",
+        "_close_today_amount", "_side", "_position_effect", "_order_book_id", "_frozen_price", "_kwargs",
+        "_instrument",
+    )
 
     __repr__ = property_repr  # type: ignore
 
@@ -51,6 +55,7 @@ class Trade(object):
         self._order_book_id = None
         self._frozen_price = None
         self._kwargs = {}
+        self._instrument = None
 
     @classmethod
     def __from_create__(
@@ -115,17 +120,19 @@ class Trade(object):
 
     def __getattr__(self, item):
         try:
-            return self.__dict__["_kwargs"][item]
+            return object.__getattribute__(self, "_kwargs")[item]
         except KeyError:
             raise AttributeError("'{}' object has no attribute '{}'".format(self.__class__.__name__, item))  # type: ignore
 
     def __simple_object__(self):
         return properties(self)
 
-    @cached_property
+    @property
     def _ins(self) -> Instrument:
-        return self._env.data_proxy.instrument_not_none(self.order_book_id)
-    
-    @cached_property
+        if self._instrument is None:
+            self._instrument = self._env.data_proxy.instrument_not_none(self.order_book_id)
+        return self._instrument
+
+    @property
     def market(self) -> MARKET:
         return self._ins.market
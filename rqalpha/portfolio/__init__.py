@@ -57,6 +57,8 @@ class Portfolio(CapitalGainsTaxMixin, metaclass=PropertyReprMeta):
         self._static_unit_net_value = 1
         self._units = sum(account.total_value for account in six.itervalues(self._accounts))
         self._env = env
+        # 组合自身的状态可能发生变化时递增，各账户另有各自的版本号
+        self._state_version = 0
         CapitalGainsTaxMixin.__init__(self)
         env.event_bus.add_listener(EVENT.TRADE, self._on_trade)
         env.event_bus.prepend_listener(EVENT.PRE_BEFORE_TRADING, self._pre_before_trading)
@@ -93,7 +95,13 @@ class Portfolio(CapitalGainsTaxMixin, metaclass=PropertyReprMeta):
             }
         }).encode('utf-8')
 
+    def get_state_version(self):
+        return (self._state_version, ) + tuple(
+            account.get_state_version() for account in six.itervalues(self._accounts)
+        )
+
     def set_state(self, state):
+        self._state_version += 1
         state = state.decode('utf-8')
         value = jsonpickle.decode(state)
         self._static_unit_net_value = value['static_unit_net_value']
@@ -275,6 +283,8 @@ class Portfolio(CapitalGainsTaxMixin, metaclass=PropertyReprMeta):
         return sum(account.cash_liabilities for account in six.itervalues(self._accounts))
 
     def _pre_before_trading(self, _):
+        # 同时覆盖 BEFORE_TRADING 中年初对 annual_deductible_balance 的重置
+        self._state_version += 1
         self._static_unit_net_value = self.unit_net_value
 
     def deposit_withdraw(self, account_type, amount, receiving_days=0):
@@ -285,6 +295,7 @@ class Portfolio(CapitalGainsTaxMixin, metaclass=PropertyReprMeta):
         if account_type not in self._accounts:
             raise ValueError(_("invalid account type {}, choose in {}".format(account_type, list(self._accounts.keys()))))
         unit_net_value = self.unit_net_value
+        self._state_version += 1
         self._accounts[account_type].deposit_withdraw(amount, receiving_days)
         _units = self.total_value / unit_net_value
         user_system_log.debug(_("Cash add {}. units {} become to {}".format(amount, self._units, _units)))
@@ -300,10 +311,12 @@ class Portfolio(CapitalGainsTaxMixin, metaclass=PropertyReprMeta):
         self._accounts[account_type].finance_repay(amount)
 
     def _on_trade(self, event):
+        self._state_version += 1
         delta_monthly_realized_pnl = event.account.apply_trade(event.trade, event.order)
         self._add_monthly_realized_pnl(delta_monthly_realized_pnl)
 
     def _on_settlement(self, event):
+        self._state_version += 1
         tax_amount = self.calc_capital_gains_tax()
         if tax_amount > 0:
             self._env.event_bus.publish_event(Event(
@@ -35,15 +35,50 @@ from rqalpha.mod.rqalpha_mod_sys_accounts.position_model import FuturePosition
 OrderApiType = Callable[[str, Union[int, float], OrderStyle, bool], List[Order]]
 
 
-class AccountMeta(type):
-    def __new__(mcs, *args, **kwargs):
-        cls = type.__new__(mcs, *args, **kwargs)
-        cls._margin = cls.margin
-        cls.margin = property(lambda s: 0)  # black magic: improve performance for pure stock strategy
-        return cls
+class _Aggregates:
+    """
+    账户中各持仓的汇总值。记录每个持仓上一次计入汇总时的取值，持仓变动后只需将其新旧取值之差计入汇总，
+    使得读取汇总值的开销与持仓数量无关。
+    """
+    __slots__ = (
+        "market_value", "transaction_cost", "buy_margin", "sell_margin", "equity", "position_pnl", "trading_pnl"
+    )
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0.)
+
+    @classmethod
+    def of(cls, position: Position) -> "_Aggregates":
+        aggregates = cls()
+        margin = getattr(position, "margin", 0)
+        if position.direction == POSITION_DIRECTION.LONG:
+            aggregates.market_value = position.market_value
+            aggregates.buy_margin = margin
+        else:
+            aggregates.market_value = -position.market_value
+            aggregates.sell_margin = margin
+        aggregates.transaction_cost = position.transaction_cost
+        aggregates.equity = position.equity
+        aggregates.position_pnl = position.position_pnl
+        aggregates.trading_pnl = position.trading_pnl
+        return aggregates
+
+    def add(self, other: "_Aggregates", sign: int = 1):
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + sign * getattr(other, name))
+
+    def is_close_to(self, other: "_Aggregates") -> bool:
+        return all(
+            abs(getattr(self, name) - getattr(other, name)) <= 1e-6 * max(1., abs(getattr(other, name)))
+            for name in self.__slots__
+        )
+
+    def __repr__(self):
+        return "Aggregates({})".format(", ".join("{}={}".format(name, getattr(self, name)) for name in self.__slots__))
 
 
-class Account(metaclass=AccountMeta):
+class Account:
     """
     账户，多种持仓和现金的集合。
 
@@ -74,7 +109,15 @@ class Account(metaclass=AccountMeta):
 
         self._positions: Dict[str, Dict[POSITION_DIRECTION, Position]] = {}
         self._backward_trade_set = set()
+
+        # 持仓汇总值，持仓变动时将其标记为 dirty，读取汇总值时只重新计算 dirty 的持仓
+        self._aggregates = _Aggregates()
+        self._position_aggregates: Dict[Tuple[str, POSITION_DIRECTION], _Aggregates] = {}
+        self._dirty_positions: Dict[Tuple[str, POSITION_DIRECTION], Position] = {}
+        self._check_aggregates = getattr(env.config.extra, "check_account_aggregates", False)
         self._pending_deposit_withdraw: List[Tuple[date, float]] = []
+        # get_state 中的资金或持仓可能发生变化时递增，用于持久化时跳过未变化的状态
+        self._state_version = 0
 
         self.register_event()
 
@@ -136,7 +179,11 @@ class Account(metaclass=AccountMeta):
             'backward_trade_set': list(self._backward_trade_set),
         }
 
+    def get_state_version(self) -> int:
+        return self._state_version
+
     def set_state(self, state):
+        self._state_version += 1
         self._frozen_cash = state['frozen_cash']
         self._backward_trade_set = set(state['backward_trade_set'])
         self._total_cash = state["total_cash"]
@@ -149,8 +196,10 @@ class Account(metaclass=AccountMeta):
                     position.set_state(positions_state[direction])
                 else:
                     position.set_state(positions_state[direction.lower()])
+        self._reset_aggregates()
 
     def fast_forward(self, orders=None, trades=None):
+        self._state_version += 1
         if trades:
             close_trades = []
             # 先处理开仓
@@ -224,14 +273,14 @@ class Account(metaclass=AccountMeta):
         """
         [float] 市值
         """
-        return sum(p.market_value * (1 if p.direction == POSITION_DIRECTION.LONG else -1) for p in self._iter_pos())
+        return self._get_aggregates().market_value
 
     @property
     def transaction_cost(self) -> float:
         """
         总费用
         """
-        return sum(p.transaction_cost for p in self._iter_pos())
+        return self._get_aggregates().transaction_cost
 
     @property
     def cash_liabilities(self) -> float:
@@ -252,21 +301,22 @@ class Account(metaclass=AccountMeta):
         """
         总保证金
         """
-        return sum(getattr(p, "margin", 0) for p in self._iter_pos())
+        aggregates = self._get_aggregates()
+        return aggregates.buy_margin + aggregates.sell_margin
 
     @property
     def buy_margin(self) -> float:
         """
         多方向保证金
         """
-        return sum(getattr(p, "margin", 0) for p in self._iter_pos(direction=POSITION_DIRECTION.LONG))
+        return self._get_aggregates().buy_margin
 
     @property
     def sell_margin(self) -> float:
         """
         空方向保证金
         """
-        return sum(getattr(p, "margin", 0) for p in self._iter_pos(POSITION_DIRECTION.SHORT))
+        return self._get_aggregates().sell_margin
 
     @property
     def daily_pnl(self) -> float:
@@ -280,7 +330,7 @@ class Account(metaclass=AccountMeta):
         """
         持仓总权益
         """
-        return sum(p.equity for p in self._iter_pos())
+        return self._get_aggregates().equity
 
     @property
     def total_value(self) -> float:
@@ -304,14 +354,14 @@ class Account(metaclass=AccountMeta):
         """
         昨仓盈亏
         """
-        return sum(p.position_pnl for p in self._iter_pos())
+        return self._get_aggregates().position_pnl
 
     @property
     def trading_pnl(self) -> float:
         """
         交易盈亏
         """
-        return sum(p.trading_pnl for p in self._iter_pos())
+        return self._get_aggregates().trading_pnl
 
     def available_cash_for(self, instrument: Instrument) -> float:
         """
@@ -320,6 +370,7 @@ class Account(metaclass=AccountMeta):
         return self.cash
 
     def _on_before_trading(self, _):
+        self._state_version += 1
         for order_book_id, positions in list(self._positions.items()):
             if all(p.quantity == 0 and p.equity == 0 for p in six.itervalues(positions)):
                 del self._positions[order_book_id]
@@ -333,17 +384,22 @@ class Account(metaclass=AccountMeta):
         for position in self._iter_pos(market=MARKET.CN):
             self._total_cash += position.before_trading(trading_date)
 
+        # 持仓已按新交易日重置（保证金率等亦可能随交易日变化），全量重新计算汇总值
+        self._reset_aggregates()
+
         # 负债自增利息
         if self._cash_liabilities > 0:
             self._cash_liabilities += self.cash_liabilities_interest
 
     def _on_settlement(self, event):
+        self._state_version += 1
         trading_date = self._env.trading_dt.date()
 
         # 涉及到资金变动，此处只处理中国市场的持仓
         for position in self._iter_pos(market=MARKET.CN):
             delta_cash = position.settlement(trading_date)
             self._total_cash += delta_cash
+        self._reset_aggregates()
 
         self._backward_trade_set.clear()
 
@@ -361,21 +417,25 @@ class Account(metaclass=AccountMeta):
             if self._positions:
                 user_system_log.warn(_("Trigger Forced Liquidation, current total_value is 0"))
             self._positions.clear()
+            self._reset_aggregates()
             self._total_cash = 0
 
     def _post_settlement(self, event: EVENT) -> None:
         """
         该事件必须在 post_settlement 中最后执行，若有其他事件要加入到 post_settlement 中，请使用 event_bus.prepend_listener 添加
         """
+        self._state_version += 1
         for order_book_id, positions in list(self._positions.items()):
             for position in six.itervalues(positions):
                 if isinstance(position, FuturePosition):
                     position.post_settlement()
+        self._reset_aggregates()
 
     def _on_order_pending_new(self, event):
         if event.account != self:
             return
         order = event.order
+        self._state_version += 1
         order.set_frozen_cash(self._frozen_cash_of_order(order))
         self._frozen_cash += order.init_frozen_cash
 
@@ -383,6 +443,7 @@ class Account(metaclass=AccountMeta):
         if event.account != self:
             return
         order = event.order
+        self._state_version += 1
         if order.filled_quantity != 0:
             self._frozen_cash -= order.unfilled_quantity / order.quantity * order.init_frozen_cash
         else:
@@ -392,6 +453,7 @@ class Account(metaclass=AccountMeta):
         # 返回增值税税基变化量
         if trade.exec_id in self._backward_trade_set:
             return 0
+        self._state_version += 1
         order_book_id = trade.order_book_id
         if order and trade.position_effect != POSITION_EFFECT.MATCH:
             if trade.last_quantity != order.quantity:
@@ -401,7 +463,9 @@ class Account(metaclass=AccountMeta):
 
         def _apply(position_direction: POSITION_DIRECTION):
             nonlocal delta_cash, delta_monthly_realized_pnl
-            apply_result = self._get_or_create_pos(order_book_id, position_direction).apply_trade(trade)
+            position = self._get_or_create_pos(order_book_id, position_direction)
+            apply_result = position.apply_trade(trade)
+            self._dirty_positions[order_book_id, position_direction] = position
             try:
                 delta_cash_delta, delta_monthly_realized_pnl_delta = apply_result
             except TypeError:
@@ -442,6 +506,7 @@ class Account(metaclass=AccountMeta):
             init_price : Optional[float] = None
     ) -> Position:
         if order_book_id not in self._positions:
+            self._state_version += 1
             if direction == POSITION_DIRECTION.LONG:
                 long_quantity, short_quantity = init_quantity, 0
             else:
@@ -452,10 +517,8 @@ class Account(metaclass=AccountMeta):
                 POSITION_DIRECTION.LONG: self._init_position(order_book_id, POSITION_DIRECTION.LONG, long_quantity, init_price),
                 POSITION_DIRECTION.SHORT: self._init_position(order_book_id, POSITION_DIRECTION.SHORT, short_quantity, init_price)
             })
-            if hasattr(positions[direction], "margin") and hasattr(self.__class__, "_margin"):
-                # black magic: improve performance for pure stock strategy
-                setattr(self.__class__, "margin", self.__class__._margin)
-                del self.__class__._margin
+            for d, position in positions.items():
+                self._dirty_positions[order_book_id, d] = position
         else:
             positions = self._positions[order_book_id]
         return positions[direction]
@@ -466,15 +529,51 @@ class Account(metaclass=AccountMeta):
             positions = self._positions[tick.order_book_id]
         except KeyError:
             return
-        for position in positions.values():
+        for direction, position in positions.items():
             position.update_last_price(tick.last)
+            self._dirty_positions[tick.order_book_id, direction] = position
 
     def _on_bar(self, _):
-        for order_book_id, positions in self._positions.items():
-            price = self._env.get_last_price(order_book_id)
+        if not self._positions:
+            return
+        # 一次性取得全部持仓的最新价，避免逐个合约经由 price_board 取价
+        order_book_ids = list(self._positions)
+        prices = self._env.get_last_prices(order_book_ids).tolist()
+        dirty_positions = self._dirty_positions
+        for order_book_id, price in zip(order_book_ids, prices):
             if price == price:
-                for position in six.itervalues(positions):
+                for direction, position in self._positions[order_book_id].items():
                     position.update_last_price(price)
+                    dirty_positions[order_book_id, direction] = position
+
+    def _reset_aggregates(self):
+        # 持仓增删或整体变化后调用，下次读取汇总值时全量重新计算
+        self._aggregates = _Aggregates()
+        self._position_aggregates.clear()
+        self._dirty_positions = {
+            (order_book_id, direction): position
+            for order_book_id, positions in self._positions.items() for direction, position in positions.items()
+        }
+
+    def _get_aggregates(self) -> _Aggregates:
+        if self._dirty_positions:
+            aggregates = self._aggregates
+            position_aggregates = self._position_aggregates
+            for key, position in self._dirty_positions.items():
+                new = _Aggregates.of(position)
+                old = position_aggregates.get(key)
+                if old is not None:
+                    aggregates.add(old, -1)
+                aggregates.add(new)
+                position_aggregates[key] = new
+            self._dirty_positions = {}
+        if self._check_aggregates:
+            expected = _Aggregates()
+            for position in self._iter_pos():
+                expected.add(_Aggregates.of(position))
+            if not self._aggregates.is_close_to(expected):
+                raise RuntimeError("account aggregates mismatch: {} != {}".format(self._aggregates, expected))
+        return self._aggregates
 
     def _frozen_cash_of_order(self, order):
         if order.position_effect == POSITION_EFFECT.OPEN:
@@ -520,6 +619,7 @@ class Account(metaclass=AccountMeta):
         """出入金"""
         if (amount < 0) and (self.cash < amount * -1):
             raise ValueError(_('insufficient cash, current {}, target withdrawal {}').format(self._total_cash, amount))
+        self._state_version += 1
         if receiving_days >= 1:
             receiving_date = self._env.data_proxy.get_next_trading_date(self._env.trading_dt.date(), n=receiving_days)
             self._pending_deposit_withdraw.append((receiving_date, amount))
@@ -529,6 +629,7 @@ class Account(metaclass=AccountMeta):
 
     def finance_repay(self, amount):
         """ 融资还款 """
+        self._state_version += 1
         if self.type == DEFAULT_ACCOUNT_TYPE.STOCK:
             if amount > 0:
                 # 融资
@@ -551,6 +652,7 @@ class Account(metaclass=AccountMeta):
             user_system_log.warn(f"{self.type} not support finance_repay")
 
     def pay_taxes(self, amount: float, tax_type: TAX_TYPE):
+        self._state_version += 1
         if tax_type == TAX_TYPE.CAPITAL_GAINS:
             self._capital_gains_tax += amount
         elif tax_type == TAX_TYPE.DIVIDEND:
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），
+#         您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、
+#         本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，
+#         否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import itertools
+import multiprocessing
+import os
+from copy import deepcopy
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import pandas as pd
+
+from rqalpha.utils.logger import system_log
+
+
+def expand_param_grid(param_grid):
+    # type: (Mapping[str, Iterable[Any]]) -> List[Dict[str, Any]]
+    """ 将 {参数名: 取值列表} 展开为所有参数组合，组合顺序与 itertools.product 一致 """
+    names = list(param_grid.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*(list(param_grid[n]) for n in names))]
+
+
+def apply_params(config, params):
+    # type: (Dict, Mapping[str, Any]) -> Dict
+    """
+    将一组参数写入配置字典的副本：带 "." 的参数名视为配置项路径（如 mod.sys_simulation.slippage），
+    其余参数写入 extra.context_vars，在策略中以 context.<参数名> 访问。
+    """
+    config = deepcopy(config)
+    for name, value in params.items():
+        if "." in name:
+            keys = name.split(".")
+        else:
+            keys = ["extra", "context_vars", name]
+        sub_config = config
+        for k in keys[:-1]:
+            sub_config = sub_config.setdefault(k, {})
+        sub_config[keys[-1]] = value
+    return config
+
+
+def _parse_config(strategy_file_path, config):
+    from rqalpha.utils.config import parse_config
+    config = deepcopy(config)
+    config.setdefault("base", {})["strategy_file"] = strategy_file_path
+    return parse_config(config)
+
+
+def _init_worker(strategy_file_path, config):
+    # 每个工作进程共享一个数据源；以 fork 方式启动时直接继承父进程中已创建的数据源
+    from rqalpha.data.base_data_source import BaseDataSource
+    try:
+        BaseDataSource.share(_parse_config(strategy_file_path, config).base)
+    except Exception as e:
+        system_log.warning("failed to create shared data source: {}".format(e))
+
+
+def _run_one(task):
+    from rqalpha import main
+    from rqalpha.data.base_data_source import BaseDataSource
+    from rqalpha.utils.functools import clear_all_cached_functions
+
+    index, strategy_file_path, config, params = task
+    row = {"run": index}  # type: Dict[str, Any]
+    row.update(params)
+    try:
+        run_config = _parse_config(strategy_file_path, apply_params(config, params))
+        if BaseDataSource.get_shared(run_config.base) is not None:
+            # 共享数据源的缓存在同一进程的多次回测间保持有效
+            clear_all_cached_functions(keep_modules=["rqalpha.data.base_data_source"])
+        else:
+            clear_all_cached_functions()
+        result = main.run(run_config)
+    except KeyboardInterrupt:
+        raise
+    except BaseException as e:
+        # 单次回测失败（包括策略中调用 sys.exit）不影响其他回测
+        row["error"] = "{}: {}".format(type(e).__name__, e)
+        return row
+    summary = (result or {}).get("sys_analyser", {}).get("summary", {})
+    row["error"] = None
+    row.update((k, v) for k, v in summary.items() if k not in row)
+    return row
+
+
+def run_sweep(strategy_file_path, param_grid, config=None, processes=None, output_file=None):
+    # type: (str, Mapping[str, Iterable[Any]], Optional[Dict], Optional[int], Optional[str]) -> pd.DataFrame
+    config = deepcopy(config) if config else {}
+    tasks = [
+        (i, strategy_file_path, config, params) for i, params in enumerate(expand_param_grid(param_grid))
+    ]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(min(processes, len(tasks)), 1)
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        # 父进程中预先创建共享数据源，fork 出的工作进程无需再次加载
+        context = multiprocessing.get_context("fork")
+        _init_worker(strategy_file_path, config)
+    else:
+        context = multiprocessing.get_context()
+
+    rows = []
+    with context.Pool(processes, initializer=_init_worker, initargs=(strategy_file_path, config)) as pool:
+        for row in pool.imap_unordered(_run_one, tasks):
+            rows.append(row)
+            if row["error"]:
+                system_log.error("sweep run {} failed: {}".format(row["run"], row["error"]))
+            if output_file:
+                # 每完成一次回测即刷新结果文件
+                pd.DataFrame(rows).sort_values("run").to_csv(output_file, index=False)
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).sort_values("run").set_index("run")
@@ -38,8 +38,12 @@ def lru_cache(*args, **kwargs):
     return decorator
 
 
-def clear_all_cached_functions():
+def clear_all_cached_functions(keep_modules=()):
+    # keep_modules: 不清理这些模块（及其子模块）中的缓存，用于在多次回测间复用共享数据源的缓存
+    keep_prefixes = tuple(m + "." for m in keep_modules)
     for func in cached_functions:
+        if func.__module__ in keep_modules or (keep_prefixes and func.__module__.startswith(keep_prefixes)):
+            continue
         func.cache_clear()
 
 
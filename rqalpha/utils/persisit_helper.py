@@ -14,39 +14,114 @@
 
 import hashlib
 from collections import OrderedDict
+from queue import Queue
+from threading import Thread
 
 from rqalpha.const import PERSIST_MODE
 from rqalpha.core.events import EVENT
 from rqalpha.utils.logger import system_log
 
 
+class _StoreWriter(Thread):
+    """
+    后台写入线程，按入队顺序依次调用 persist_provider.store。队列有界，队列满时入队方阻塞等待。
+    """
+    def __init__(self, persist_provider, queue_size, on_fail):
+        super(_StoreWriter, self).__init__(name="PersistHelperWriter", daemon=True)
+        self._persist_provider = persist_provider
+        self._queue = Queue(queue_size)
+        self._on_fail = on_fail
+
+    def put(self, key, state):
+        self._queue.put((key, state))
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(None)
+        self.join()
+
+    def run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                key, state = item
+                try:
+                    self._persist_provider.store(key, state)
+                except Exception:
+                    system_log.exception("PersistHelper.persist fail")
+                    self._on_fail(key)
+            finally:
+                self._queue.task_done()
+
+
 class PersistHelper(object):
-    def __init__(self, persist_provider, event_bus, persist_mode):
+    def __init__(self, persist_provider, event_bus, persist_mode, queue_size=0):
         self._objects = OrderedDict()
         self._last_state = {}
+        self._last_version = {}
         self._persist_provider = persist_provider
+        if queue_size > 0:
+            self._writer = _StoreWriter(persist_provider, queue_size, self._forget)
+            self._writer.start()
+        else:
+            self._writer = None
         if persist_mode == PERSIST_MODE.REAL_TIME:
             event_bus.add_listener(EVENT.POST_BEFORE_TRADING, self.persist)
             event_bus.add_listener(EVENT.POST_AFTER_TRADING, self.persist)
             event_bus.add_listener(EVENT.POST_BAR, self.persist)
             event_bus.add_listener(EVENT.DO_PERSIST, self.persist)
-            event_bus.add_listener(EVENT.POST_SETTLEMENT, self.persist)
+            event_bus.add_listener(EVENT.POST_SETTLEMENT, self._persist_and_flush)
             event_bus.add_listener(EVENT.DO_RESTORE, self.restore)
 
     def persist(self, *_):
         for key, obj in self._objects.items():
             try:
+                # 版本号未变化的对象无需序列化
+                version = getattr(obj, "get_state_version", None)
+                version = version() if version else None
+                if version is not None and self._last_version.get(key) == version:
+                    continue
                 state = obj.get_state()
                 if not state:
                     continue
                 md5 = hashlib.md5(state).hexdigest()
                 if self._last_state.get(key) == md5:
+                    self._last_version[key] = version
                     continue
-                self._persist_provider.store(key, state)
+                self._last_state[key] = md5
+                self._last_version[key] = version
+                if self._writer:
+                    self._writer.put(key, state)
+                else:
+                    self._persist_provider.store(key, state)
             except Exception as e:
                 system_log.exception("PersistHelper.persist fail")
-            else:
-                self._last_state[key] = md5
+                self._forget(key)
+
+    def flush(self):
+        """
+        阻塞直至所有已提交的状态写入完成
+        """
+        if self._writer:
+            self._writer.flush()
+
+    def close(self):
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+    def _persist_and_flush(self, *_):
+        self.persist()
+        self.flush()
+
+    def _forget(self, key):
+        # 写入失败时清除记录，下次 persist 时重新写入
+        self._last_state.pop(key, None)
+        self._last_version.pop(key, None)
 
     def register(self, key, obj):
         if key in self._objects:
@@ -60,6 +135,7 @@ class PersistHelper(object):
         return False
 
     def restore(self, event):
+        self.flush()
         key = getattr(event, "key", None)
         if key:
             return self._restore_obj(key, self._objects[key])
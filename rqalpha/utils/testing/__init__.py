@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from .mocking import mock_instrument, mock_bar, mock_tick
+from .mocking import mock_instrument, mock_bar, mock_tick, mock_bundle
 from .fixtures import (
     MagicMock,
     RQAlphaFixture,
@@ -41,5 +41,6 @@ __all__ = [
     "MatcherFixture",
     "mock_instrument",
     "mock_bar",
-    "mock_tick"
+    "mock_tick",
+    "mock_bundle",
 ]
@@ -19,3 +19,37 @@ def mock_bar(instrument, **kwargs):
 def mock_tick(instrumnet, **kwargs):
     from rqalpha.model.tick import TickObject
     return TickObject(instrumnet, kwargs)
+
+
+def mock_bundle(path, instruments, trading_dates, h5_data=None):
+    """
+    在 path 下生成可供 BaseDataSource 载入的最小 bundle。
+
+    :param instruments: 合约字典列表，写入 instruments.pk
+    :param trading_dates: YYYYMMDD 格式的整数交易日
+    :param h5_data: {文件名: {order_book_id: ndarray}}，如 {"stocks.h5": {"000001.XSHE": bars}}，未给出的 h5 文件为空文件
+    """
+    import json
+    import os
+    import pickle
+
+    import h5py
+    import numpy as np
+
+    h5_data = h5_data or {}
+    with open(os.path.join(path, "instruments.pk"), "wb") as f:
+        pickle.dump(instruments, f, protocol=2)
+    np.save(os.path.join(path, "trading_dates.npy"), np.asarray(trading_dates, dtype=np.int64), allow_pickle=False)
+    with open(os.path.join(path, "future_info.json"), "w") as f:
+        json.dump([{"underlying_symbol": "_", "commission_type": "by_money", "margin_rate": 0}], f)
+    with open(os.path.join(path, "share_transformation.json"), "w") as f:
+        json.dump({}, f)
+    with h5py.File(os.path.join(path, "yield_curve.h5"), "w") as h5:
+        h5.create_dataset("data", data=np.empty(0, dtype=[("date", np.uint32)]))
+    for name in [
+        "stocks.h5", "indexes.h5", "futures.h5", "funds.h5", "suspended_days.h5", "st_stock_days.h5",
+        "dividends.h5", "split_factor.h5", "ex_cum_factor.h5"
+    ]:
+        with h5py.File(os.path.join(path, name), "w") as h5:
+            for order_book_id, data in h5_data.get(name, {}).items():
+                h5.create_dataset(order_book_id, data=data)
@@ -0,0 +1,19 @@
+from rqalpha.core.events import Event, EVENT, EventBus
+
+
+def test_publish_event_dispatch_order():
+    bus = EventBus()
+    calls = []
+    bus.publish_event(Event(EVENT.BAR))
+
+    bus.add_listener(EVENT.BAR, lambda e: calls.append("system"))
+    bus.add_listener(EVENT.BAR, lambda e: calls.append("user"), user=True)
+    bus.prepend_listener(EVENT.BAR, lambda e: calls.append("first"))
+    bus.publish_event(Event(EVENT.BAR))
+    assert calls == ["first", "system", "user"]
+
+    # 系统处理函数返回 True 时不再传递给后续的系统处理函数，但用户处理函数仍会被调用
+    calls.clear()
+    bus.prepend_listener(EVENT.BAR, lambda e: calls.append("stop") or True)
+    bus.publish_event(Event(EVENT.BAR))
+    assert calls == ["stop", "user"]
@@ -0,0 +1,33 @@
+from rqalpha.core.event_profiler import EventProfiler
+from rqalpha.core.events import Event, EVENT, EventBus
+
+
+class _Listener(object):
+    def on_bar(self, event):
+        pass
+
+
+def test_event_profiler_records_listener_calls():
+    bus = EventBus()
+    listener = _Listener()
+    bus.add_listener(EVENT.BAR, listener.on_bar)
+    profiler = EventProfiler()
+    bus.set_listener_wrapper(profiler.wrap)
+    # 开启统计后注册的处理函数同样会被统计
+    bus.add_listener(EVENT.POST_BAR, lambda e: None, user=True)
+
+    for _ in range(3):
+        for event_type in (EVENT.PRE_BAR, EVENT.BAR, EVENT.POST_BAR):
+            bus.publish_event(Event(event_type))
+
+    report = profiler.listener_report().set_index("event")
+    assert report.loc["BAR", "listener"] == "_Listener.on_bar"
+    assert report.loc["BAR", "calls"] == 3
+    assert report.loc["POST_BAR", "calls"] == 3
+    assert "PRE_BAR" not in report.index
+    assert (report["p99_time"] >= 0).all()
+
+    # 取消包装后不再统计
+    bus.set_listener_wrapper(None)
+    bus.publish_event(Event(EVENT.BAR))
+    assert profiler.listener_report().set_index("event").loc["BAR", "calls"] == 3
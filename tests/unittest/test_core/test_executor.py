@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from rqalpha.core.events import Event, EVENT, EventBus
+from rqalpha.core.executor import Executor
+
+
+class _Env(object):
+    def __init__(self):
+        self.event_bus = EventBus()
+        self.times = []
+
+    def update_time(self, calendar_dt, trading_dt):
+        self.times.append((calendar_dt, trading_dt))
+
+
+def test_split_and_publish_reuses_event():
+    env = _Env()
+    received = []
+    for event_type in (EVENT.PRE_BAR, EVENT.BAR, EVENT.POST_BAR):
+        env.event_bus.add_listener(event_type, lambda e: received.append((e, e.event_type, e.bar_dict)))
+
+    dt = datetime(2020, 1, 2, 15)
+    event = Event(EVENT.BAR, calendar_dt=dt, trading_dt=dt, bar_dict="bar_dict")
+    Executor(env)._split_and_publish(event)
+
+    assert env.times == [(dt, dt)]
+    assert [event_type for _, event_type, _ in received] == [EVENT.PRE_BAR, EVENT.BAR, EVENT.POST_BAR]
+    assert all(e is event and bar_dict == "bar_dict" for e, _, bar_dict in received)
+    assert event.event_type == EVENT.BAR
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import numpy as np
+
+from rqalpha.data.base_data_source.adjust import adjust_bars, adjust_field, cum_factors_of_bars
+
+
+def _bars():
+    bars = np.zeros(8, dtype=[("datetime", "<i8"), ("close", "<f8"), ("volume", "<f8"), ("total_turnover", "<f8")])
+    bars["datetime"] = np.array([
+        20200102, 20200103, 20200106, 20200107, 20200108, 20200109, 20200110, 20200113
+    ]) * 1000000
+    bars["close"] = np.linspace(10, 11, 8)
+    bars["volume"] = np.linspace(1000, 2000, 8)
+    bars["total_turnover"] = bars["close"] * bars["volume"]
+    return bars
+
+
+def _ex_factors():
+    factors = np.zeros(3, dtype=[("start_date", "<i8"), ("ex_cum_factor", "<f8")])
+    factors["start_date"] = [0, 20200106000000, 20200110000000]
+    factors["ex_cum_factor"] = [1.0, 1.1, 1.3]
+    return factors
+
+
+def test_precomputed_cum_factors_match_adjust_bars():
+    bars, ex_factors = _bars(), _ex_factors()
+    cum_factors = cum_factors_of_bars(bars, ex_factors)
+    for adjust_type in ("pre", "post"):
+        for adjust_orig in (datetime(2020, 1, 3), datetime(2020, 1, 8), datetime(2020, 1, 13)):
+            for s, e in ((0, 8), (2, 6), (0, 2), (6, 8)):
+                expected = adjust_bars(bars[s:e], ex_factors, None, adjust_type, adjust_orig)
+                actual = adjust_bars(bars[s:e], ex_factors, None, adjust_type, adjust_orig, cum_factors[s:e])
+                np.testing.assert_array_equal(actual, expected)
+                for field in ("close", "volume"):
+                    np.testing.assert_array_equal(
+                        adjust_field(bars[s:e], ex_factors, field, adjust_type, adjust_orig, cum_factors[s:e]),
+                        adjust_bars(bars[s:e], ex_factors, field, adjust_type, adjust_orig)[field]
+                    )
+
+
+def test_adjust_field_does_not_modify_bars():
+    bars, ex_factors = _bars(), _ex_factors()
+    origin = bars.copy()
+    adjust_field(bars, ex_factors, "close", "pre", datetime(2020, 1, 13), cum_factors_of_bars(bars, ex_factors))
+    np.testing.assert_array_equal(bars, origin)
@@ -0,0 +1,88 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from rqalpha.data.base_data_source import BaseDataSource
+from rqalpha.data.base_data_source.storages import SecuritiesDayBarStore
+from rqalpha.interface import AbstractDataSource, AbstractPriceBoard
+from rqalpha.utils import RqAttrDict
+from rqalpha.utils.testing import mock_bundle
+
+
+class _DictPriceBoard(AbstractPriceBoard):
+    def __init__(self, prices):
+        self._prices = prices
+
+    def get_last_price(self, order_book_id):
+        return self._prices.get(order_book_id, np.nan)
+
+    def get_limit_up(self, order_book_id):
+        return np.nan
+
+    def get_limit_down(self, order_book_id):
+        return np.nan
+
+
+class _DictDataSource(AbstractDataSource):
+    def __init__(self, bars):
+        self._bars = bars
+
+    def get_bar(self, instrument, dt, frequency):
+        return self._bars.get(instrument.order_book_id)
+
+
+def test_price_board_get_last_prices():
+    board = _DictPriceBoard({"000001.XSHE": 10.5, "000002.XSHE": 3})
+    prices = board.get_last_prices(["000002.XSHE", "000003.XSHE", "000001.XSHE"])
+    assert prices.dtype == np.float64
+    np.testing.assert_array_equal(prices, [3., np.nan, 10.5])
+    assert len(board.get_last_prices([])) == 0
+
+
+def test_data_source_get_bars_field():
+    bar = np.zeros(1, dtype=[("datetime", "<u8"), ("close", "<f8")])[0]
+    bar["close"] = 7.
+    data_source = _DictDataSource({"000001.XSHE": bar, "000002.XSHE": {"close": 8.}, "000003.XSHE": {}})
+    instruments = [SimpleNamespace(order_book_id=o) for o in ["000001.XSHE", "000002.XSHE", "000003.XSHE", "000004.XSHE"]]
+    np.testing.assert_array_equal(
+        data_source.get_bars_field(instruments, None, "1d", "close"), [7., 8., np.nan, np.nan]
+    )
+
+
+class _OverriddenDataSource(BaseDataSource):
+    # 与文档中的示例一致，重写 get_bar 提供自有的行情，分钟线不依赖 bundle
+    def get_bar(self, instrument, dt, frequency):
+        if frequency == "1m":
+            return {"close": 1.0}
+        bar = super(_OverriddenDataSource, self).get_bar(instrument, dt, frequency)
+        return None if bar is None else {"close": bar["close"] * 2}
+
+
+@pytest.fixture
+def bundle_path(tmp_path):
+    trading_dates = [20200102, 20200103, 20200106]
+    bars = np.zeros(2, dtype=SecuritiesDayBarStore.DEFAULT_DTYPE)
+    bars["datetime"] = np.array([20200102, 20200106], dtype=np.int64) * 1000000
+    bars["close"] = [10., 11.]
+    mock_bundle(str(tmp_path), [{
+        "order_book_id": o, "symbol": o, "type": "CS", "exchange": "XSHE", "listed_date": "2019-01-01",
+        "de_listed_date": "0000-00-00", "board_type": "MainBoard", "round_lot": 100.0, "market_tplus": 1,
+    } for o in ["000001.XSHE", "000002.XSHE"]], trading_dates, {"stocks.h5": {"000001.XSHE": bars}})
+    return str(tmp_path)
+
+
+def test_base_data_source_get_bars_field(bundle_path):
+    data_source = BaseDataSource(RqAttrDict({"data_bundle_path": bundle_path}))
+    instruments = list(data_source.get_instruments(["000001.XSHE", "000002.XSHE"]))
+    for dt, expected in ((datetime(2020, 1, 6, 15), [11., np.nan]), (datetime(2020, 1, 3, 15), [np.nan, np.nan])):
+        np.testing.assert_array_equal(data_source.get_bars_field(instruments, dt, "1d", "close"), expected)
+    with pytest.raises(NotImplementedError):
+        data_source.get_bars_field(instruments, datetime(2020, 1, 6, 10), "1m", "close")
+
+    # 重写了 get_bar 的子类须取得与 get_bar 一致的结果
+    data_source = _OverriddenDataSource(RqAttrDict({"data_bundle_path": bundle_path}))
+    dt = datetime(2020, 1, 6, 15)
+    np.testing.assert_array_equal(data_source.get_bars_field(instruments, dt, "1d", "close"), [22., np.nan])
+    np.testing.assert_array_equal(data_source.get_bars_field(instruments, dt, "1m", "close"), [1., 1.])
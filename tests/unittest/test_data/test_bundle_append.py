@@ -0,0 +1,37 @@
+import h5py
+import numpy as np
+
+from rqalpha.data.bundle import append_to_dataset, write_appendable_dataset
+
+DTYPE = np.dtype([("datetime", np.int64), ("close", np.float64)])
+
+
+def _bars(start, count, dtype=DTYPE):
+    bars = np.empty(count, dtype=dtype)
+    bars["datetime"] = np.arange(start, start + count)
+    bars["close"] = bars["datetime"] / 10
+    return bars
+
+
+def test_append_to_dataset(tmp_path):
+    path = str(tmp_path / "bars.h5")
+    with h5py.File(path, "w") as h5:
+        write_appendable_dataset(h5, "A", _bars(0, 3))
+        # 旧版本生成的不可扩展数据集
+        h5.create_dataset("B", data=_bars(0, 3))
+        # 自动更新时写入的空占位数据集
+        h5.create_dataset("C", data=np.array([]))
+
+    with h5py.File(path, "a") as h5:
+        # 字段顺序及类型宽度不同的记录按字段名转换
+        append_to_dataset(h5, "A", _bars(3, 2, np.dtype([("close", np.float32), ("datetime", np.int32)])))
+        append_to_dataset(h5, "B", _bars(3, 2))
+        append_to_dataset(h5, "C", _bars(0, 2))
+        append_to_dataset(h5, "D", _bars(0, 2))
+
+    with h5py.File(path, "r") as h5:
+        for name, count in (("A", 5), ("B", 5), ("C", 2), ("D", 2)):
+            assert h5[name].maxshape == (None, )
+            assert h5[name].dtype == DTYPE
+            np.testing.assert_array_equal(h5[name]["datetime"], np.arange(count))
+            np.testing.assert_allclose(h5[name]["close"], np.arange(count) / 10, rtol=1e-6)
@@ -0,0 +1,68 @@
+import json
+import os
+import pickle
+from datetime import date
+
+import h5py
+import numpy as np
+
+from rqalpha.data.base_data_source.storages import InstrumentTable
+from rqalpha.data.bundle import slice_bundle
+
+BAR_DTYPE = np.dtype([("datetime", np.int64), ("close", np.float64)])
+DATES = np.array([20150105, 20150106, 20150107, 20150108, 20150109, 20150112], dtype=np.int64)
+
+
+def _make_bundle(path):
+    os.makedirs(path)
+    instruments = [
+        {"order_book_id": "000001.XSHE", "symbol": "A", "type": "CS", "listed_date": "2000-01-01", "de_listed_date": "0000-00-00"},
+        {"order_book_id": "000002.XSHE", "symbol": "B", "type": "CS", "listed_date": "2000-01-01", "de_listed_date": "2010-01-01"},
+        {"order_book_id": "000001.XSHG", "symbol": "I", "type": "INDX", "listed_date": "2000-01-01", "de_listed_date": "0000-00-00"},
+        {"order_book_id": "IF88", "symbol": "IF88", "type": "Future", "underlying_symbol": "IF",
+         "listed_date": "0000-00-00", "de_listed_date": "0000-00-00"},
+    ]
+    with open(os.path.join(path, "instruments.pk"), "wb") as f:
+        pickle.dump(instruments, f)
+    np.save(os.path.join(path, "trading_dates.npy"), DATES)
+    bars = np.empty(len(DATES), dtype=BAR_DTYPE)
+    bars["datetime"], bars["close"] = DATES * 1000000, np.arange(len(DATES))
+    for name, ids in (("stocks.h5", ["000001.XSHE", "000002.XSHE"]), ("indexes.h5", ["000001.XSHG"]), ("futures.h5", ["IF88"])):
+        with h5py.File(os.path.join(path, name), "w") as h5:
+            for order_book_id in ids:
+                h5.create_dataset(order_book_id, data=bars)
+    with h5py.File(os.path.join(path, "suspended_days.h5"), "w") as h5:
+        h5.create_dataset("000001.XSHE", data=np.array([20140101, 20150106, 20150112]))
+    with h5py.File(os.path.join(path, "ex_cum_factor.h5"), "w") as h5:
+        h5.create_dataset("000001.XSHE", data=np.array(
+            [(20100101000000, 1.1), (20150112000000, 1.2)], dtype=[("start_date", np.int64), ("ex_cum_factor", np.float64)]
+        ))
+    with open(os.path.join(path, "future_info.json"), "w") as f:
+        json.dump([{"underlying_symbol": "IF", "margin_rate": 0.1}, {"underlying_symbol": "RB", "margin_rate": 0.1}], f)
+
+
+def test_slice_bundle(tmp_path):
+    src, dst = str(tmp_path / "src"), str(tmp_path / "dst")
+    _make_bundle(src)
+
+    ids = slice_bundle(
+        src, dst, order_book_ids=["000001.XSHE", "000002.XSHE"], start_date=date(2015, 1, 6), end_date=date(2015, 1, 8)
+    )
+    # 2010 年退市的合约不在区间内；上证指数始终保留
+    assert ids == ["000001.XSHE", "000001.XSHG"]
+    assert InstrumentTable.load(os.path.join(dst, "instruments.h5")).types == ["CS", "INDX"]
+    np.testing.assert_array_equal(np.load(os.path.join(dst, "trading_dates.npy")), DATES[:5])
+
+    with h5py.File(os.path.join(dst, "stocks.h5"), "r") as h5:
+        assert list(h5.keys()) == ["000001.XSHE"]
+        np.testing.assert_array_equal(h5["000001.XSHE"]["close"], [1, 2, 3])
+    with h5py.File(os.path.join(dst, "futures.h5"), "r") as h5:
+        assert len(h5.keys()) == 0
+    with h5py.File(os.path.join(dst, "suspended_days.h5"), "r") as h5:
+        np.testing.assert_array_equal(h5["000001.XSHE"][:], [20150106])
+    with h5py.File(os.path.join(dst, "ex_cum_factor.h5"), "r") as h5:
+        # 复权因子保留截止日期前的全部记录
+        np.testing.assert_array_equal(h5["000001.XSHE"]["ex_cum_factor"], [1.1])
+    with open(os.path.join(dst, "future_info.json")) as f:
+        # 不包含期货时保留原有的期货信息
+        assert len(json.load(f)) == 2
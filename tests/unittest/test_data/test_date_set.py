@@ -0,0 +1,36 @@
+import os
+from datetime import date
+
+import h5py
+import numpy as np
+
+from rqalpha.data.base_data_source.storages import DateSet, MemoryMappedDateSet
+
+
+def _write_date_set(path):
+    with h5py.File(path, "w") as h5:
+        # 故意乱序写入，确保内存映射版本在转换时完成排序
+        h5.create_dataset("000001.XSHE", data=np.array([20200106, 20200102, 20200103], dtype=np.int64))
+        h5.create_dataset("000002.XSHE", data=np.array([], dtype=np.int64))
+
+
+def test_memory_mapped_date_set_matches_date_set(tmp_path):
+    path = os.path.join(str(tmp_path), "suspended_days.h5")
+    _write_date_set(path)
+    dates = [date(2020, 1, 2), 20200103, np.int64(20200104000000), date(2020, 1, 6), date(2021, 1, 1)]
+
+    date_set, mmap_date_set = DateSet(path), MemoryMappedDateSet(path)
+    for order_book_id in ["000001.XSHE", "000002.XSHE", "600000.XSHG"]:
+        assert mmap_date_set.contains(order_book_id, dates) == date_set.contains(order_book_id, dates)
+    assert mmap_date_set.contains("000001.XSHE", dates) == [True, True, False, True, False]
+    assert os.path.exists(os.path.join(str(tmp_path), "mmap", "suspended_days.days.npy"))
+
+
+def test_date_set_contains_many(tmp_path):
+    path = os.path.join(str(tmp_path), "suspended_days.h5")
+    _write_date_set(path)
+    order_book_ids = ["000001.XSHE", "000002.XSHE", "600000.XSHG"]
+    for date_set in (DateSet(path), MemoryMappedDateSet(path)):
+        assert date_set.contains_many(order_book_ids, date(2020, 1, 6)) == [True, None, None]
+        assert date_set.contains_many(order_book_ids, 20200107) == [False, None, None]
+    assert DateSet(path).contains("000001.XSHE", np.array([20200102, 20200105000000])) == [True, False]
@@ -0,0 +1,53 @@
+import os
+
+import h5py
+import numpy as np
+
+from rqalpha.data.base_data_source.storages import MemoryMappedDayBarStore, SecuritiesDayBarStore
+
+
+def _write_day_bars(path, bars):
+    with h5py.File(path, "w") as h5:
+        for order_book_id, data in bars.items():
+            h5.create_dataset(order_book_id, data=data)
+
+
+def _make_bars(n, start=20200101):
+    # 字段顺序故意与 DEFAULT_DTYPE 不同，确保转换是按字段名而非按位置进行的
+    dtype = np.dtype([
+        ("datetime", "<i8"), ("close", "<f8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+        ("prev_close", "<f8"), ("limit_up", "<f8"), ("limit_down", "<f8"), ("volume", "<f8"),
+        ("total_turnover", "<f8")
+    ])
+    bars = np.zeros(n, dtype=dtype)
+    bars["datetime"] = (np.arange(n) + start) * 1000000
+    for i, field in enumerate(dtype.names[1:]):
+        bars[field] = np.arange(n) + i * 0.1
+    return bars
+
+
+def test_memory_mapped_day_bar_store_matches_h5_store(tmp_path):
+    path = os.path.join(str(tmp_path), "stocks.h5")
+    _write_day_bars(path, {"000001.XSHE": _make_bars(10), "600000.XSHG": _make_bars(3, 20200201)})
+
+    h5_store = SecuritiesDayBarStore(path)
+    mmap_store = MemoryMappedDayBarStore(path, SecuritiesDayBarStore.DEFAULT_DTYPE)
+    for order_book_id in ["000001.XSHE", "600000.XSHG", "000002.XSHE"]:
+        expected = h5_store.get_bars(order_book_id)
+        actual = mmap_store.get_bars(order_book_id)
+        assert actual.dtype == expected.dtype
+        np.testing.assert_array_equal(actual, expected)
+        assert mmap_store.get_date_range(order_book_id) == h5_store.get_date_range(order_book_id)
+
+    assert os.path.exists(os.path.join(str(tmp_path), "mmap", "stocks.bars.npy"))
+
+
+def test_memory_mapped_day_bar_store_reconverts_updated_bundle(tmp_path):
+    path = os.path.join(str(tmp_path), "stocks.h5")
+    cache_dir = os.path.join(str(tmp_path), "cache")
+    _write_day_bars(path, {"000001.XSHE": _make_bars(5)})
+    assert len(MemoryMappedDayBarStore(path, SecuritiesDayBarStore.DEFAULT_DTYPE, cache_dir).get_bars("000001.XSHE")) == 5
+
+    _write_day_bars(path, {"000001.XSHE": _make_bars(8)})
+    os.utime(path, (0, 0))
+    assert len(MemoryMappedDayBarStore(path, SecuritiesDayBarStore.DEFAULT_DTYPE, cache_dir).get_bars("000001.XSHE")) == 8
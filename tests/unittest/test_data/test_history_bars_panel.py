@@ -0,0 +1,171 @@
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rqalpha.data.base_data_source import BaseDataSource
+from rqalpha.data.base_data_source.storages import SecuritiesDayBarStore
+from rqalpha.interface import AbstractDataSource
+from rqalpha.utils import RqAttrDict
+from rqalpha.utils.testing import mock_bundle
+
+
+class _DataSource(AbstractDataSource):
+    def __init__(self, bars):
+        self._bars = bars
+
+    def history_bars(self, instrument, bar_count, frequency, fields, dt, skip_suspended=True, include_now=False,
+                     adjust_type='pre', adjust_orig=None):
+        bars = self._bars[instrument]
+        bars = bars[bars["datetime"] <= int(dt.strftime("%Y%m%d%H%M%S"))][-bar_count:]
+        return bars[fields]
+
+
+def _bars(date_ints, close):
+    bars = np.zeros(len(date_ints), dtype=[("datetime", "<u8"), ("close", "<f8"), ("volume", "<f8")])
+    bars["datetime"] = np.array(date_ints, dtype=np.uint64) * 1000000
+    bars["close"] = close
+    bars["volume"] = 100
+    return bars
+
+
+def test_default_history_bars_panel_aligns_on_datetime():
+    data_source = _DataSource({
+        "A": _bars([20200102, 20200103, 20200106, 20200107], [1, 2, 3, 4]),
+        # 20200106 停牌，20200108 之后无数据
+        "B": _bars([20200103, 20200107], [20, 40]),
+        "C": _bars([], []),
+    })
+    dates, values = data_source.history_bars_panel(["A", "B", "C"], 3, "1d", ["close", "volume"], datetime(2020, 1, 7))
+    assert dates.tolist() == [20200103000000, 20200106000000, 20200107000000]
+    assert values.shape == (3, 3, 2)
+    np.testing.assert_array_equal(values[:, 0, 0], [2, 3, 4])
+    np.testing.assert_array_equal(values[:, 1, 0], [20, np.nan, 40])
+    np.testing.assert_array_equal(values[:, 1, 1], [100, np.nan, 100])
+    assert np.isnan(values[:, 2, :]).all()
+
+
+TRADING_DATES = [20200102, 20200103, 20200106, 20200107, 20200108, 20200109, 20200110, 20200113]
+
+
+def _stock(order_book_id, listed_date):
+    return {
+        "order_book_id": order_book_id, "symbol": order_book_id, "type": "CS", "exchange": "XSHE",
+        "listed_date": listed_date, "de_listed_date": "0000-00-00", "board_type": "MainBoard",
+        "round_lot": 100.0, "market_tplus": 1,
+    }
+
+
+def _day_bars(date_ints, close):
+    bars = np.zeros(len(date_ints), dtype=SecuritiesDayBarStore.DEFAULT_DTYPE)
+    bars["datetime"] = np.array(date_ints, dtype=np.int64) * 1000000
+    bars["close"] = close
+    bars["open"] = bars["high"] = bars["low"] = np.asarray(close) - 0.5
+    bars["volume"] = 1000
+    bars["total_turnover"] = bars["volume"] * bars["close"]
+    return bars
+
+
+def _ex_factors(start_dates, factors):
+    ex_factors = np.zeros(len(factors), dtype=[("start_date", "<i8"), ("ex_cum_factor", "<f8")])
+    ex_factors["start_date"], ex_factors["ex_cum_factor"] = start_dates, factors
+    return ex_factors
+
+
+@pytest.fixture
+def data_source(tmp_path):
+    path = str(tmp_path)
+    mock_bundle(path, [
+        _stock("000001.XSHE", "2019-01-01"), _stock("000002.XSHE", "2019-01-01"), _stock("000003.XSHE", "2020-01-07"),
+    ], TRADING_DATES, {
+        "stocks.h5": {
+            # 000001.XSHE 于 20200108 除权
+            "000001.XSHE": _day_bars(TRADING_DATES, np.arange(10., 18.)),
+            # 000002.XSHE 于 20200106、20200109 停牌，bundle 中没有对应的日线
+            "000002.XSHE": _day_bars([20200102, 20200103, 20200107, 20200108, 20200110, 20200113], np.arange(20., 26.)),
+            # 000003.XSHE 于 20200107 上市
+            "000003.XSHE": _day_bars([20200107, 20200108, 20200109, 20200110, 20200113], np.arange(30., 35.)),
+        },
+        "ex_cum_factor.h5": {
+            "000001.XSHE": _ex_factors([0, 20200108000000], [1., 1.5]),
+            "000003.XSHE": _ex_factors([0, 20200110000000], [1., 2.]),
+        },
+        "suspended_days.h5": {"000002.XSHE": np.array([20200106, 20200109])},
+    })
+    return BaseDataSource(RqAttrDict({"data_bundle_path": path}))
+
+
+@pytest.mark.parametrize("adjust_type", ["pre", "post", "none"])
+def test_base_data_source_history_bars_panel(data_source, adjust_type):
+    instruments = [list(data_source.get_instruments([o]))[0] for o in ["000001.XSHE", "000002.XSHE", "000003.XSHE"]]
+    fields = ["close", "open", "volume", "total_turnover"]
+    dt, adjust_orig = datetime(2020, 1, 10, 15), datetime(2020, 1, 9)
+
+    dates, values = data_source.history_bars_panel(instruments, 6, "1d", fields, dt, adjust_type=adjust_type,
+                                                    adjust_orig=adjust_orig)
+    # 按交易日历对齐，不跳过停牌日
+    assert dates.tolist() == [d * 1000000 for d in TRADING_DATES[1:7]]
+    assert values.shape == (6, 3, 4)
+    for j, instrument in enumerate(instruments):
+        for k, field in enumerate(fields):
+            bars = data_source.history_bars(instrument, None, "1d", ["datetime", field], dt, skip_suspended=False,
+                                            adjust_type=adjust_type, adjust_orig=adjust_orig)
+            bars = bars[bars["datetime"] >= dates[0]]
+            expected = np.full(len(dates), np.nan)
+            expected[dates.searchsorted(bars["datetime"])] = bars[field]
+            np.testing.assert_array_equal(values[:, j, k], expected)
+    assert np.isnan(values[[1, 4], 1, :]).all()
+    assert np.isnan(values[:2, 2, :]).all()
+    if adjust_type == "pre":
+        # 除权日前的价格按 adjust_orig 时的复权因子调整
+        np.testing.assert_allclose(values[:3, 0, 0], np.array([11., 12., 13.]) / 1.5)
+
+
+def test_history_bars_panel_api(data_source):
+    from rqalpha.apis.api_base import history_bars_panel
+    from rqalpha.const import EXECUTION_PHASE
+    from rqalpha.core.execution_context import ExecutionContext
+    from rqalpha.data.data_proxy import DataProxy
+    from rqalpha.environment import Environment
+    from rqalpha.utils.testing import MagicMock
+
+    env = Environment(RqAttrDict({"base": {
+        "start_date": date(2020, 1, 2), "end_date": date(2020, 1, 13), "frequency": "1d", "accounts": {"STOCK": 100}
+    }}), False)
+    env.set_data_proxy(DataProxy(data_source, MagicMock()))
+    env.update_time(datetime(2020, 1, 10, 15), datetime(2020, 1, 10, 15))
+    order_book_ids = ["000001.XSHE", "000003.XSHE"]
+    dates, values = data_source.history_bars_panel(
+        [list(data_source.get_instruments([o]))[0] for o in order_book_ids], 3, "1d", ["close", "volume"],
+        datetime(2020, 1, 10, 15), adjust_orig=datetime(2020, 1, 10, 15)
+    )
+
+    with ExecutionContext(EXECUTION_PHASE.ON_BAR):
+        closes = history_bars_panel(order_book_ids, 3, "1d", "close")
+        panel = history_bars_panel(order_book_ids, 3, "1d", ["close", "volume"])
+    index = pd.to_datetime(["2020-01-08", "2020-01-09", "2020-01-10"])
+    pd.testing.assert_frame_equal(closes, pd.DataFrame(values[:, :, 0], index=index, columns=order_book_ids))
+    assert panel.columns.tolist() == [(f, o) for f in ["close", "volume"] for o in order_book_ids]
+    np.testing.assert_array_equal(panel["volume"].values, values[:, :, 1])
+    np.testing.assert_array_equal(panel["close"].values, closes.values)
+
+
+def test_history_bars_panel_with_overridden_history_bars(data_source, tmp_path):
+    class _DoubledDataSource(BaseDataSource):
+        def history_bars(self, instrument, bar_count, frequency, fields, dt, skip_suspended=True, include_now=False,
+                         adjust_type='pre', adjust_orig=None):
+            bars = super(_DoubledDataSource, self).history_bars(
+                instrument, bar_count, frequency, fields, dt, skip_suspended, include_now, adjust_type, adjust_orig
+            ).copy()
+            bars["close"] *= 2
+            return bars
+
+    doubled = _DoubledDataSource(RqAttrDict({"data_bundle_path": str(tmp_path)}))
+    instruments = list(data_source.get_instruments(["000001.XSHE", "000002.XSHE"]))
+    dt = datetime(2020, 1, 10, 15)
+    # 重写了 history_bars 的子类须取得与 history_bars 一致的结果
+    dates, values = data_source.history_bars_panel(instruments, 3, "1d", ["close"], dt, adjust_type="none")
+    doubled_dates, doubled_values = doubled.history_bars_panel(instruments, 3, "1d", ["close"], dt, adjust_type="none")
+    np.testing.assert_array_equal(doubled_dates, dates)
+    np.testing.assert_array_equal(doubled_values, values * 2)
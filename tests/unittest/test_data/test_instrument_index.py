@@ -0,0 +1,60 @@
+from datetime import datetime
+
+import pytest
+
+from rqalpha.data.instruments_mixin import InstrumentsMixin
+from rqalpha.utils.exception import InstrumentNotFound
+from rqalpha.utils.testing import mock_instrument
+
+
+class _DataSource:
+    def __init__(self, instruments):
+        self._instruments = instruments
+        self.calls = 0
+
+    def get_instruments(self, id_or_syms=None, types=None):
+        self.calls += 1
+        for ins in self._instruments:
+            if ins.order_book_id in id_or_syms or ins.symbol in id_or_syms:
+                yield ins
+
+
+def _ins(order_book_id, symbol, listed, de_listed, _type="CS"):
+    return mock_instrument(
+        order_book_id, _type, symbol=symbol, listed_date=listed, de_listed_date=de_listed
+    )
+
+
+OLD = _ins("A", "sym", datetime(2000, 1, 1), datetime(2010, 1, 1))
+NEW = _ins("A", "sym", datetime(2015, 1, 1), datetime(2999, 12, 31))
+OTHER = _ins("B", "other", datetime(2005, 1, 1), datetime(2999, 12, 31))
+
+
+def test_instrument_history_and_active_instrument():
+    data_source = _DataSource([NEW, OTHER, OLD])
+    mixin = InstrumentsMixin(data_source)
+
+    assert mixin.get_instrument_history("A") == [OLD, NEW]
+    assert mixin.get_instrument_history("sym", datetime(2012, 1, 1)) == [OLD]
+    assert mixin.get_instrument_history("A", datetime(1999, 1, 1)) == []
+    assert mixin.get_active_instrument("A", datetime(2005, 6, 1)) is OLD
+    assert mixin.get_active_instrument("A", datetime(2020, 6, 1)) is NEW
+    with pytest.raises(InstrumentNotFound):
+        mixin.get_active_instrument("A", datetime(2012, 1, 1))
+    assert mixin.get_active_instruments(["A", "other", "C"], datetime(2020, 1, 1)) == {"A": NEW, "B": OTHER}
+    # 每个代码只在首次查询时访问数据源，查询不到的代码除外
+    calls = data_source.calls
+    mixin.get_instrument_history("A", datetime(2016, 1, 1))
+    mixin.get_active_instrument("other", datetime(2016, 1, 1))
+    assert data_source.calls == calls
+
+
+def test_overlapping_instruments():
+    first = _ins("C", "c", datetime(2000, 1, 1), datetime(2010, 1, 1))
+    second = _ins("C", "c", datetime(2005, 1, 1), datetime(2999, 12, 31))
+    mixin = InstrumentsMixin(_DataSource([first, second]))
+
+    assert mixin.get_active_instrument("C", datetime(2002, 1, 1)) is first
+    assert mixin.get_active_instrument("C", datetime(2012, 1, 1)) is second
+    with pytest.raises(InstrumentNotFound):
+        mixin.get_active_instrument("C", datetime(2006, 1, 1))
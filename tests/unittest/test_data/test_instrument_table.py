@@ -0,0 +1,90 @@
+import os
+import pickle
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from rqalpha.const import INSTRUMENT_TYPE
+from rqalpha.data.base_data_source.storages import InstrumentTable
+from rqalpha.interface import AbstractDataSource
+from rqalpha.model.instrument import Instrument
+
+
+def _records():
+    path = os.path.join(os.path.dirname(__file__), "..", "test_models", "resources", "test_instruments.pkl")
+    with open(path, "rb") as f:
+        records = pickle.load(f)
+    records.append({"order_book_id": "IF88", "symbol": "IF88", "type": "Future", "listed_date": "2010-04-16",
+                    "de_listed_date": "0000-00-00"})
+    records.append({"order_book_id": "X", "symbol": "X", "type": "Unknown"})
+    return records
+
+
+class _DataSource(AbstractDataSource):
+    def __init__(self, instruments):
+        self._instruments = instruments
+
+    def get_instruments(self, id_or_syms=None, types=None):
+        return (i for i in self._instruments if not types or i.type in types)
+
+
+def test_instrument_table(tmp_path):
+    records = _records()
+    path = str(tmp_path / "instruments.h5")
+    InstrumentTable.write(records, path)
+
+    for table in (InstrumentTable.from_records(records), InstrumentTable.load(path)):
+        # 不支持的类型被过滤，连续合约的上市日期统一为 1990-01-01
+        assert len(table) == len(records) - 1
+        instruments = [Instrument(table.record(row)) for row in range(len(table))]
+        for r, ins in zip(records, instruments):
+            assert ins._dict == Instrument(r)._dict or ins.order_book_id == "IF88"
+        assert instruments[-1].listed_date == datetime(1990, 1, 1)
+
+        assert [instruments[r].order_book_id for r in table.rows_of_id("000001.XSHE")] == ["000001.XSHE"]
+        assert [instruments[r].order_book_id for r in table.rows_of_symbol("平安银行")] == ["000001.XSHE"]
+        assert len(table.rows_of_id("not exist")) == 0
+
+        for types in (None, ["CS"], ["Future", "INDX"]):
+            for dt in (None, datetime(2003, 3, 14), datetime(2015, 1, 5)):
+                rows = table.select(types, dt)
+                expected = [
+                    i for i in instruments if (not types or i.type in types) and (dt is None or i.active_at(dt))
+                ]
+                assert sorted(instruments[r].order_book_id for r in rows) == sorted(i.order_book_id for i in expected)
+
+                for fields in (None, ["order_book_id", "symbol", "type", "listed_date", "de_listed_date"]):
+                    if not len(rows):
+                        continue
+                    frame = table.to_frame(rows, fields).sort_values("order_book_id", ignore_index=True)
+                    expected_frame = _DataSource(instruments).get_instruments_frame(
+                        types, dt, fields
+                    ).sort_values("order_book_id", ignore_index=True)
+                    pd.testing.assert_frame_equal(frame, expected_frame, check_like=True)
+                    assert set(frame["type"]) <= set(INSTRUMENT_TYPE)
+
+
+def test_instrument_table_open(tmp_path):
+    records = _records()
+    pkl_path, path = str(tmp_path / "instruments.pk"), str(tmp_path / "instruments.h5")
+    with open(pkl_path, "wb") as f:
+        pickle.dump(records, f)
+
+    # 首次打开时从 instruments.pk 构建并缓存为合约表
+    table = InstrumentTable.open(path, pkl_path)
+    assert os.path.exists(path)
+    assert len(table) == len(records) - 1
+    cached = InstrumentTable.open(path, pkl_path)
+    assert [cached.record(r) for r in range(len(cached))] == [table.record(r) for r in range(len(table))]
+
+    # instruments.pk 更新后重新构建
+    with open(pkl_path, "wb") as f:
+        pickle.dump(records[:3], f)
+    os.utime(pkl_path, (time.time() + 10, time.time() + 10))
+    assert len(InstrumentTable.open(path, pkl_path)) == 3
+    assert len(InstrumentTable.load(path)) == 3
+
+    table = InstrumentTable.from_records([])
+    assert len(table) == 0 and table.types == [] and len(table.rows_of_symbol("平安银行")) == 0
+
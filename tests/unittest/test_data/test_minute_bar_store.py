@@ -0,0 +1,46 @@
+import os
+
+import h5py
+import numpy as np
+
+from rqalpha.data.base_data_source.storages import MinuteBarStore, write_minute_bars
+
+
+def _bars(trading_dates, minutes):
+    dts = np.concatenate([d * 1000000 + minutes for d in trading_dates])
+    bars = np.zeros(len(dts), dtype=[("datetime", "<i8"), ("close", "<f8"), ("volume", "<f8")])
+    bars["datetime"] = dts
+    bars["close"] = np.arange(len(dts))
+    return bars
+
+
+def test_minute_bar_store_get_bars_across_months(tmp_path):
+    path = os.path.join(str(tmp_path), "stocks.h5")
+    trading_dates = np.array([20200127, 20200131, 20200203, 20200204, 20200302])
+    minutes = np.array([93100, 93200, 150000])
+    bars = _bars(trading_dates, minutes)
+    with h5py.File(path, "w") as h5:
+        write_minute_bars(h5, "000001.XSHE", bars)
+        assert sorted(h5["000001.XSHE"].keys()) == ["202001", "202002", "202003", "index"]
+
+    store = MinuteBarStore(path)
+    assert store.get_day_index("000001.XSHE").tolist() == [(d, 3) for d in trading_dates]
+    np.testing.assert_array_equal(store.get_bars("000001.XSHE", 20200131, 20200204), bars[3:12])
+    np.testing.assert_array_equal(store.get_bars("000001.XSHE", 20200128, 20200301), bars[3:12])
+    np.testing.assert_array_equal(store.get_bars("000001.XSHE", 20200101, 20201231), bars)
+    assert len(store.get_bars("000001.XSHE", 20200205, 20200229)) == 0
+    assert len(store.get_bars("000002.XSHE", 20200101, 20201231)) == 0
+    assert len(store.get_day_index("000002.XSHE")) == 0
+
+
+def test_minute_bar_store_night_session(tmp_path):
+    path = os.path.join(str(tmp_path), "futures.h5")
+    # 2020-01-31 夜盘归属于 2020-02-03 交易日，应存放于 202002
+    bars = _bars(np.array([20200131]), np.array([90100, 150000, 210100, 230000]))
+    trading_dates = np.array([20200131, 20200131, 20200203, 20200203])
+    with h5py.File(path, "w") as h5:
+        write_minute_bars(h5, "RB2005", bars, trading_dates)
+
+    store = MinuteBarStore(path)
+    assert store.get_day_index("RB2005").tolist() == [(20200131, 2), (20200203, 2)]
+    np.testing.assert_array_equal(store.get_bars("RB2005", 20200203, 20200203), bars[2:])
@@ -0,0 +1,78 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from rqalpha.data.price_matrix import PriceMatrix
+from rqalpha.interface import AbstractDataSource
+
+DTYPE = [("datetime", "<i8"), ("open", "<f8"), ("close", "<f8"), ("high", "<f8"), ("low", "<f8"), ("volume", "<f8"),
+         ("limit_up", "<f8"), ("limit_down", "<f8"), ("prev_close", "<f8")]
+
+
+def _bars(dates, start):
+    bars = np.zeros(len(dates), dtype=DTYPE)
+    bars["datetime"] = [d * 1000000 for d in dates]
+    for i, field in enumerate(name for name, _ in DTYPE[1:]):
+        bars[field] = start + np.arange(len(dates)) + i / 10
+    return bars
+
+
+class _DataSource(AbstractDataSource):
+    def __init__(self, bars):
+        self.bars = bars
+        self.loaded = []
+
+    def history_bars(self, instrument, bar_count, frequency, fields, dt, skip_suspended=True, include_now=False,
+                     adjust_type="pre", adjust_orig=None):
+        self.loaded.append(instrument.order_book_id)
+        bars = self.bars[instrument.order_book_id]
+        bars = bars[bars["datetime"] <= int(dt.strftime("%Y%m%d")) * 1000000][-bar_count:]
+        return bars[fields]
+
+    def get_bar(self, instrument, dt, frequency):
+        bars = self.bars[instrument.order_book_id]
+        return bars[bars["datetime"] == int(dt.strftime("%Y%m%d")) * 1000000][0]
+
+
+def test_price_matrix():
+    trading_dates = pd.DatetimeIndex(["2020-01-02", "2020-01-03", "2020-01-06", "2020-01-07"])
+    a, b = SimpleNamespace(order_book_id="A"), SimpleNamespace(order_book_id="B")
+    data_source = _DataSource({
+        "A": _bars([20191231, 20200102, 20200103, 20200106, 20200107], 10.),
+        # B 于 2020-01-06 停牌且无数据
+        "B": _bars([20200102, 20200103, 20200107], 100.),
+    })
+    matrix = PriceMatrix(data_source, trading_dates)
+
+    assert matrix.row_of(date(2019, 12, 31)) is None
+    assert matrix.row_of(date(2020, 1, 4)) is None
+    row = matrix.row_of(datetime(2020, 1, 6, 15))
+    assert row == 2
+
+    bar = matrix.get_bar(a, row)
+    assert bar["close"] == 13.1 and bar["limit_down"] == 13.6
+    assert bar["datetime"] == 20200106000000
+    # 矩阵之外的字段从数据源读取
+    assert bar["prev_close"] == 13.7
+    assert bar.dtype.names == tuple(name for name, _ in DTYPE)
+    assert matrix.get_bar(b, row) is None
+    assert matrix.get_bar(b, matrix.row_of(date(2020, 1, 7)))["open"] == 102.
+
+    np.testing.assert_array_equal(matrix.get_field([b, a], 1, "volume"), [101.4, 12.4])
+    np.testing.assert_array_equal(matrix.get_field([b, a, b], 2, "close"), [np.nan, 13.1, np.nan])
+    # 每个合约只整列载入一次
+    assert sorted(data_source.loaded) == ["A", "B"]
+    assert len(matrix) == 2
+
+
+def test_price_matrix_grows_columns():
+    trading_dates = pd.DatetimeIndex(["2020-01-02", "2020-01-03"])
+    instruments = [SimpleNamespace(order_book_id=str(i)) for i in range(40)]
+    data_source = _DataSource({ins.order_book_id: _bars([20200102, 20200103], float(i)) for i, ins in enumerate(instruments)})
+    matrix = PriceMatrix(data_source, trading_dates)
+    for ins in instruments[:3]:
+        matrix.column_of(ins)
+    matrix.load(instruments)
+    np.testing.assert_array_equal(matrix.get_field(instruments, 1, "open"), np.arange(40) + 1.)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from rqalpha.data.base_data_source.resample import week_groups, resample_by_week_groups
+
+
+def _calendar():
+    # 2020-01-20 ~ 2020-01-31 整两周休市
+    dates = pd.bdate_range("2020-01-01", "2020-02-29")
+    dates = dates[(dates < "2020-01-20") | (dates > "2020-01-31")]
+    return np.array([d.year * 10000 + d.month * 100 + d.day for d in dates])
+
+
+def _bars(date_ints):
+    bars = np.zeros(len(date_ints), dtype=[
+        ("datetime", "<i8"), ("open", "<f8"), ("close", "<f8"), ("high", "<f8"), ("low", "<f8"), ("volume", "<f8")
+    ])
+    bars["datetime"] = date_ints * 1000000
+    rng = np.random.default_rng(42)
+    for f in ("open", "close", "high", "low", "volume"):
+        bars[f] = rng.random(len(date_ints)) * 100
+    return bars
+
+
+def test_week_groups_skip_holiday_weeks():
+    calendar = _calendar()
+    groups = week_groups(_bars(calendar)["datetime"], calendar)
+    assert groups.labels.tolist() == [
+        20200103000000, 20200110000000, 20200117000000, 20200207000000, 20200214000000, 20200221000000,
+        20200228000000
+    ]
+    assert (groups.ends - groups.starts).tolist() == [3, 5, 5, 5, 5, 5, 5]
+
+
+def test_resample_by_week_groups_matches_pandas():
+    calendar = _calendar()
+    # 2020-02-10 ~ 2020-02-14 整周停牌
+    date_ints = calendar[(calendar < 20200210) | (calendar > 20200214)]
+    bars = _bars(date_ints)
+    week_bars = resample_by_week_groups(bars, week_groups(bars["datetime"], calendar), ["open", "close", "high", "low", "volume"])
+
+    df = pd.DataFrame(bars)
+    df.index = pd.to_datetime(df.pop("datetime") // 1000000, format="%Y%m%d")
+    expected = df.resample("W-FRI").agg({
+        "open": "first", "close": "last", "high": "max", "low": "min", "volume": "sum"
+    }).dropna(how="all", subset=["open"])
+    # 停牌周的价格为 nan，成交量为 0
+    suspended = week_bars["datetime"] == 20200214000000
+    assert np.isnan(week_bars["close"][suspended]).all()
+    assert (week_bars["volume"][suspended] == 0).all()
+    for f in expected.columns:
+        np.testing.assert_allclose(week_bars[f][~suspended], expected[f].values)
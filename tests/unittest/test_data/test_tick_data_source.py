@@ -0,0 +1,117 @@
+import os
+from datetime import datetime
+
+import h5py
+import numpy as np
+
+from rqalpha.core.events import EVENT, Event
+from rqalpha.data.base_data_source import BaseDataSource
+from rqalpha.data.base_data_source.storages import write_ticks
+from rqalpha.data.tick_price_board import TickPriceBoard
+from rqalpha.model.tick import TickObject
+from rqalpha.utils import RqAttrDict
+from rqalpha.utils.testing import EnvironmentFixture, MagicMock, RQAlphaTestCase, mock_bundle, mock_instrument
+
+
+def _future(order_book_id, listed_date):
+    return {
+        "order_book_id": order_book_id, "symbol": order_book_id, "type": "Future", "exchange": "SHFE",
+        "underlying_symbol": order_book_id[:2], "listed_date": listed_date, "de_listed_date": "2020-05-15",
+        "maturity_date": "2020-05-15", "market_tplus": 0, "round_lot": 1.0, "contract_multiplier": 10.0,
+    }
+
+
+def _ticks(dts, last):
+    last = np.asarray(last, dtype=np.float64)
+    return {"datetime": np.asarray(dts, dtype=np.int64), "last": last, "asks": last[:, None] + np.arange(1, 6)}
+
+
+def _data_source(path):
+    # 20200103 两个合约在 09:00:00.500 存在相同时刻的 tick
+    mock_bundle(path, [_future("RB2005", "2019-05-16"), _future("HC2005", "2020-01-03")], [20200102, 20200103, 20200106])
+    os.mkdir(os.path.join(path, "ticks"))
+    with h5py.File(os.path.join(path, "ticks", "20200102.h5"), "w") as h5:
+        write_ticks(h5, "RB2005", _ticks([20200102090000000, 20200102090000500, 20200102090001000], [1, 2, 3]))
+    with h5py.File(os.path.join(path, "ticks", "20200103.h5"), "w") as h5:
+        write_ticks(h5, "RB2005", _ticks(
+            [20200103090000000, 20200103090000500, 20200103090001000, 20200103090002000], [4, 5, 6, 7]
+        ))
+        write_ticks(h5, "HC2005", _ticks([20200103090000500, 20200103090001500], [50, 51]))
+    data_source = BaseDataSource(RqAttrDict({"data_bundle_path": path}))
+    for store in data_source._tick_stores.values():
+        store.BLOCK_SIZE = 2
+    return data_source
+
+
+def _ins(data_source, order_book_id):
+    return list(data_source.get_instruments([order_book_id]))[-1]
+
+
+def _view(ticks):
+    return [(t.order_book_id, t.last) for t in ticks]
+
+
+def test_get_merge_ticks(tmp_path):
+    data_source = _data_source(str(tmp_path))
+
+    ticks = list(data_source.get_merge_ticks(["HC2005", "RB2005", "IF2001"], datetime(2020, 1, 3)))
+    # 按时间归并，同一时刻按 order_book_id_list 的顺序排列，分块读取不影响顺序
+    assert _view(ticks) == [
+        ("RB2005", 4), ("HC2005", 50), ("RB2005", 5), ("RB2005", 6), ("HC2005", 51), ("RB2005", 7)
+    ]
+    np.testing.assert_array_equal(ticks[1].asks, [51, 52, 53, 54, 55])
+
+    # 仅返回 last_dt 之后的 tick
+    ticks = data_source.get_merge_ticks(["RB2005", "HC2005"], datetime(2020, 1, 3), datetime(2020, 1, 3, 9, 0, 0, 500000))
+    assert _view(ticks) == [("RB2005", 6), ("HC2005", 51), ("RB2005", 7)]
+    assert list(data_source.get_merge_ticks(["RB2005"], datetime(2020, 1, 6))) == []
+
+
+def test_history_ticks(tmp_path):
+    data_source = _data_source(str(tmp_path))
+    rb, hc = _ins(data_source, "RB2005"), _ins(data_source, "HC2005")
+
+    # 包含 dt 时刻的 tick，不足时向前一交易日读取
+    ticks = data_source.history_ticks(rb, 4, datetime(2020, 1, 3, 9, 0, 1))
+    assert [t.last for t in ticks] == [3, 4, 5, 6]
+    assert [t.last for t in data_source.history_ticks(rb, 2, datetime(2020, 1, 3, 9, 0, 1))] == [5, 6]
+    assert [t.last for t in data_source.history_ticks(rb, 100, datetime(2020, 1, 6, 9))] == [1, 2, 3, 4, 5, 6, 7]
+    # 不读取上市日之前的数据
+    assert [t.last for t in data_source.history_ticks(hc, 100, datetime(2020, 1, 6, 9))] == [50, 51]
+
+
+class TickPriceBoardTestCase(EnvironmentFixture, RQAlphaTestCase):
+    def test_tick_price_board(self):
+        self.env.data_proxy = MagicMock()
+        self.env.data_proxy.get_prev_close.return_value = 9.
+        board = TickPriceBoard()
+        rb = mock_instrument("RB2005", "Future")
+
+        # 尚未收到 tick 时以昨收价作为最新价，涨跌停价及盘口为 nan
+        assert board.get_last_price("RB2005") == 9.
+        assert np.isnan(board.get_limit_up("RB2005")) and np.isnan(board.get_a1("RB2005"))
+
+        tick = TickObject(rb, {
+            "datetime": 20200103090000000, "last": 10., "limit_up": 11., "limit_down": 8.,
+            "asks": np.array([10.1, 10.2]), "bids": np.array([9.9, 9.8]),
+        })
+        self.env.event_bus.publish_event(Event(EVENT.PRE_TICK, tick=tick))
+        assert board.get_last_price("RB2005") == 10.
+        assert (board.get_limit_up("RB2005"), board.get_limit_down("RB2005")) == (11., 8.)
+        assert (board.get_a1("RB2005"), board.get_b1("RB2005")) == (10.1, 9.9)
+        assert board.get_last_price("HC2005") == 9.
+
+        # 次一交易日收到 tick 前不沿用上一交易日的 tick，最新价回退为昨收价
+        self.env.data_proxy.get_prev_close.return_value = 10.
+        self.env.event_bus.publish_event(Event(EVENT.PRE_BEFORE_TRADING))
+        assert board.get_last_price("RB2005") == 10.
+        assert np.isnan(board.get_limit_up("RB2005")) and np.isnan(board.get_limit_down("RB2005"))
+        assert np.isnan(board.get_a1("RB2005"))
+
+        tick = TickObject(rb, {
+            "datetime": 20200106090000000, "last": 10.5, "limit_up": 11.5, "limit_down": 8.5,
+            "asks": np.array([10.6]), "bids": np.array([10.4]),
+        })
+        self.env.event_bus.publish_event(Event(EVENT.PRE_TICK, tick=tick))
+        assert board.get_last_price("RB2005") == 10.5
+        assert (board.get_limit_up("RB2005"), board.get_limit_down("RB2005")) == (11.5, 8.5)
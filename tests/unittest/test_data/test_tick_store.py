@@ -0,0 +1,43 @@
+import os
+
+import h5py
+import numpy as np
+
+from rqalpha.data.base_data_source.storages import TickStore, write_ticks
+
+
+def _ticks(n, start_dt):
+    dts = start_dt + np.arange(n, dtype=np.int64) * 500
+    last = np.arange(n, dtype=np.float64)
+    return {
+        "datetime": dts, "last": last, "volume": last * 10,
+        "asks": last[:, None] + np.arange(1, 6), "bids": last[:, None] - np.arange(1, 6),
+    }
+
+
+def test_tick_store(tmp_path):
+    path = str(tmp_path)
+    ticks = _ticks(10, 20200102090000000)
+    with h5py.File(os.path.join(path, "20200102.h5"), "w") as h5:
+        write_ticks(h5, "RB2005", ticks)
+    with h5py.File(os.path.join(path, "20200103.h5"), "w") as h5:
+        write_ticks(h5, "RB2005", _ticks(3, 20200103090000000))
+
+    store = TickStore(path)
+    store.BLOCK_SIZE = 4
+    assert store.get_trading_dates().tolist() == [20200102, 20200103]
+
+    blocks = list(store.iter_blocks("RB2005", 20200102))
+    assert [len(b["datetime"]) for b in blocks] == [4, 4, 2]
+    np.testing.assert_array_equal(np.concatenate([b["asks"] for b in blocks]), ticks["asks"])
+    # 仅返回 start_dt 之后的 tick
+    blocks = list(store.iter_blocks("RB2005", 20200102, start_dt=20200102090001000))
+    np.testing.assert_array_equal(np.concatenate([b["last"] for b in blocks]), ticks["last"][3:])
+    assert list(store.iter_blocks("IF2001", 20200102)) == []
+    assert list(store.iter_blocks("RB2005", 20200106)) == []
+
+    tail = store.get_ticks("RB2005", 20200102, 20200102090002000, 3)
+    np.testing.assert_array_equal(tail["last"], [2, 3, 4])
+    assert tail["bids"].shape == (3, 5)
+    assert len(store.get_ticks("RB2005", 20200102, None, 100)["datetime"]) == 10
+    assert store.get_ticks("IF2001", 20200102, None, 1) is None
@@ -0,0 +1,97 @@
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from rqalpha.mod.rqalpha_mod_sys_analyser.columnar import ColumnarLog, ColumnarRecorder
+
+COLUMNS = [("datetime", "M8[s]"), ("order_book_id", object), ("quantity", np.int64), ("order_id", np.int64),
+           ("price", np.float64)]
+
+
+def test_columnar_log_grows_and_matches_records():
+    log = ColumnarLog(COLUMNS, capacity=2)
+    records = [
+        (datetime(2020, 1, 2, 9, 31, i), "00000{}.XSHE".format(i), 100 * i, 1000 + i, 1.5 * i) for i in range(5)
+    ]
+    for record in records:
+        log.append(*record)
+    assert len(log) == 5
+    assert log.column("quantity").dtype == np.int64
+
+    df = log.to_dataframe()
+    expected = pd.DataFrame([dict(zip(log.names, r)) for r in records])
+    expected["datetime"] = expected["datetime"].astype("datetime64[s]")
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+    assert df.dtypes["quantity"] == np.int64
+
+
+def test_columnar_log_falls_back_to_object():
+    log = ColumnarLog(COLUMNS)
+    log.append(datetime(2020, 1, 2), "A", 100, 1, 1.)
+    # 非整数的数量、为 None 的订单号不应被静默转换
+    log.append(datetime(2020, 1, 2), "B", 0.5, None, 2.)
+    df = log.to_dataframe()
+    assert df["quantity"].tolist() == [100, 0.5]
+    assert df.dtypes["quantity"] == np.float64
+    assert df["order_id"].isna().tolist() == [False, True]
+
+    log.append(datetime(2020, 1, 3), "C", 1, "X1", 3.)
+    assert log.column("order_id").tolist() == [1, None, "X1"]
+
+
+def test_columnar_log_state():
+    log = ColumnarLog(COLUMNS)
+    log.append(datetime(2020, 1, 2, 15), "A", 100, 1, 1.)
+    log.append(datetime(2020, 1, 3, 15), "B", 200, 2, 2.)
+    restored = ColumnarLog(COLUMNS)
+    restored.set_state(log.get_state())
+    pd.testing.assert_frame_equal(restored.to_dataframe(), log.to_dataframe())
+
+
+POSITION_RECORDS = [
+    {"order_book_id": "RB1501", "date": date(2015, 1, 5), "margin": 1.0, "LONG_quantity": 1.},
+    {"order_book_id": "RB1501", "date": date(2015, 1, 6), "margin": 2.0, "LONG_quantity": 1., "SHORT_quantity": 2.},
+    {"order_book_id": "RB1505", "date": date(2015, 1, 6), "margin": 3.0, "SHORT_quantity": 1., "SHORT_pnl": None},
+    {"order_book_id": "RB1505", "date": date(2015, 1, 7), "margin": 4.0, "SHORT_quantity": 3., "SHORT_pnl": 1.5},
+    {"order_book_id": "RB1505", "date": date(2015, 1, 8), "margin": 5.0, "SHORT_quantity": 3., "SHORT_pnl": 2.5},
+]
+
+
+def _expected_positions():
+    expected = pd.DataFrame(POSITION_RECORDS)
+    expected["date"] = pd.to_datetime(expected["date"])
+    return expected
+
+
+def test_columnar_log_append_record_matches_dict_records():
+    log = ColumnarLog()
+    for record in POSITION_RECORDS:
+        log.append_record(record)
+    df = log.to_dataframe()
+    df["date"] = pd.to_datetime(df["date"])
+    pd.testing.assert_frame_equal(df, _expected_positions())
+
+
+def test_columnar_recorder_streams_to_file(tmp_path):
+    path = str(tmp_path / "record.h5")
+    recorder = ColumnarRecorder("future_positions", path, flush_rows=2)
+    for record in POSITION_RECORDS[:3]:
+        recorder.append_record(record)
+    state = recorder.get_state()
+    for record in POSITION_RECORDS[3:]:
+        recorder.append_record(record)
+    recorder.flush()
+    assert len(recorder) == len(POSITION_RECORDS)
+
+    df = recorder.to_dataframe()
+    df["date"] = pd.to_datetime(df["date"])
+    pd.testing.assert_frame_equal(df, _expected_positions())
+
+    # 从保存的状态恢复时丢弃此后写入文件的记录
+    restored = ColumnarRecorder("future_positions", path, flush_rows=2)
+    restored.set_state(state)
+    for record in POSITION_RECORDS[3:]:
+        restored.append_record(record)
+    restored.flush()
+    pd.testing.assert_frame_equal(restored.to_dataframe(), recorder.to_dataframe())
@@ -0,0 +1,71 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pandas as pd
+
+from rqalpha.const import EXECUTION_PHASE
+from rqalpha.core.execution_context import ExecutionContext
+from rqalpha.utils import RqAttrDict
+from rqalpha.utils.testing import RQAlphaTestCase, EnvironmentFixture
+
+
+class SchedulerJobsTestCase(EnvironmentFixture, RQAlphaTestCase):
+    def __init__(self, *args, **kwargs):
+        super(SchedulerJobsTestCase, self).__init__(*args, **kwargs)
+        self.env_config = RqAttrDict({
+            "base": {
+                "accounts": {"STOCK": 100},
+                "start_date": date(2016, 1, 1),
+                "end_date": date(2016, 12, 31),
+                "frequency": "1m",
+            }
+        })
+
+    def _create_scheduler(self):
+        from rqalpha.mod.rqalpha_mod_sys_scheduler.scheduler import Scheduler
+
+        scheduler = Scheduler("1m")
+        scheduler._trading_calendar = pd.DatetimeIndex(pd.bdate_range("2016-01-01", "2016-12-31"))
+        self.calls = []
+
+        def record(name):
+            def func(context, bar_dict):
+                self.calls.append(name)
+            return func
+
+        with ExecutionContext(EXECUTION_PHASE.ON_INIT):
+            scheduler.run_daily(record("daily_open"), time_rule=9 * 60 + 31)
+            scheduler.run_daily(record("daily_early"), time_rule=9 * 60 + 31)
+            scheduler.run_daily(record("daily_10"), time_rule=10 * 60)
+            scheduler.run_daily(record("before_trading"), time_rule="before_trading")
+            scheduler.run_daily(record("night"), time_rule=21 * 60)
+            scheduler.run_weekly(record("monday"), weekday=1, time_rule=9 * 60 + 31)
+            scheduler.run_monthly(record("first_day"), tradingday=1, time_rule=9 * 60 + 31)
+        return scheduler
+
+    def _run_day(self, scheduler, day, minutes):
+        self.env.trading_dt = datetime.combine(day, datetime.min.time())
+        scheduler._ucontext = SimpleNamespace(now=None)
+        scheduler.next_day_(None)
+        scheduler.before_trading_(None)
+        for minute in minutes:
+            scheduler.ucontext.now = datetime(day.year, day.month, day.day, minute // 60, minute % 60)
+            scheduler.next_bar_(SimpleNamespace(bar_dict=None))
+
+    def test_jobs_triggered_by_day_and_minute(self):
+        scheduler = self._create_scheduler()
+
+        # 2016-02-01 为周一且为当月第一个交易日，10:00 前没有 bar，10:01 的 bar 触发 10:00 的函数
+        self._run_day(scheduler, date(2016, 2, 1), [9 * 60 + 31, 10 * 60 + 1])
+        self.assertEqual(self.calls, [
+            "before_trading", "daily_open", "daily_early", "monday", "first_day", "daily_10"
+        ])
+
+        self.calls.clear()
+        self._run_day(scheduler, date(2016, 2, 2), [9 * 60 + 32, 10 * 60])
+        self.assertEqual(self.calls, ["before_trading", "daily_open", "daily_early", "daily_10"])
+
+        # 同一个 bar 内触发多个函数时按注册顺序执行
+        self.calls.clear()
+        self._run_day(scheduler, date(2016, 2, 3), [10 * 60 + 5])
+        self.assertEqual(self.calls, ["before_trading", "daily_open", "daily_early", "daily_10"])
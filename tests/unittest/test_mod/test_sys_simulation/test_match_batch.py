@@ -0,0 +1,185 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from rqalpha.const import MATCHING_TYPE, ORDER_STATUS, POSITION_EFFECT, SIDE
+from rqalpha.core.events import EVENT
+from rqalpha.data.base_data_source import BaseDataSource
+from rqalpha.data.base_data_source.storages import SecuritiesDayBarStore
+from rqalpha.data.data_proxy import DataProxy
+from rqalpha.environment import Environment
+from rqalpha.interface import TransactionCost
+from rqalpha.mod.rqalpha_mod_sys_simulation import __config__ as mod_config
+from rqalpha.mod.rqalpha_mod_sys_simulation.matcher import DefaultBarMatcher
+from rqalpha.model.order import LimitOrder, MarketOrder, Order
+from rqalpha.utils import RqAttrDict
+from rqalpha.utils.testing import mock_bundle, mock_instrument
+
+TRADING_DT = datetime(2020, 3, 2, 15)
+
+# order_book_id: (收盘价, 成交量, 涨停价, 跌停价, 上市日期)
+MARKET = {
+    "NORMAL": (10., 2000., 11., 9., datetime(2000, 1, 1)),
+    "LIMIT_UP": (11., 5000., 11., 9., datetime(2000, 1, 1)),
+    "LIMIT_DOWN": (9., 5000., 11., 9., datetime(2000, 1, 1)),
+    "NO_VOLUME": (10., 0., 11., 9., datetime(2000, 1, 1)),
+    "NAN_BAR": (np.nan, np.nan, 11., 9., datetime(2000, 1, 1)),
+    "NEW_LISTED": (np.nan, np.nan, 11., 9., datetime(2020, 3, 2)),
+}
+
+# (order_book_id, 方向, 数量, 委托价，None 为市价单)
+ORDERS = [
+    ("NORMAL", SIDE.BUY, 200, None),
+    ("NORMAL", SIDE.BUY, 200, 9.5),
+    ("NORMAL", SIDE.SELL, 100, 9.5),
+    ("NORMAL", SIDE.SELL, 100, 10.5),
+    ("NORMAL", SIDE.BUY, 300, 10.),
+    ("NORMAL", SIDE.BUY, 100, None),
+    ("LIMIT_UP", SIDE.BUY, 100, None),
+    ("LIMIT_UP", SIDE.BUY, 100, 11.),
+    ("LIMIT_UP", SIDE.SELL, 100, None),
+    ("LIMIT_DOWN", SIDE.SELL, 100, None),
+    ("LIMIT_DOWN", SIDE.SELL, 100, 9.),
+    ("LIMIT_DOWN", SIDE.BUY, 100, 9.),
+    ("NO_VOLUME", SIDE.BUY, 100, None),
+    ("NO_VOLUME", SIDE.SELL, 100, 9.5),
+    ("NAN_BAR", SIDE.BUY, 100, None),
+    ("NAN_BAR", SIDE.SELL, 100, 9.),
+    ("NEW_LISTED", SIDE.BUY, 100, None),
+]
+
+
+class _DataProxy:
+    def __init__(self):
+        self._instruments = {
+            o: mock_instrument(o, "CS", symbol=o, board_type="MainBoard", round_lot=100, listed_date=v[4]) for o, v in MARKET.items()
+        }
+
+    def instrument(self, order_book_id):
+        return self._instruments[order_book_id]
+
+    instrument_not_none = instrument
+
+    def get_tick_size(self, order_book_id):
+        return self._instruments[order_book_id].tick_size()
+
+    def get_last_price(self, order_book_id):
+        return MARKET[order_book_id][0]
+
+    def get_bar(self, order_book_id, dt, frequency):
+        close, volume = MARKET[order_book_id][:2]
+        return SimpleNamespace(close=close, volume=volume)
+
+    def get_bars_field(self, order_book_ids, dt, frequency, field):
+        i = {"close": 0, "volume": 1}[field]
+        return np.array([MARKET[o][i] for o in order_book_ids], dtype=float)
+
+
+class _BarDataSource(BaseDataSource):
+    # 重写 get_bar 提供自有的日线，bundle 中的日线价格与之不同
+    def get_bar(self, instrument, dt, frequency):
+        close, volume, limit_up, limit_down, _ = MARKET[instrument.order_book_id]
+        return {"close": close, "open": close, "volume": volume, "limit_up": limit_up, "limit_down": limit_down}
+
+
+class _PriceBoard:
+    def get_last_price(self, order_book_id):
+        return MARKET[order_book_id][0]
+
+    def get_limit_up(self, order_book_id):
+        return MARKET[order_book_id][2]
+
+    def get_limit_down(self, order_book_id):
+        return MARKET[order_book_id][3]
+
+
+class _CostDecider:
+    def calc(self, args):
+        return TransactionCost(commission=args.price * args.quantity * 0.001, tax=0, other_fees=0)
+
+
+class _Account:
+    cash = 1e8
+
+    def calc_close_today_amount(self, order_book_id, trade_amount, position_direction, position_effect):
+        return 0
+
+
+def _run(batch, data_proxy=None):
+    env = Environment(RqAttrDict({"base": {
+        "start_date": TRADING_DT.date(), "end_date": TRADING_DT.date(), "frequency": "1d", "round_price": False
+    }}), False)
+    env.set_data_proxy(data_proxy or _DataProxy())
+    env.set_price_board(_PriceBoard())
+    env.set_transaction_cost_decider("CS", _CostDecider())
+    env.update_time(TRADING_DT, TRADING_DT)
+    trades = []
+    env.event_bus.add_listener(EVENT.TRADE, lambda e: trades.append(e.trade))
+
+    config = RqAttrDict(dict(mod_config, matching_type=MATCHING_TYPE.CURRENT_BAR_CLOSE, slippage=0.001))
+    matcher = DefaultBarMatcher(env, config)
+    account = _Account()
+    orders = []
+    for order_book_id, side, quantity, price in ORDERS:
+        style = MarketOrder() if price is None else LimitOrder(price)
+        order = Order.__from_create__(order_book_id, quantity, side, style, POSITION_EFFECT.OPEN)
+        order.active()
+        orders.append(order)
+    if batch:
+        matcher.match_batch([(account, o) for o in orders], False)
+    else:
+        for order in orders:
+            if not order.is_final():
+                matcher.match(account, order, False)
+    ids = {o.order_id: i for i, o in enumerate(orders)}
+    return (
+        [(o.status, o.filled_quantity, o.avg_price, o.message) for o in orders],
+        [(ids[t.order_id], t.last_price, t.last_quantity, t.transaction_cost) for t in trades],
+    )
+
+
+def test_match_batch_same_as_match():
+    batch_orders, batch_trades = _run(batch=True)
+    orders, trades = _run(batch=False)
+    assert batch_orders == orders
+    assert batch_trades == trades
+
+    statuses = [s for s, *_ in orders]
+    # 用例覆盖了成交、部分成交后撤单、未触及委托价、涨跌停、无成交量及无行情等情形
+    assert {
+        ORDER_STATUS.FILLED, ORDER_STATUS.ACTIVE, ORDER_STATUS.CANCELLED, ORDER_STATUS.REJECTED
+    } <= set(statuses)
+    assert statuses[6] == statuses[9] == statuses[16] == ORDER_STATUS.REJECTED
+    assert statuses[5] == statuses[12] == ORDER_STATUS.CANCELLED
+    assert statuses[7] == statuses[14] == ORDER_STATUS.ACTIVE
+    # 成交量限制由同一合约此前订单的成交量决定
+    assert orders[4][:2] == (ORDER_STATUS.ACTIVE, 200)
+
+
+@pytest.fixture
+def bar_data_proxy(tmp_path):
+    trading_dates = [20200228, 20200302, 20200303]
+    bundle_bars = {}
+    for order_book_id, (close, volume, limit_up, limit_down, _) in MARKET.items():
+        bars = np.zeros(1, dtype=SecuritiesDayBarStore.DEFAULT_DTYPE)
+        bars["datetime"] = 20200302000000
+        bars["close"] = bars["open"] = close * 2
+        bars["volume"], bars["limit_up"], bars["limit_down"] = volume * 10, limit_up * 2, limit_down * 2
+        bundle_bars[order_book_id] = bars
+    mock_bundle(str(tmp_path), [{
+        "order_book_id": o, "symbol": o, "type": "CS", "exchange": "XSHE",
+        "listed_date": v[4].strftime("%Y-%m-%d"), "de_listed_date": "0000-00-00", "board_type": "MainBoard",
+        "round_lot": 100.0, "market_tplus": 1,
+    } for o, v in MARKET.items()], trading_dates, {"stocks.h5": bundle_bars})
+    return lambda: DataProxy(_BarDataSource(RqAttrDict({"data_bundle_path": str(tmp_path)})), _PriceBoard())
+
+
+def test_match_batch_same_as_match_with_overridden_get_bar(bar_data_proxy):
+    batch_orders, batch_trades = _run(True, bar_data_proxy())
+    orders, trades = _run(False, bar_data_proxy())
+    assert batch_orders == orders
+    assert batch_trades == trades
+    # 成交价取自重写的 get_bar 而非 bundle
+    assert _run(False)[1] == trades
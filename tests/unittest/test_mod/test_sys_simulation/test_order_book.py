@@ -0,0 +1,69 @@
+from rqalpha.mod.rqalpha_mod_sys_simulation.order_book import OpenOrderBook
+
+
+class _Order(object):
+    def __init__(self, order_book_id):
+        self.order_book_id = order_book_id
+        self.final = False
+
+    def is_final(self):
+        return self.final
+
+
+def test_open_order_book_index():
+    book = OpenOrderBook()
+    orders = [_Order(oid) for oid in ["A", "B", "A", "C"]]
+    for order in orders:
+        book.add("account", order)
+    assert len(book) == 4
+    assert [o for _, o in book.get()] == orders
+    assert [o for _, o in book.get("A")] == [orders[0], orders[2]]
+    assert book.get("D") == []
+
+    assert book.remove(orders[0])
+    assert not book.remove(orders[0])
+    assert [o for _, o in book.get("A")] == [orders[2]]
+    assert book.remove(orders[2])
+    assert book.get("A") == []
+    assert orders[2] not in book and len(book) == 2
+
+
+def test_open_order_book_iter_active_and_pop_final():
+    book = OpenOrderBook()
+    a1, b1, a2 = _Order("A"), _Order("B"), _Order("A")
+    for order in (a1, b1, a2):
+        book.add("account", order)
+
+    visited = []
+    added = _Order("A")
+    for _, order in book.iter_active("A"):
+        visited.append(order)
+        order.final = True
+        if order is a1:
+            # 遍历过程中加入的订单同样会被遍历到
+            book.add("account", added)
+    assert visited == [a1, a2, added]
+
+    b1.final = True
+    assert [o for _, o in book.pop_final("A")] == [a1, a2, added]
+    assert [o for _, o in book.get()] == [b1]
+    assert [o for _, o in book.pop_final()] == [b1]
+    assert len(book) == 0
+
+
+def test_open_order_book_iter_batches():
+    book = OpenOrderBook()
+    a1, b1, a2 = _Order("A"), _Order("B"), _Order("A")
+    for order in (a1, b1, a2):
+        book.add("account", order)
+    b1.final = True
+
+    batches = []
+    added = _Order("A")
+    for batch in book.iter_batches():
+        batches.append([o for _, o in batch])
+        if len(batches) == 1:
+            # 处理一批订单时新加入的订单出现在下一批中
+            book.add("account", added)
+    assert batches == [[a1, a2], [added]]
+    assert [[o for _, o in batch] for batch in book.iter_batches("B")] == [[]]
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from rqalpha.const import POSITION_DIRECTION
+from rqalpha.portfolio.account import _Aggregates
+
+
+def _position(direction, market_value, margin=None, **kwargs):
+    fields = dict(
+        direction=direction, market_value=market_value, transaction_cost=1., equity=market_value, position_pnl=0.,
+        trading_pnl=0.
+    )
+    fields.update(kwargs)
+    if margin is not None:
+        fields["margin"] = margin
+    return SimpleNamespace(**fields)
+
+
+def test_aggregates_of_position():
+    long = _Aggregates.of(_position(POSITION_DIRECTION.LONG, 100., margin=10.))
+    assert (long.market_value, long.buy_margin, long.sell_margin) == (100., 10., 0.)
+
+    short = _Aggregates.of(_position(POSITION_DIRECTION.SHORT, 100., margin=10.))
+    assert (short.market_value, short.buy_margin, short.sell_margin) == (-100., 0., 10.)
+
+    # 股票持仓没有 margin 属性
+    stock = _Aggregates.of(_position(POSITION_DIRECTION.LONG, 50.))
+    assert (stock.buy_margin, stock.sell_margin) == (0., 0.)
+
+
+def test_aggregates_incremental_update_matches_full_sum():
+    positions = [_position(POSITION_DIRECTION.LONG, 100. * i, trading_pnl=float(i)) for i in range(1, 5)]
+    contributions = [_Aggregates.of(p) for p in positions]
+    total = _Aggregates()
+    for c in contributions:
+        total.add(c)
+
+    positions[2].market_value = positions[2].equity = 1000.
+    positions[2].trading_pnl = -7.
+    new = _Aggregates.of(positions[2])
+    total.add(contributions[2], -1)
+    total.add(new)
+
+    expected = _Aggregates()
+    for p in positions:
+        expected.add(_Aggregates.of(p))
+    assert total.is_close_to(expected)
+    assert total.market_value == 1700.
+    assert total.trading_pnl == 1. + 2. - 7. + 4.
+
+    expected.market_value += 1.
+    assert not total.is_close_to(expected)
@@ -0,0 +1,158 @@
+import threading
+
+from rqalpha.const import PERSIST_MODE
+from rqalpha.core.events import EVENT, Event, EventBus
+from rqalpha.utils.persisit_helper import PersistHelper
+
+
+class _Provider:
+    def __init__(self):
+        self.stored = {}
+        self.calls = []
+        self.fail = False
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def store(self, key, value):
+        self.gate.wait()
+        if self.fail:
+            raise IOError("store failed")
+        self.calls.append(key)
+        self.stored[key] = value
+
+    def load(self, key):
+        return self.stored.get(key)
+
+
+class _Obj:
+    def __init__(self, versioned=True):
+        self.value = 0
+        self.versioned = versioned
+        self.serialized = 0
+
+    def get_state(self):
+        self.serialized += 1
+        return str(self.value).encode("utf-8")
+
+    def set_state(self, state):
+        self.value = int(state.decode("utf-8"))
+
+    def get_state_version(self):
+        return self.value if self.versioned else None
+
+
+def test_skip_unchanged_objects():
+    provider = _Provider()
+    helper = PersistHelper(provider, EventBus(), PERSIST_MODE.ON_CRASH)
+    versioned, plain = _Obj(), _Obj(versioned=False)
+    helper.register("versioned", versioned)
+    helper.register("plain", plain)
+
+    helper.persist()
+    helper.persist()
+    # 版本号未变化时不再序列化，无版本号的对象按内容去重
+    assert versioned.serialized == 1
+    assert plain.serialized == 2
+    assert provider.calls == ["versioned", "plain"]
+
+    versioned.value = plain.value = 1
+    helper.persist()
+    assert provider.calls == ["versioned", "plain", "versioned", "plain"]
+
+
+def test_async_store_and_flush():
+    provider = _Provider()
+    event_bus = EventBus()
+    helper = PersistHelper(provider, event_bus, PERSIST_MODE.REAL_TIME, queue_size=2)
+    obj = _Obj()
+    helper.register("obj", obj)
+
+    provider.gate.clear()
+    for i in range(1, 4):
+        obj.value = i
+        event_bus.publish_event(Event(EVENT.POST_BAR))
+    assert provider.stored == {}
+    provider.gate.set()
+    event_bus.publish_event(Event(EVENT.POST_SETTLEMENT))
+    # POST_SETTLEMENT 后所有写入均已完成
+    assert provider.calls == ["obj"] * 3
+    assert provider.stored["obj"] == b"3"
+
+    # 写入失败后下次 persist 会重新写入
+    provider.fail = True
+    obj.value = 4
+    helper.persist()
+    helper.flush()
+    provider.fail = False
+    helper.persist()
+    helper.close()
+    assert provider.stored["obj"] == b"4"
+
+
+def test_skip_idle_portfolio_and_broker():
+    from datetime import datetime
+    from unittest.mock import MagicMock
+
+    from rqalpha.const import EXECUTION_PHASE, MATCHING_TYPE, POSITION_EFFECT, SIDE
+    from rqalpha.core.execution_context import ExecutionContext
+    from rqalpha.environment import Environment
+    from rqalpha.interface import TransactionCost
+    from rqalpha.mod.rqalpha_mod_sys_simulation import __config__ as mod_config
+    from rqalpha.mod.rqalpha_mod_sys_simulation.simulation_broker import SimulationBroker
+    from rqalpha.model.order import LimitOrder, Order
+    from rqalpha.portfolio import Portfolio
+    from rqalpha.utils import RqAttrDict
+    from rqalpha.utils.testing import mock_instrument
+
+    class _CostDecider:
+        def calc(self, args):
+            return TransactionCost(commission=5, tax=0, other_fees=0)
+
+    trading_dt = datetime(2020, 3, 2, 15)
+    env = Environment(RqAttrDict({"base": {
+        "start_date": trading_dt.date(), "end_date": trading_dt.date(), "frequency": "1d", "round_price": False
+    }, "extra": {}}), False)
+    instrument = mock_instrument("000001.XSHE", "CS", symbol="平安银行", board_type="MainBoard", round_lot=100)
+    data_proxy = MagicMock()
+    data_proxy.instrument.return_value = data_proxy.instrument_not_none.return_value = instrument
+    env.set_data_proxy(data_proxy)
+    env.set_transaction_cost_decider("CS", _CostDecider())
+    env.update_time(trading_dt, trading_dt)
+    env.portfolio = Portfolio({"STOCK": 1000000}, [], 0, env)
+    env.broker = SimulationBroker(env, RqAttrDict(dict(mod_config, matching_type=MATCHING_TYPE.NEXT_BAR_OPEN)))
+
+    provider = _Provider()
+    helper = PersistHelper(provider, env.event_bus, PERSIST_MODE.REAL_TIME)
+    serialized = {"portfolio": 0, "broker": 0}
+    for key, obj in (("portfolio", env.portfolio), ("broker", env.broker)):
+        def _get_state(get_state=obj.get_state, key=key):
+            serialized[key] += 1
+            return get_state()
+        obj.get_state = _get_state
+        helper.register(key, obj)
+
+    helper.persist()
+    assert serialized == {"portfolio": 1, "broker": 1}
+
+    # 无订单、无持仓的 bar 不改变状态，跳过序列化
+    env.event_bus.publish_event(Event(EVENT.BAR, bar_dict=None))
+    env.event_bus.publish_event(Event(EVENT.POST_BAR))
+    assert serialized == {"portfolio": 1, "broker": 1}
+
+    order = Order.__from_create__("000001.XSHE", 100, SIDE.BUY, LimitOrder(10.), POSITION_EFFECT.OPEN)
+    with ExecutionContext(EXECUTION_PHASE.ON_BAR):
+        env.broker.submit_order(order)
+    env.event_bus.publish_event(Event(EVENT.POST_BAR))
+    assert serialized == {"portfolio": 2, "broker": 2}
+    assert env.portfolio.frozen_cash > 0
+
+    with ExecutionContext(EXECUTION_PHASE.ON_BAR):
+        env.broker.cancel_order(order)
+    env.event_bus.publish_event(Event(EVENT.POST_BAR))
+    assert serialized == {"portfolio": 3, "broker": 3}
+    assert env.portfolio.frozen_cash == 0 and not env.broker.get_open_orders()
+
+    env.event_bus.publish_event(Event(EVENT.BAR, bar_dict=None))
+    env.event_bus.publish_event(Event(EVENT.POST_BAR))
+    assert serialized == {"portfolio": 3, "broker": 3}
+    assert provider.calls == ["portfolio", "broker"] * 3
@@ -0,0 +1,56 @@
+import multiprocessing
+
+import pandas as pd
+import pytest
+
+from rqalpha.sweep import expand_param_grid, apply_params, run_sweep
+
+
+def test_expand_param_grid():
+    assert expand_param_grid({"fast": [5, 10], "slow": (30, )}) == [
+        {"fast": 5, "slow": 30}, {"fast": 10, "slow": 30}
+    ]
+    assert expand_param_grid({}) == [{}]
+
+
+def test_apply_params():
+    config = {"base": {"accounts": {"stock": 100}}, "extra": {"log_level": "error"}}
+    applied = apply_params(config, {"fast": 5, "mod.sys_simulation.slippage": 0.01})
+    assert applied["extra"] == {"log_level": "error", "context_vars": {"fast": 5}}
+    assert applied["mod"] == {"sys_simulation": {"slippage": 0.01}}
+    # 原配置不受影响
+    assert config == {"base": {"accounts": {"stock": 100}}, "extra": {"log_level": "error"}}
+
+
+def _stub_run(config):
+    fast = config.extra.context_vars.fast
+    if fast == 10:
+        raise ValueError("bad param")
+    return {"sys_analyser": {"summary": {"total_returns": fast / 100}}}
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="stub run needs fork")
+def test_run_sweep_isolates_failures(tmp_path, monkeypatch):
+    from rqalpha import main
+
+    monkeypatch.setattr(main, "run", _stub_run)
+    strategy_file = tmp_path / "strategy.py"
+    strategy_file.write_text("def init(context):\n    pass\n")
+    output_file = str(tmp_path / "result.csv")
+
+    result = run_sweep(str(strategy_file), {"fast": [5, 10, 20]}, processes=2, output_file=output_file)
+    assert result.index.tolist() == [0, 1, 2]
+    assert result["fast"].tolist() == [5, 10, 20]
+    assert result["error"].isnull().tolist() == [True, False, True]
+    assert result.loc[1, "error"] == "ValueError: bad param"
+    assert result.loc[[0, 2], "total_returns"].tolist() == [0.05, 0.2]
+    # 结果文件同样包含失败的回测
+    written = pd.read_csv(output_file)
+    assert written["run"].tolist() == [0, 1, 2]
+    assert written["error"].isnull().tolist() == [True, False, True]
+
+    from click.testing import CliRunner
+    from rqalpha.cmds import cli
+
+    output = CliRunner().invoke(cli, ["sweep", "-f", str(strategy_file), "-p", "fast", "5,10,20", "-n", "2"]).output
+    assert "1 of 3 runs failed" in output